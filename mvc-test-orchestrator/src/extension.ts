@@ -2,7 +2,7 @@
 
 import * as vscode from "vscode";
 import * as path from "path";
-import { exec } from "child_process";
+import { exec, spawn, ChildProcess } from "child_process";
 import * as fs from "fs";
 
 
@@ -43,6 +43,280 @@ function safeErrorToString(error: any): string {
 }
 
 
+// --- YARDIMCI FONKSİYON: Komut sonucunu kullanıcıya bildirir (exec + server ortak) ---
+function reportCommandResult(
+    commandName: string,
+    code: number | null,
+    allOutput: string,
+    allErrors: string
+) {
+    if (code === 0) {
+        // Don't show notification for generate-code (extension handles it in chat)
+        if (commandName === "generate-code") {
+            // Silent - extension will show result in chat
+        } else if (commandName === "create-srs") {
+            vscode.window.showInformationMessage(`SRS created → data/srs_document.txt\nNext: Run "Extract Architecture" to generate architecture.`);
+        } else if (commandName === "extract" || commandName === "index-srs") {
+            vscode.window.showInformationMessage(`Architecture extracted → data/architecture_map.json`);
+        } else if (commandName === "scaffold") {
+            vscode.window.showInformationMessage("Scaffold created successfully in /scaffolds/mvc_skeleton/");
+        } else if (commandName === "audit" || commandName === "run-audit") {
+            vscode.window.showInformationMessage("Audit completed. Check data/final_audit_report.json");
+        } else if (commandName === "run-fix") {
+            // Silent - extension will show result in chat
+        }
+    } else {
+        // Only show errors for real failures (not null/timeout which might be handled)
+        const hasRealError = allErrors.trim().length > 0 && !allErrors.trim().match(/^\d+$/);
+        const exitCode = code ?? 'unknown';
+
+        if (hasRealError) {
+            // Log to output channel only (not console)
+            if (outputChannel) {
+                outputChannel.appendLine(`\n========== COMMAND FAILED (exit ${exitCode}) ==========`);
+                if (allOutput.trim()) {
+                    outputChannel.appendLine(`STDOUT:\n${allOutput}`);
+                }
+                if (allErrors.trim()) {
+                    outputChannel.appendLine(`STDERR:\n${allErrors}`);
+                }
+                outputChannel.appendLine(`==========================================\n`);
+            }
+
+            // Only show error message for non-timeout errors
+            if (code !== null && code !== undefined) {
+                vscode.window.showErrorMessage(
+                    `Python CLI failed (exit ${code}). Check "MVC Orchestrator" output panel for details.`,
+                    "Show Output"
+                ).then(selection => {
+                    if (selection === "Show Output" && outputChannel) {
+                        outputChannel.show(true);
+                    }
+                });
+            }
+        }
+    }
+}
+
+
+// ============================================================
+// PERSISTENT PYTHON SERVER (JSON-RPC over stdio)
+// ============================================================
+// `python -m src.cli.mvc_arch_cli serve` tek bir süreçte kalır: LLM client,
+// embedding modeli ve Chroma index'leri komutlar arasında sıcak tutulur.
+interface ServerResult {
+    exit_code: number;
+    output: string;
+    duration_s: number;
+}
+
+// Structured progress event (src/core/events.py), sent as "event" notifications
+interface OrchestratorEvent {
+    event: string;
+    stage?: string;
+    status?: string;
+    done?: number;
+    total?: number;
+    item?: string;
+    message?: string;
+    [key: string]: any;
+}
+
+interface PendingRequest {
+    commandName: string;
+    resolve: (result: ServerResult) => void;
+    reject: (error: Error) => void;
+    timer: NodeJS.Timeout;
+    onEvent?: (event: OrchestratorEvent) => void;
+}
+
+class OrchestratorServer {
+    private proc: ChildProcess | null = null;
+    private nextId = 1;
+    private pending = new Map<number, PendingRequest>();
+    private buffer = "";
+    private readonly readyPromise: Promise<void>;
+
+    constructor(private readonly workspaceRoot: string, private readonly pythonExec: string) {
+        this.readyPromise = this.start();
+        // Avoid unhandled rejections; callers see the error through ready()
+        this.readyPromise.catch(() => undefined);
+    }
+
+    get alive(): boolean {
+        return this.proc !== null;
+    }
+
+    ready(): Promise<void> {
+        return this.readyPromise;
+    }
+
+    private start(): Promise<void> {
+        return new Promise<void>((resolve, reject) => {
+            const proc = spawn(`${this.pythonExec} -m src.cli.mvc_arch_cli serve`, {
+                cwd: this.workspaceRoot,
+                shell: true,
+                env: { ...process.env, PYTHONIOENCODING: 'utf-8' },
+            });
+            this.proc = proc;
+
+            // First start pays the heavy imports; later requests are warm
+            const startupTimer = setTimeout(() => {
+                reject(new Error("Python server did not become ready in time"));
+                this.dispose();
+            }, 120000);
+
+            proc.stdout?.on("data", (d) => {
+                this.buffer += d.toString();
+                let newline: number;
+                while ((newline = this.buffer.indexOf("\n")) >= 0) {
+                    const line = this.buffer.slice(0, newline).trim();
+                    this.buffer = this.buffer.slice(newline + 1);
+                    if (!line) {
+                        continue;
+                    }
+                    let message: any;
+                    try {
+                        message = JSON.parse(line);
+                    } catch {
+                        outputChannel?.appendLine(`[server] ${line}`);
+                        continue;
+                    }
+                    if (message.method === "ready") {
+                        clearTimeout(startupTimer);
+                        resolve();
+                    } else {
+                        this.handleMessage(message);
+                    }
+                }
+            });
+
+            proc.stderr?.on("data", (d) => {
+                const trimmed = d.toString().trim();
+                if (trimmed) {
+                    outputChannel?.appendLine(`[server] ${trimmed}`);
+                }
+            });
+
+            proc.on("error", (err) => {
+                clearTimeout(startupTimer);
+                reject(err);
+            });
+
+            proc.on("exit", (code) => {
+                clearTimeout(startupTimer);
+                this.proc = null;
+                const error = new Error(`Python server exited (code ${code ?? 'unknown'})`);
+                reject(error);
+                for (const [id, request] of this.pending) {
+                    clearTimeout(request.timer);
+                    request.reject(error);
+                    this.pending.delete(id);
+                }
+            });
+        });
+    }
+
+    private handleMessage(message: any) {
+        if (message.method === "log") {
+            const request = this.pending.get(message.params?.id);
+            const prefix = request ? request.commandName : "server";
+            outputChannel?.appendLine(`[${prefix}] ${message.params?.text ?? ""}`);
+            return;
+        }
+        if (message.method === "event") {
+            this.pending.get(message.params?.id)?.onEvent?.(message.params as OrchestratorEvent);
+            return;
+        }
+
+        const request = this.pending.get(message.id);
+        if (!request) {
+            return;
+        }
+        clearTimeout(request.timer);
+        this.pending.delete(message.id);
+        if (message.error) {
+            request.reject(new Error(message.error.message || "JSON-RPC error"));
+        } else {
+            request.resolve(message.result as ServerResult);
+        }
+    }
+
+    request(
+        commandName: string,
+        argv: string[],
+        timeoutMs: number,
+        onEvent?: (event: OrchestratorEvent) => void
+    ): Promise<ServerResult> {
+        return new Promise<ServerResult>((resolve, reject) => {
+            if (!this.proc || !this.proc.stdin) {
+                reject(new Error("Python server is not running"));
+                return;
+            }
+            const id = this.nextId++;
+            const timer = setTimeout(() => {
+                this.pending.delete(id);
+                reject(new Error(`${commandName} timed out after ${timeoutMs / 1000}s`));
+                // The server is still busy with the timed-out command: restart it
+                this.dispose();
+            }, timeoutMs);
+            this.pending.set(id, { commandName, resolve, reject, timer, onEvent });
+            this.proc.stdin.write(JSON.stringify({ jsonrpc: "2.0", id, method: commandName, params: { argv } }) + "\n");
+        });
+    }
+
+    dispose() {
+        if (this.proc) {
+            try {
+                this.proc.stdin?.write(JSON.stringify({ jsonrpc: "2.0", id: 0, method: "shutdown" }) + "\n");
+                this.proc.stdin?.end();
+            } catch {
+                // Process already gone
+            }
+            this.proc.kill();
+            this.proc = null;
+        }
+    }
+}
+
+let orchestratorServer: OrchestratorServer | null = null;
+
+function getOrchestratorServer(workspaceRoot: string, pythonExec: string): OrchestratorServer {
+    if (!orchestratorServer || !orchestratorServer.alive) {
+        orchestratorServer = new OrchestratorServer(workspaceRoot, pythonExec);
+    }
+    return orchestratorServer;
+}
+
+// Turns progress events into notification progress updates (no stdout scraping)
+function reportProgressEvent(
+    progress: vscode.Progress<{ message?: string; increment?: number }>,
+    event: OrchestratorEvent
+) {
+    if (event.event === "progress" && event.total) {
+        progress.report({
+            message: `${event.stage}: ${event.done}/${event.total}${event.item ? ` (${event.item})` : ""}`,
+            increment: 100 / event.total,
+        });
+    } else if (event.event === "stage_start") {
+        progress.report({ message: `${event.stage}...` });
+    } else if (event.event === "stage_skip") {
+        progress.report({ message: `${event.stage}: up to date` });
+    }
+}
+
+// Splits a command-line argument string ('--srs-path "a b.txt" -k 5') into argv
+function splitArgs(args: string): string[] {
+    const argv: string[] = [];
+    const pattern = /"([^"]*)"|(\S+)/g;
+    let match: RegExpExecArray | null;
+    while ((match = pattern.exec(args)) !== null) {
+        argv.push(match[1] ?? match[2]);
+    }
+    return argv;
+}
+
+
 // --- YARDIMCI FONKSİYON: Python Komutunu Çalıştırır ---
 async function runPythonCommand(
     workspaceRoot: string, 
@@ -70,14 +344,43 @@ async function runPythonCommand(
     // Only show progress for long-running commands
     const showProgress = commandName === "extract" || commandName === "create-srs" || commandName === "generate-code";
     
-    const runCommand = () => new Promise<void>((resolve, reject) => {
+    // Timeout ayarları (120 saniye for long operations)
+    const timeoutMs = commandName === "generate-code" ? 300000 : 120000; // 5 min for generate-code, 2 min for others
+
+    // Warm path: send the command to the persistent server (no Python startup,
+    // no model / index reload). Falls back to a new process if the server cannot start.
+    const runCommand = async (progress?: vscode.Progress<{ message?: string; increment?: number }>) => {
+        const server = getOrchestratorServer(workspaceRoot, pythonExec);
+        try {
+            await server.ready();
+        } catch (startError) {
+            outputChannel?.appendLine(`[${commandName}] Python server unavailable, using a new process: ${safeErrorToString(startError)}`);
+            await runCommandInNewProcess();
+            return;
+        }
+
+        try {
+            const result = await server.request(
+                commandName,
+                splitArgs(`${args} ${outputArg}`),
+                timeoutMs,
+                progress ? (event) => reportProgressEvent(progress, event) : undefined
+            );
+            // Server output is a single stream (stdout + stderr)
+            reportCommandResult(commandName, result.exit_code, result.output, result.exit_code === 0 ? "" : result.output);
+        } catch (requestError) {
+            outputChannel?.appendLine(`[${commandName}] Server request failed: ${safeErrorToString(requestError)}`);
+            reportCommandResult(commandName, 1, "", requestError instanceof Error ? requestError.message : String(requestError));
+        }
+    };
+
+    const runCommandInNewProcess = () => new Promise<void>((resolve, reject) => {
         try {
             // PYTHONIOENCODING=utf-8 eklenerek I/O hatası çözülür.
             const proc = exec(pythonCmd, { 
                 cwd: workspaceRoot,
                 env: { ...process.env, PYTHONIOENCODING: 'utf-8' },
-                // Timeout ayarları (120 saniye for long operations)
-                timeout: commandName === "generate-code" ? 300000 : 120000, // 5 min for generate-code, 2 min for others
+                timeout: timeoutMs,
                 maxBuffer: 1024 * 1024 * 10 // 10MB buffer
             }, (error) => {
                 // Only log real errors, not expected ones (timeout is handled separately)
@@ -120,55 +423,8 @@ async function runPythonCommand(
             });
 
             proc.on("close", (code) => {
-                if (code === 0) {
-                    // Don't show notification for generate-code (extension handles it in chat)
-                    if (commandName === "generate-code") {
-                        // Silent - extension will show result in chat
-                    } else if (commandName === "create-srs") {
-                        vscode.window.showInformationMessage(`SRS created → data/srs_document.txt\nNext: Run "Extract Architecture" to generate architecture.`);
-                    } else if (commandName === "extract" || commandName === "index-srs") {
-                        vscode.window.showInformationMessage(`Architecture extracted → data/architecture_map.json`);
-                    } else if (commandName === "scaffold") {
-                        vscode.window.showInformationMessage("Scaffold created successfully in /scaffolds/mvc_skeleton/");
-                    } else if (commandName === "audit" || commandName === "run-audit") {
-                        vscode.window.showInformationMessage("Audit completed. Check data/final_audit_report.json");
-                    } else if (commandName === "run-fix") {
-                        // Silent - extension will show result in chat
-                    }
-                    resolve();
-                } else {
-                    // Only show errors for real failures (not null/timeout which might be handled)
-                    const hasRealError = allErrors.trim().length > 0 && !allErrors.trim().match(/^\d+$/);
-                    const exitCode = code ?? 'unknown';
-                    
-                    if (hasRealError) {
-                        // Log to output channel only (not console)
-                        if (outputChannel) {
-                            outputChannel.appendLine(`\n========== COMMAND FAILED (exit ${exitCode}) ==========`);
-                            if (allOutput.trim()) {
-                                outputChannel.appendLine(`STDOUT:\n${allOutput}`);
-                            }
-                            if (allErrors.trim()) {
-                                outputChannel.appendLine(`STDERR:\n${allErrors}`);
-                            }
-                            outputChannel.appendLine(`==========================================\n`);
-                        }
-                        
-                        // Only show error message for non-timeout errors
-                        if (code !== null && code !== undefined) {
-                            vscode.window.showErrorMessage(
-                                `Python CLI failed (exit ${code}). Check "MVC Orchestrator" output panel for details.`,
-                                "Show Output"
-                            ).then(selection => {
-                                if (selection === "Show Output" && outputChannel) {
-                                    outputChannel.show(true);
-                                }
-                            });
-                        }
-                    }
-                    
-                    resolve(); // Always resolve to continue pipeline
-                }
+                reportCommandResult(commandName, code, allOutput, allErrors);
+                resolve(); // Always resolve to continue pipeline
             });
             
             proc.on("error", (err) => {
@@ -195,7 +451,7 @@ async function runPythonCommand(
                 title: `Running MVC Orchestrator (${commandName})...`,
                 cancellable: false,
             },
-            () => runCommand()
+            (progress) => runCommand(progress)
         );
     } else {
         await runCommand();
@@ -857,7 +1113,8 @@ print("ERROR: No PDF library installed. Install with: pip install pdfplumber PyP
                     }
                     
                     stream.markdown(`**🔧 Applying audit recommendations...**\n\n`);
-                    await runPythonCommand(workspaceRoot, "run-fix", "", "fix_result.txt");
+                    // Confirmed in the modal above; the CLI must not wait for stdin
+                    await runPythonCommand(workspaceRoot, "run-fix", "--yes", "fix_result.txt");
                     stream.markdown(`✅ **Fix complete**. Check output for details.\n\n`);
                 }
                 else {
@@ -888,6 +1145,10 @@ print("ERROR: No PDF library installed. Install with: pip install pdfplumber PyP
     );
 
     context.subscriptions.push(mvcChatParticipant);
+    context.subscriptions.push({ dispose: () => orchestratorServer?.dispose() });
 }
 
-export function deactivate() {}
\ No newline at end of file
+export function deactivate() {
+    orchestratorServer?.dispose();
+    orchestratorServer = null;
+}
\ No newline at end of file
@@ -1,13 +1,25 @@
 # src/agents/architect_agent/base_architect_agent.py
+import json
 import time
 
 from pathlib import Path
-from typing import List, Optional
-from google.api_core import exceptions as google_exceptions
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
 
-from src.rag.rag_pipeline import RAGPipeline
-from src.core.llm_client import LLMClient
-from src.core.config import DEFAULT_TOP_K
+from src.core.config import DEFAULT_TOP_K, FUSED_PER_QUERY_K, FUSED_CHUNK_BUDGET, LLM_JSON_MAX_FOLLOWUPS
+from src.rag.query_planner import reciprocal_rank_fusion
+from src.core.pipeline_context import PipelineContext
+from src.core.rate_limiter import llm_rate_limiter
+from src.core.json_repair import loads_lenient, validate, build_follow_up_prompt
+from src.core.resources import get_llm_client
+from src.core.profiler import span
+from src.core.latency_history import record_llm_call
+from src.core.artifact_store import ArtifactStore, atomic_write_text
+from src.core import workspace
+
+if TYPE_CHECKING:
+    # Heavy (chromadb / torch / Gemini SDK); imported on first use only
+    from src.rag.rag_pipeline import RAGPipeline
+    from src.core.llm_client import LLMClient
 
 
 class BaseArchitectAgent:
@@ -20,21 +32,54 @@ class BaseArchitectAgent:
     Responsibilities:
     - Manage access to RAGPipeline (document search, chunk retrieval)
     - Manage access to LLMClient (prompting + model calls)
+      Both are created on first use only, so agents that never search or
+      prompt (or get them injected) cost nothing extra.
     - Provide shared helper methods (e.g., retrieving context, saving outputs)
+
+    When a PipelineContext is given, upstream artifacts are read from memory
+    and outputs are persisted by the context's deferred sink; the context's
+    data_dir replaces the default /data directory.
     """
 
     def __init__(
         self,
-        rag_pipeline: Optional[RAGPipeline] = None,
-        llm_client: Optional[LLMClient] = None
+        rag_pipeline: Optional["RAGPipeline"] = None,
+        llm_client: Optional["LLMClient"] = None,
+        context: Optional[PipelineContext] = None,
     ):
-        self.rag = rag_pipeline or RAGPipeline()
-        self.llm = llm_client or LLMClient()
+        # Created lazily on first use; heavy parts come from the shared resource registry
+        self._rag = rag_pipeline
+        self._llm = llm_client
         self.current_document: Optional[str] = None
+        self.context = context
+
+        if context is not None:
+            self.data_dir = context.data_dir
+        else:
+            # data/ of the active workspace (the repository root unless MVC_WORKSPACE_ROOT is set)
+            self.data_dir = workspace.data_dir()
+        self.data_dir.mkdir(parents=True, exist_ok=True)
+
+    @property
+    def llm(self) -> "LLMClient":
+        if self._llm is None:
+            self._llm = get_llm_client()
+        return self._llm
+
+    @llm.setter
+    def llm(self, value: "LLMClient") -> None:
+        self._llm = value
 
-        project_root = Path(__file__).resolve().parents[3] 
-        self.data_dir = project_root / "data" 
-        self.data_dir.mkdir(exist_ok=True)
+    @property
+    def rag(self) -> "RAGPipeline":
+        if self._rag is None:
+            from src.rag.rag_pipeline import RAGPipeline
+            self._rag = RAGPipeline(llm_client=self.llm)
+        return self._rag
+
+    @rag.setter
+    def rag(self, value: "RAGPipeline") -> None:
+        self._rag = value
 
     # ----------------------------------------------------------------------
     # PDF Indexing
@@ -61,9 +106,6 @@ class BaseArchitectAgent:
         - No explicit document filter is required
         """
 
-        if self.rag is None:
-            raise ValueError("RAG pipeline is not initialized.")
-
         result = self.rag.search(query, k=k)
 
         documents = result.get("documents") or []
@@ -74,6 +116,63 @@ class BaseArchitectAgent:
 
         return documents[0]
 
+    def retrieve_fused_chunks(
+        self,
+        queries: List[str],
+        k_per_query: int = FUSED_PER_QUERY_K,
+        budget: int = FUSED_CHUNK_BUDGET,
+    ) -> List[str]:
+        """
+        Runs several focused sub-queries as ONE batched retrieval, fuses the
+        ranked results with reciprocal rank fusion and returns at most
+        `budget` distinct chunks.
+        """
+
+        result = self.rag.search_many(queries, k=k_per_query)
+
+        ids_per_query = result.get("ids") or []
+        docs_per_query = result.get("documents") or []
+        ranked_lists = [
+            list(zip(ids, docs))
+            for ids, docs in zip(ids_per_query, docs_per_query)
+        ]
+
+        chunks = reciprocal_rank_fusion(ranked_lists, budget=budget)
+        if not chunks:
+            raise ValueError(
+                f"RAG could not find relevant chunks for {len(queries)} sub-queries."
+            )
+
+        print(f"[{type(self).__name__}] Fused {len(queries)} sub-queries into {len(chunks)} chunk(s)")
+        return chunks
+
+    # ----------------------------------------------------------------------
+    # Upstream Artifacts
+    # ----------------------------------------------------------------------
+    def _load_analysis(self, filename: str) -> Dict[str, Any]:
+        """
+        Loads structured JSON output from a previous agent.
+        Reads the in-memory artifact from the pipeline context when available,
+        otherwise falls back to the file in data_dir.
+        """
+        try:
+            if self.context is not None:
+                return self.context.load(filename)
+
+            analysis_path = self.data_dir / filename
+            if not analysis_path.exists():
+                raise FileNotFoundError(
+                    f"Required analysis file not found: {filename}. "
+                    "Ensure preceding agents have run successfully."
+                )
+            with open(analysis_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except json.JSONDecodeError as e:
+            raise ValueError(
+                f"Could not decode JSON in {filename}. "
+                f"LLM produced malformed JSON. Error: {e}"
+            )
+
     # ----------------------------------------------------------------------
     # Save JSON Outputs
     # ----------------------------------------------------------------------
@@ -82,25 +181,34 @@ class BaseArchitectAgent:
         Saves JSON outputs into the /data directory.
         Every architect agent (model/view/controller/orchestrator) can use this to persist results.
         Also creates a corresponding .md file.
+
+        With a pipeline context the artifact is handed over in memory and the
+        JSON/.md files are written in the background (see PipelineContext.flush()).
         """
-        self.data_dir.mkdir(parents=True, exist_ok=True)
-        output_path = self.data_dir / filename
+        if self.context is not None:
+            self.context.put(filename, data)
+            return self.data_dir / filename
+        return self.write_output(self.data_dir, data, filename)
 
-        import json
-        with open(output_path, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=4, ensure_ascii=False)
+    @staticmethod
+    def write_output(data_dir: Path, data: dict, filename: str) -> Path:
+        """
+        Writes `filename` (JSON) and its .md rendering into `data_dir`. No agent instance needed.
+        The JSON goes through the versioned artifact store (atomic, see src/core/artifact_store.py).
+        """
+        with span("file.write", file=filename):
+            output_path = ArtifactStore(data_dir).write(filename, data)["path"]
 
-        # Also create a markdown file
-        if filename.endswith('.json'):
-            md_filename = filename.replace('.json', '.md')
-            md_path = self.data_dir / md_filename
-            md_content = self._json_to_markdown(data, filename)
-            with open(md_path, "w", encoding="utf-8") as f:
-                f.write(md_content)
+            # Also create a markdown file
+            if filename.endswith('.json'):
+                md_filename = filename.replace('.json', '.md')
+                md_content = BaseArchitectAgent._json_to_markdown(data, filename)
+                atomic_write_text(data_dir / md_filename, md_content, durable=False)
 
         return output_path
     
-    def _json_to_markdown(self, data: dict, filename: str) -> str:
+    @staticmethod
+    def _json_to_markdown(data: dict, filename: str) -> str:
         """
         Converts JSON data to a readable markdown format.
         """
@@ -168,39 +276,78 @@ class BaseArchitectAgent:
         """
         Cleans LLM output by removing code fences and parses JSON safely.
         Used by all architect agents (model, view, controller).
+        Common syntax defects (trailing commas, comments, truncated tail, ...)
+        are repaired locally instead of failing the whole generation.
         """
-        cleaned = text.strip()
-
-        # Remove code fences
-        if cleaned.startswith("```json"):
-            cleaned = cleaned.replace("```json", "").replace("```", "").strip()
-        elif cleaned.startswith("```"):
-            cleaned = cleaned.replace("```", "").strip()
-
-        import json
-        try:
-            return json.loads(cleaned)
-        except json.JSONDecodeError as e:
-            raise ValueError(
-                f"LLM returned invalid JSON.\nError: {e}\nRaw snippet:\n{cleaned[:300]}"
-            )
+        with span("json.parse", chars=len(text)):
+            data, repaired = loads_lenient(text)
+        if repaired:
+            print(f"[{type(self).__name__}] Repaired malformed JSON locally.")
+        return data
 
     # ----------------------------------------------------------------------
     # LLM JSON Wrapper (High-Level)
     # ----------------------------------------------------------------------
-    def llm_json(self, prompt: str, max_retries: int = 3) -> dict:
+    def llm_json(
+        self,
+        prompt: str,
+        max_retries: int = 3,
+        schema: Optional[Dict[str, Any]] = None,
+    ) -> dict:
         """
         Sends a prompt to LLM and parses the returned JSON using parse_json().
         Automatically retries on 429 quota errors with API-suggested delay.
+        Calls are paced by the process-wide rate limiter (LLM_MIN_CALL_INTERVAL).
+
+        With a schema (see src/core/json_repair.py) the result is validated and
+        defaults are filled in; required keys that are missing are requested
+        with a short follow-up prompt (the answer, the errors and the schema,
+        not the original prompt) instead of regenerating everything.
         """
-        time.sleep(12)
-        
+        data = self._generate_json(prompt, max_retries)
+        if schema is None:
+            return data
+
+        normalized, missing = validate(data, schema)
+        for _ in range(LLM_JSON_MAX_FOLLOWUPS):
+            if not missing:
+                break
+            print(f"[{type(self).__name__}] Missing key(s) {missing}; sending targeted follow-up...")
+            extra = self._generate_json(
+                build_follow_up_prompt(data, missing, schema), max_retries
+            )
+            if not isinstance(extra, dict):
+                continue
+            recovered = {key: extra[key] for key in missing if extra.get(key) is not None}
+            if recovered:
+                recovered_normalized, _ = validate(recovered, {key: schema[key] for key in recovered})
+                normalized.update(recovered_normalized)
+            missing = [key for key in missing if key not in recovered]
+
+        if missing:
+            print(f"[WARN] {type(self).__name__}: key(s) {missing} still missing, using defaults.")
+        return normalized
+
+    def _generate_json(self, prompt: str, max_retries: int = 3):
+        """
+        One LLM generation parsed as JSON (with 429 retries). Calls the model
+        directly to see the raw 429, so every attempt acquires the shared
+        llm_rate_limiter itself (LLMClient.generate_content does the same).
+        """
+        from google.api_core import exceptions as google_exceptions
+
         last_exception = None
         
         for attempt in range(max_retries):
+            llm_rate_limiter.acquire()
             try:
-                response = self.llm.model.generate_content(prompt)
-                text = response.text.strip()
+                started = time.perf_counter()
+                with span("llm.call", agent=type(self).__name__, prompt_chars=len(prompt)):
+                    response = self.llm.model.generate_content(prompt)
+                    text = response.text.strip()
+                # Latency history per agent (prompt template), read by --dry-run estimates
+                record_llm_call(type(self).__name__, self.llm.model_name, len(prompt),
+                                time.perf_counter() - started, getattr(response, "usage_metadata", None))
                 return self.parse_json(text)
                 
             except google_exceptions.ResourceExhausted as e:
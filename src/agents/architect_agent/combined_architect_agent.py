@@ -0,0 +1,111 @@
+from typing import List, Dict, Any, Optional
+from pathlib import Path
+
+from src.agents.architect_agent.base_architect_agent import BaseArchitectAgent
+from src.core.json_repair import COMBINED_SCHEMA
+from src.core.config import COMBINED_TOP_K
+from src.core.profiler import span
+
+
+class CombinedArchitectAgent(BaseArchitectAgent):
+    """
+    Extracts requirements, models, controllers and views with ONE LLM call.
+
+    The staged pipeline (Requirements -> Model -> Controller -> View) needs
+    four round trips that re-send overlapping SRS chunks. For small and
+    medium SRS documents this agent retrieves one deduplicated chunk set,
+    asks for all four layers at once and splits the answer back into the
+    usual per-stage files, so MVCScaffolder / generate-code are unchanged.
+    """
+
+    PROMPT_FILE = "extract_mvc_combined.prompt.md"
+
+    # Output file -> keys of the combined JSON that belong to it
+    STAGE_OUTPUTS = {
+        "requirements_analysis.json": ("project_name", "domain_entities", "system_functions"),
+        "model_architecture.json": ("model",),
+        "controller_architecture.json": ("controller",),
+        "view_architecture.json": ("view",),
+    }
+
+    # ----------------------------------------------------------------------
+    # Main Entry Point
+    # ----------------------------------------------------------------------
+    def extract_all(self, k: int = COMBINED_TOP_K) -> Dict[str, Dict[str, Any]]:
+        """
+        Runs the combined extraction.
+
+        Returns:
+            {"requirements_analysis.json": {...}, "model_architecture.json": {...}, ...}
+        """
+
+        # One query per layer, fused into a single deduplicated chunk set
+        queries = [
+            "Core domain entities and high-level system functions/workflows of the system",
+            "Data entities the system stores and manages",
+            "User interactions, workflows and operations the system performs",
+            "Screens, pages and user interfaces described in the SRS",
+        ]
+
+        summary_tree = getattr(self.rag, "summary_tree", None)
+        summary_context = None
+        if summary_tree is not None:
+            summary_context = summary_tree.context()
+
+        chunks = self.retrieve_fused_chunks(queries, k_per_query=k, budget=k)
+
+        if not chunks:
+            raise ValueError("No relevant chunks found for combined MVC extraction.")
+
+        with span("prompt.build"):
+            prompt = self._build_combined_prompt(chunks, summary_context=summary_context)
+        combined_json = self.llm_json(prompt, schema=COMBINED_SCHEMA)
+
+        outputs = self.split_outputs(combined_json)
+        for filename, data in outputs.items():
+            self.save_output(data, filename)
+
+        return outputs
+
+    @classmethod
+    def split_outputs(cls, combined_json: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+        """Splits the combined answer into the per-stage JSON documents."""
+        if not isinstance(combined_json, dict):
+            raise ValueError(
+                f"Combined extraction returned {type(combined_json).__name__}, expected a JSON object."
+            )
+
+        missing = [
+            key for keys in cls.STAGE_OUTPUTS.values() for key in keys
+            if key != "project_name" and key not in combined_json
+        ]
+        if missing:
+            raise ValueError(f"Combined extraction is missing required keys: {missing}")
+
+        outputs = {}
+        for filename, keys in cls.STAGE_OUTPUTS.items():
+            outputs[filename] = {
+                key: combined_json.get(key, "" if key == "project_name" else [])
+                for key in keys
+            }
+        return outputs
+
+    def _build_combined_prompt(self, chunks: List[str], summary_context: Optional[str] = None) -> str:
+        """
+        Builds the single prompt covering all four layers.
+        """
+
+        context = ""
+        if summary_context:
+            context += f"\n\n{summary_context}\n"
+        for i, c in enumerate(chunks):
+            context += f"\n\n--- SRS Chunk {i+1} ---\n{c}\n"
+
+        # Load prompt from external file
+        prompt_path = Path(__file__).resolve().parents[3] / ".github" / "prompts" / self.PROMPT_FILE
+        prompt_template = prompt_path.read_text(encoding="utf-8")
+
+        # Replace variables in template
+        prompt = prompt_template.replace("{{context}}", context)
+
+        return prompt
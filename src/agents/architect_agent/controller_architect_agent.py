@@ -3,7 +3,10 @@ from typing import List, Dict, Any
 from pathlib import Path
 
 from src.agents.architect_agent.base_architect_agent import BaseArchitectAgent
-from src.core.config import DEFAULT_TOP_K
+from src.core.json_repair import CONTROLLER_SCHEMA
+from src.core.config import DEFAULT_TOP_K, FUSED_CHUNK_BUDGET
+from src.rag.query_planner import QueryPlanner
+from src.core.profiler import span
 
 
 class ControllerArchitectAgent(BaseArchitectAgent):
@@ -14,23 +17,9 @@ class ControllerArchitectAgent(BaseArchitectAgent):
     It reads structured entities and functions from previous agents (Requirements/Model)
     to perform a targeted RAG search on user interactions and workflows.
     """
+
+    PROMPT_FILE = "extract_controller_architecture.prompt.md"
     
-    def _load_analysis(self, filename: str) -> Dict[str, Any]:
-        """Loads structured JSON output from a previous agent."""
-        analysis_path = self.data_dir / filename
-        if not analysis_path.exists():
-            raise FileNotFoundError(
-                f"Required analysis file not found: {filename}. "
-                "Ensure preceding agents have run successfully."
-            )
-        try:
-            with open(analysis_path, "r", encoding="utf-8") as f:
-                return json.load(f)
-        except json.JSONDecodeError as e:
-            raise ValueError(
-                f"Could not decode JSON in {filename}. "
-                f"LLM produced malformed JSON. Error: {e}"
-            )
     # ----------------------------------------------------------------------
     # Main Entry Point
     # ----------------------------------------------------------------------
@@ -46,24 +35,27 @@ class ControllerArchitectAgent(BaseArchitectAgent):
         functions = [f['name'] for f in requirements_data.get('system_functions', [])]
         entities = [m['name'] for m in model_data.get('model', [])]
         
-        functions_list = ", ".join(functions) if functions else "system actions"
-        entities_list = ", ".join(entities) if entities else "core data models"
-
-        query = (
-            f"For the high-level functions: [{functions_list}] and the data models: [{entities_list}], "
-            "identify all user interactions, workflows, and specific controller "
+        focus = (
+            "Identify all user interactions, workflows, and specific controller "
             "responsibilities (actions) described in the SRS. Focus on the flow."
         )
 
-        chunks = self.retrieve_chunks(query, k=k)
+        # One focused sub-query per function / entity instead of one long list
+        queries = QueryPlanner().plan(focus, [
+            ("Workflow and user interactions for {item}", functions),
+            ("Operations users perform on {item} data", entities),
+        ])
+
+        chunks = self.retrieve_fused_chunks(queries, budget=max(k, FUSED_CHUNK_BUDGET))
 
         if not chunks:
             raise ValueError("No relevant chunks found for controller extraction.")
 
         # Build controller-specific prompt
-        prompt = self._build_controller_prompt(chunks)
+        with span("prompt.build"):
+            prompt = self._build_controller_prompt(chunks)
 
-        controller_json = self.llm_json(prompt)
+        controller_json = self.llm_json(prompt, schema=CONTROLLER_SCHEMA)
 
         self.save_output(controller_json, "controller_architecture.json")
 
@@ -79,7 +71,7 @@ class ControllerArchitectAgent(BaseArchitectAgent):
             context += f"\n\n--- SRS Chunk {i+1} ---\n{c}\n"
 
         # Load prompt from external file
-        prompt_path = Path(__file__).resolve().parents[3] / ".github" / "prompts" / "extract_controller_architecture.prompt.md"
+        prompt_path = Path(__file__).resolve().parents[3] / ".github" / "prompts" / self.PROMPT_FILE
         prompt_template = prompt_path.read_text(encoding="utf-8")
         
         # Replace variables in template
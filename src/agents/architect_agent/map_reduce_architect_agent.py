@@ -0,0 +1,134 @@
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional
+from pathlib import Path
+
+from src.agents.architect_agent.base_architect_agent import BaseArchitectAgent
+from src.agents.architect_agent.combined_architect_agent import CombinedArchitectAgent
+from src.core.json_repair import COMBINED_SCHEMA
+from src.core.architecture_merge import (
+    CONTROLLER_SUFFIXES, VIEW_SUFFIXES, merge_entries,
+)
+from src.core.config import MAPREDUCE_SECTION_MAX_CHARS, MAPREDUCE_MAX_WORKERS
+from src.core.profiler import span
+
+
+class MapReduceArchitectAgent(BaseArchitectAgent):
+    """
+    Map-reduce architecture extraction for very large SRS documents.
+
+    Top-k retrieval caps how much of the SRS an agent sees. This agent
+    instead covers the WHOLE document:
+
+    - map:    the SRS is split into heading-aligned sections and every section
+              gets its own combined extraction call (requirements, model,
+              controller, view); calls run concurrently.
+    - reduce: a deterministic, LLM-free merge deduplicates entities,
+              functions, controllers and views by normalised name and merges
+              their descriptions and actions.
+
+    The merged result is split into the usual per-stage files, exactly like
+    CombinedArchitectAgent.
+    """
+
+    PROMPT_FILE = CombinedArchitectAgent.PROMPT_FILE
+
+    # ----------------------------------------------------------------------
+    # Main Entry Point
+    # ----------------------------------------------------------------------
+    def extract_all(
+        self,
+        srs_path: Path,
+        max_chars: int = MAPREDUCE_SECTION_MAX_CHARS,
+        max_workers: int = MAPREDUCE_MAX_WORKERS,
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Runs the map-reduce extraction over every section of `srs_path`.
+
+        Returns:
+            {"requirements_analysis.json": {...}, "model_architecture.json": {...}, ...}
+        """
+        sections = self.rag.load_sections(srs_path, max_chars=max_chars)
+        if not sections:
+            raise ValueError(f"No content found in SRS: {srs_path}")
+
+        print(f"[MapReduceArchitectAgent] Extracting {len(sections)} section(s) "
+              f"with up to {max_workers} concurrent call(s)...")
+
+        workers = max(1, min(max_workers, len(sections)))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            # executor.map keeps document order -> merge result is deterministic
+            partials = list(executor.map(self._extract_section, range(len(sections)), sections))
+
+        partials = [p for p in partials if p is not None]
+        if not partials:
+            raise ValueError("Map-reduce extraction failed for every SRS section.")
+
+        merged = self.merge(partials)
+        print(f"[MapReduceArchitectAgent] Merged {len(partials)} section result(s): "
+              f"{len(merged['model'])} model(s), {len(merged['controller'])} controller(s), "
+              f"{len(merged['view'])} view(s)")
+
+        outputs = CombinedArchitectAgent.split_outputs(merged)
+        for filename, data in outputs.items():
+            self.save_output(data, filename)
+
+        return outputs
+
+    def _extract_section(self, index: int, section: str) -> Optional[Dict[str, Any]]:
+        """Map step: one combined extraction call for one section."""
+        with span("prompt.build"):
+            prompt = self._build_section_prompt(section)
+        try:
+            result = self.llm_json(prompt, schema=COMBINED_SCHEMA)
+        except (ValueError, ConnectionError) as e:
+            print(f"[WARN] Section {index + 1} extraction failed, skipping: {e}")
+            return None
+        if not isinstance(result, dict):
+            print(f"[WARN] Section {index + 1} returned no JSON object, skipping.")
+            return None
+        return result
+
+    def _build_section_prompt(self, section: str) -> str:
+        """
+        Builds the combined prompt with one SRS section as context.
+        """
+
+        context = f"\n\n--- SRS Section ---\n{section}\n"
+
+        # Load prompt from external file
+        prompt_path = Path(__file__).resolve().parents[3] / ".github" / "prompts" / self.PROMPT_FILE
+        prompt_template = prompt_path.read_text(encoding="utf-8")
+
+        # Replace variables in template
+        prompt = prompt_template.replace("{{context}}", context)
+
+        return prompt
+
+    # ----------------------------------------------------------------------
+    # Reduce (deterministic merge)
+    # ----------------------------------------------------------------------
+    @classmethod
+    def merge(cls, partials: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Merges per-section results in document order (no LLM call)."""
+        names = [str(p.get("project_name") or "").strip() for p in partials]
+        names = [n for n in names if n]
+        if names:
+            counts = Counter(names)
+            # Most frequent name; ties go to the first one seen
+            project_name = max(names, key=lambda n: (counts[n], -names.index(n)))
+        else:
+            project_name = ""
+
+        return {
+            "project_name": project_name,
+            "domain_entities": merge_entries(p.get("domain_entities") for p in partials),
+            "system_functions": merge_entries(p.get("system_functions") for p in partials),
+            "model": merge_entries(p.get("model") for p in partials),
+            "controller": merge_entries(
+                (p.get("controller") for p in partials), strip_suffixes=CONTROLLER_SUFFIXES
+            ),
+            "view": merge_entries(
+                (p.get("view") for p in partials), strip_suffixes=VIEW_SUFFIXES
+            ),
+        }
@@ -3,7 +3,9 @@ from typing import List, Dict, Any
 from pathlib import Path
 
 from src.agents.architect_agent.base_architect_agent import BaseArchitectAgent
+from src.core.json_repair import MODEL_SCHEMA
 from src.core.config import DEFAULT_TOP_K
+from src.core.profiler import span
 
 
 class ModelArchitectAgent(BaseArchitectAgent):
@@ -15,22 +17,7 @@ class ModelArchitectAgent(BaseArchitectAgent):
     output to perform a more targeted RAG search.
     """
 
-    def _load_analysis(self, filename: str = "requirements_analysis.json") -> Dict[str, Any]:
-        """Loads structured JSON output from a previous agent (Requirements Agent)."""
-        analysis_path = self.data_dir / filename
-        if not analysis_path.exists():
-            raise FileNotFoundError(
-                f"Required analysis file not found: {filename}. "
-                "Ensure RequirementsAgent has run successfully."
-            )
-        try:
-            with open(analysis_path, "r", encoding="utf-8") as f:
-                return json.load(f)
-        except json.JSONDecodeError as e:
-            raise ValueError(
-                f"Could not decode JSON in {filename}. "
-                f"LLM produced malformed JSON. Error: {e}"
-            )
+    PROMPT_FILE = "extract_model_architecture.prompt.md"
 
     # ----------------------------------------------------------------------
     # Main Entry Point
@@ -40,7 +27,7 @@ class ModelArchitectAgent(BaseArchitectAgent):
         High-level method for extracting model architecture using targeted RAG.
         """
 
-        analysis_data = self._load_analysis()
+        analysis_data = self._load_analysis("requirements_analysis.json")
         entities = [e['name'] for e in analysis_data.get('domain_entities', [])]
         
         if not entities:
@@ -58,8 +45,9 @@ class ModelArchitectAgent(BaseArchitectAgent):
         if not chunks:
             raise ValueError("No relevant chunks found for model extraction.")
 
-        prompt = self._build_model_prompt(chunks)
-        model_json = self.llm_json(prompt)
+        with span("prompt.build"):
+            prompt = self._build_model_prompt(chunks)
+        model_json = self.llm_json(prompt, schema=MODEL_SCHEMA)
         self.save_output(model_json, "model_architecture.json")
 
         return model_json
@@ -74,7 +62,7 @@ class ModelArchitectAgent(BaseArchitectAgent):
             context += f"\n\n--- SRS Chunk {i+1} ---\n{c}\n"
 
         # Load prompt from external file
-        prompt_path = Path(__file__).resolve().parents[3] / ".github" / "prompts" / "extract_model_architecture.prompt.md"
+        prompt_path = Path(__file__).resolve().parents[3] / ".github" / "prompts" / self.PROMPT_FILE
         prompt_template = prompt_path.read_text(encoding="utf-8")
         
         # Replace variables in template
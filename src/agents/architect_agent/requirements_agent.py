@@ -1,8 +1,10 @@
 import json
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 
 from src.agents.architect_agent.base_architect_agent import BaseArchitectAgent
+from src.core.json_repair import REQUIREMENTS_SCHEMA
 from src.core.config import DEFAULT_TOP_K, REQUIREMENTS_TOP_K
+from src.core.profiler import span
 
 
 class RequirementsAgent(BaseArchitectAgent):
@@ -13,8 +15,14 @@ class RequirementsAgent(BaseArchitectAgent):
     This structured output is saved to 'requirements_analysis.json' and is used 
     by subsequent specialized agents (Model/Controller) to perform highly 
     targeted RAG queries, mitigating information loss.
+
+    For long documents the RAG pipeline provides a hierarchical summary tree;
+    the prompt then carries a fixed-size summary of the whole SRS plus a
+    small number of top-k chunks instead of a growing number of chunks.
     """
 
+    PROMPT_FILE = "extract_requirements.prompt.md"
+
     def extract_analysis(self, k: int = REQUIREMENTS_TOP_K) -> Dict[str, Any]:
         """
         Extracts structured requirements by performing a general RAG query and 
@@ -26,32 +34,42 @@ class RequirementsAgent(BaseArchitectAgent):
             "all high-level system functions/workflows described. Focus on the 'what' and 'who'."
         )
         
+        summary_tree = getattr(self.rag, "summary_tree", None)
+        summary_context = None
+        if summary_tree is not None:
+            # Whole-document coverage comes from the summaries; keep chunk count fixed
+            summary_context = summary_tree.context()
+            k = min(k, DEFAULT_TOP_K)
+
         chunks = self.retrieve_chunks(query, k=k)
 
         if not chunks:
             raise ValueError("No relevant chunks found for requirements analysis.")
 
-        prompt = self._build_requirements_prompt(chunks)
+        with span("prompt.build"):
+            prompt = self._build_requirements_prompt(chunks, summary_context=summary_context)
 
-        analysis_json = self.llm_json(prompt)
+        analysis_json = self.llm_json(prompt, schema=REQUIREMENTS_SCHEMA)
 
         self.save_output(analysis_json, "requirements_analysis.json")
 
         return analysis_json
 
 
-    def _build_requirements_prompt(self, chunks: List[str]) -> str:
+    def _build_requirements_prompt(self, chunks: List[str], summary_context: Optional[str] = None) -> str:
         """
         Builds the detailed LLM prompt for extracting structured requirements.
         """
         from pathlib import Path
         
         context = ""
+        if summary_context:
+            context += f"\n\n{summary_context}\n"
         for i, c in enumerate(chunks):
             context += f"\n\n--- SRS Chunk {i+1} ---\n{c}\n"
 
         # Load prompt from external file
-        prompt_path = Path(__file__).resolve().parents[3] / ".github" / "prompts" / "extract_requirements.prompt.md"
+        prompt_path = Path(__file__).resolve().parents[3] / ".github" / "prompts" / self.PROMPT_FILE
         prompt_template = prompt_path.read_text(encoding="utf-8")
         
         # Replace variables in template
@@ -3,7 +3,10 @@ from typing import List, Dict, Any
 from pathlib import Path
 
 from src.agents.architect_agent.base_architect_agent import BaseArchitectAgent
-from src.core.config import DEFAULT_TOP_K
+from src.core.json_repair import VIEW_SCHEMA
+from src.core.config import DEFAULT_TOP_K, FUSED_CHUNK_BUDGET
+from src.rag.query_planner import QueryPlanner
+from src.core.profiler import span
 
 
 class ViewArchitectAgent(BaseArchitectAgent):
@@ -16,22 +19,7 @@ class ViewArchitectAgent(BaseArchitectAgent):
     (Models) and business logic (Controllers).
     """
 
-    def _load_analysis(self, filename: str) -> Dict[str, Any]:
-        """Loads structured JSON output from a previous agent."""
-        analysis_path = self.data_dir / filename
-        if not analysis_path.exists():
-            raise FileNotFoundError(
-                f"Required analysis file not found: {filename}. "
-                "Ensure preceding agents have run successfully."
-            )
-        try:
-            with open(analysis_path, "r", encoding="utf-8") as f:
-                return json.load(f)
-        except json.JSONDecodeError as e:
-            raise ValueError(
-                f"Could not decode JSON in {filename}. "
-                f"LLM produced malformed JSON. Error: {e}"
-            )
+    PROMPT_FILE = "extract_view_architecture.prompt.md"
 
     # ----------------------------------------------------------------------
     # Main Entry Point
@@ -53,22 +41,25 @@ class ViewArchitectAgent(BaseArchitectAgent):
             actions = ctrl.get('actions', [])
             controller_actions.extend([f"{ctrl_name}.{a}" for a in actions])
 
-        entities_list = ", ".join(entities) if entities else "core data models"
-        actions_list = ", ".join(controller_actions) if controller_actions else "system actions"
-
-        query = (
-            f"For the data models: [{entities_list}] and the actions: [{actions_list}], "
-            "identify all user interfaces, screens, components, and "
+        focus = (
+            "Identify all user interfaces, screens, components, and "
             "navigation flows described in the SRS. Focus on data presentation and action triggering."
         )
 
-        chunks = self.retrieve_chunks(query, k=k)
+        # One focused sub-query per entity / controller action instead of one long list
+        queries = QueryPlanner().plan(focus, [
+            ("Screen or page that displays {item}", entities),
+            ("User interface that triggers {item}", controller_actions),
+        ])
+
+        chunks = self.retrieve_fused_chunks(queries, budget=max(k, FUSED_CHUNK_BUDGET))
 
         if not chunks:
             raise ValueError("No relevant chunks found for view-layer extraction.")
 
-        prompt = self._build_view_prompt(chunks)
-        view_json = self.llm_json(prompt)
+        with span("prompt.build"):
+            prompt = self._build_view_prompt(chunks)
+        view_json = self.llm_json(prompt, schema=VIEW_SCHEMA)
 
         # Save output into /data folder
         self.save_output(view_json, "view_architecture.json")
@@ -85,7 +76,7 @@ class ViewArchitectAgent(BaseArchitectAgent):
             context += f"\n\n--- SRS Chunk {i+1} ---\n{c}\n"
 
         # Load prompt from external file
-        prompt_path = Path(__file__).resolve().parents[3] / ".github" / "prompts" / "extract_view_architecture.prompt.md"
+        prompt_path = Path(__file__).resolve().parents[3] / ".github" / "prompts" / self.PROMPT_FILE
         prompt_template = prompt_path.read_text(encoding="utf-8")
         
         # Replace variables in template
@@ -0,0 +1,444 @@
+# src/agents/code_generator_agent.py
+
+import json
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from src.agents.scaffolder.mvc_scaffolder import MVCScaffolder
+from src.core.config import (
+    CHROMA_PERSIST_DIR, GENERATION_TOP_K, GENERATION_MAX_WORKERS,
+    GENERATION_RATE_LIMIT_RETRIES, RETRIEVAL_CONTEXTS_FILE, LLM_MODEL_NAME,
+)
+from src.core.errors import QuotaExceededError, LLMConnectionError
+from src.core.manifest import BuildManifest, hash_json, hash_text
+from src.core.artifact_store import atomic_write_text
+from src.core.events import events
+from src.core.eta import EtaTracker, predict_call
+from src.core.profiler import span
+from src.core import workspace
+from src.core.rate_limiter import llm_rate_limiter
+from src.rag.retrieval_contexts import (
+    RETRIEVAL_CATEGORIES, QUERY_BUILDERS, load_retrieval_contexts, context_chunks, contexts_are_current,
+)
+
+
+class CodeGeneratorAgent:
+    """
+    Fills scaffold classes (scaffolds/mvc_skeleton/<category>s/*.py) with real
+    code and writes them to generated_src/<category>s/.
+
+    Work is split into one task per scaffold file across all requested
+    categories. SRS contexts are resolved up front (precomputed retrieval
+    contexts, then ONE batched RAG query for the rest, then the SRS head), and
+    the LLM calls run on a bounded worker pool paced by the process-wide LLM
+    rate limiter, so total time is bound by the quota instead of by serial
+    round trips. Each file is written as soon as its call completes.
+
+    With a manifest (data/codegen_manifest.json), every written file is
+    checkpointed with the hashes of its inputs (skeleton, architecture item,
+    SRS context, template, model). Files whose inputs are unchanged and whose
+    output still exists are skipped, so an interrupted run resumes where it
+    stopped and an architecture edit only regenerates the affected classes.
+    """
+
+    CATEGORIES = ("model", "controller", "view")
+
+    def __init__(
+        self,
+        project_root: Path,
+        architecture: Dict[str, Any],
+        llm_client,
+        arch_path: Optional[Path] = None,
+        project: Optional[str] = None,
+        manifest: Optional[BuildManifest] = None,
+        force: bool = False,
+        srs_hash: Optional[str] = None,
+        retrieval_contexts: Optional[Dict[str, Any]] = None,
+    ):
+        self.project_root = Path(project_root)
+        self.architecture = architecture
+        # Hash of the SRS the architecture was extracted from (architecture_map.json)
+        self.srs_hash = srs_hash
+        self.llm_client = llm_client
+        self.project = project
+        # Per-file checkpoints: files whose inputs are unchanged are not regenerated
+        self.manifest = manifest
+        self.force = force
+
+        self.srs_path = self.project_root / "data" / "srs_document.txt"
+        self.srs_head = self.srs_path.read_text(encoding="utf-8")[:5000] if self.srs_path.exists() else None
+        self.precomputed = self._load_precomputed(arch_path, retrieval_contexts)
+
+        self._rag = None
+        self._rag_failed = False
+        self._stop = threading.Event()
+
+    # ----------------------------------------------------------------------
+    # Tasks
+    # ----------------------------------------------------------------------
+    def build_tasks(self, categories: Iterable[str]) -> List[Dict[str, Any]]:
+        """One task (skeleton, architecture item, prompt, output path) per scaffold file."""
+        tasks: List[Dict[str, Any]] = []
+        for category in categories:
+            category_plural = f"{category}s"
+            scaffold_dir = self.project_root / "scaffolds" / "mvc_skeleton" / category_plural
+            if not scaffold_dir.exists():
+                raise FileNotFoundError(
+                    f"Scaffold directory not found: {scaffold_dir}. Run 'scaffold' command first."
+                )
+            scaffold_files = sorted(scaffold_dir.glob("*.py"))
+            if not scaffold_files:
+                raise FileNotFoundError(
+                    f"No scaffold files found in {scaffold_dir}. Run 'scaffold' command first."
+                )
+
+            template_path = self.template_path(category)
+            if not template_path.exists():
+                raise FileNotFoundError(f"Prompt template not found: {template_path}")
+
+            generated_dir = self.project_root / "generated_src" / category_plural
+            generated_dir.mkdir(parents=True, exist_ok=True)
+
+            for scaffold_file in scaffold_files:
+                skeleton = scaffold_file.read_text(encoding="utf-8")
+                # Extract class name from skeleton
+                class_match = re.search(r'class\s+(\w+)', skeleton)
+                class_name = class_match.group(1) if class_match else scaffold_file.stem
+                tasks.append({
+                    "category": category,
+                    "file_name": scaffold_file.name,
+                    "class_name": class_name,
+                    "skeleton": skeleton,
+                    "arch_item": self.match_arch_item(category, class_name),
+                    "output_file": generated_dir / scaffold_file.name,
+                })
+
+        self._attach_contexts(tasks)
+        templates = {category: self.template_path(category).read_text(encoding="utf-8")
+                     for category in {task["category"] for task in tasks}}
+        for task in tasks:
+            with span("prompt.build", file=task["file_name"]):
+                task["prompt"] = self.build_prompt(task, templates[task["category"]])
+            task["inputs"] = self.task_inputs(task, templates[task["category"]])
+        return tasks
+
+    def task_inputs(self, task: Dict[str, Any], template: str) -> Dict[str, Any]:
+        """Everything the generated file depends on, as hashes (checkpoint fingerprint)."""
+        inputs = {
+            "skeleton": hash_text(task["skeleton"]),
+            "arch_item": hash_json(task["arch_item"] or {}),
+            "srs_context": hash_text(task["srs_context"]),
+            "template": hash_text(template),
+            # No client in --dry-run: the configured model is the one a real run uses
+            "model_name": getattr(self.llm_client, "model_name", None) or LLM_MODEL_NAME,
+        }
+        if task["category"] == "controller":
+            # Controller prompts also embed the first models and views
+            inputs["related"] = hash_json([self.architecture.get("model", [])[:3],
+                                           self.architecture.get("view", [])[:3]])
+        return inputs
+
+    @staticmethod
+    def call_kind(category: str) -> str:
+        """Kind of the category's LLM calls in the latency history."""
+        return f"generate-code.{category}"
+
+    @staticmethod
+    def task_label(task: Dict[str, Any]) -> str:
+        """Output path relative to generated_src/, e.g. "models/user.py"."""
+        return f"{task['category']}s/{task['file_name']}"
+
+    @staticmethod
+    def checkpoint_key(task: Dict[str, Any]) -> str:
+        return f"{task['category']}/{task['file_name']}"
+
+    def is_up_to_date(self, task: Dict[str, Any]) -> bool:
+        if self.manifest is None or self.force:
+            return False
+        # Existence only: run-fix edits generated files in place
+        return self.manifest.is_fresh(
+            self.checkpoint_key(task),
+            self.manifest.fingerprint(task["inputs"]),
+            check_output_hashes=False,
+        )
+
+    def template_path(self, category: str) -> Path:
+        # Prompt templates live in the code root, not in the workspace
+        return workspace.prompts_dir() / f"generate_{category}_code.prompt.md"
+
+    def match_arch_item(self, category: str, class_name: str) -> Optional[Dict[str, Any]]:
+        """Architecture item the scaffold class was generated from."""
+        arch_items = self.architecture.get(category, [])
+        # Exact match on the class name the scaffolder generated for the item first
+        for item in arch_items:
+            if MVCScaffolder.class_name_for(category, item.get("name", "")) == class_name:
+                return item
+        for item in arch_items:
+            item_name = item.get("name", "").lower()
+            if (item_name == class_name.lower() or
+                item_name.replace('view', '').replace('controller', '') ==
+                class_name.lower().replace('view', '').replace('controller', '')):
+                return item
+        return arch_items[0] if arch_items else None  # Fallback to first item
+
+    def build_prompt(self, task: Dict[str, Any], template: str) -> str:
+        prompt = template
+        prompt = prompt.replace("{{class_name}}", task["class_name"])
+        prompt = prompt.replace("{{file_name}}", task["file_name"])
+        prompt = prompt.replace("{{skeleton}}", task["skeleton"])
+        prompt = prompt.replace("{{arch_info}}", json.dumps(task["arch_item"] or {}, indent=2))
+        prompt = prompt.replace("{{srs_context}}", task["srs_context"])
+
+        # For controllers, add related models and views
+        if task["category"] == "controller":
+            related_models = json.dumps(self.architecture.get("model", [])[:3], indent=2)
+            related_views = json.dumps(self.architecture.get("view", [])[:3], indent=2)
+            prompt = prompt.replace("{{related_models}}", related_models)
+            prompt = prompt.replace("{{related_views}}", related_views)
+        return prompt
+
+    # ----------------------------------------------------------------------
+    # SRS contexts
+    # ----------------------------------------------------------------------
+    def _load_precomputed(
+        self, arch_path: Optional[Path], precomputed: Optional[Dict[str, Any]] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Per-class retrieval contexts written by 'extract' (None if missing or
+        stale). `precomputed` is the document handed over in memory by a
+        pipeline run; otherwise the file is read.
+        """
+        candidates = [self.project_root / "data" / RETRIEVAL_CONTEXTS_FILE]
+        if arch_path is not None:
+            candidates.insert(0, Path(arch_path).parent / RETRIEVAL_CONTEXTS_FILE)
+
+        for candidate in candidates if precomputed is None else []:
+            precomputed = load_retrieval_contexts(candidate)
+            if precomputed is not None:
+                break
+        # Compared with what the extraction actually indexed, not with data/srs_document.txt
+        # (extract --srs-path may have read another file)
+        if precomputed is not None and not contexts_are_current(precomputed, self.architecture, self.srs_hash):
+            print("[WARN] Precomputed retrieval contexts are from another SRS or architecture version, "
+                  "ignoring them.")
+            return None
+        if precomputed is not None:
+            print("[INFO] Using precomputed retrieval contexts (no embedding model needed).")
+        return precomputed
+
+    def _get_rag(self):
+        """Creates and indexes the RAG pipeline on first use (None if unavailable)."""
+        if self._rag is None and not self._rag_failed:
+            if not self.srs_path.exists():
+                self._rag_failed = True
+                return None
+            try:
+                from src.rag.rag_pipeline import RAGPipeline
+                rag_pipeline = RAGPipeline(
+                    llm_client=self.llm_client,
+                    persist_directory=self.project_root / CHROMA_PERSIST_DIR,
+                    project=self.project,
+                )
+                # Persistent store: index_srs skips the document if its content is unchanged
+                info = rag_pipeline.index_srs(self.srs_path)
+                if info.get("skipped"):
+                    print("[INFO] SRS already indexed, using existing RAG index.")
+                else:
+                    print("[INFO] Indexed SRS for RAG retrieval.")
+                self._rag = rag_pipeline
+            except Exception as e:
+                print(f"[WARN] Could not index SRS: {e}")
+                print(f"[WARN] Will use limited SRS context (first 5000 chars)")
+                self._rag_failed = True
+        return self._rag
+
+    def _attach_contexts(self, tasks: List[Dict[str, Any]]) -> None:
+        """
+        Sets task["srs_context"]: precomputed chunks for views/controllers,
+        one batched live RAG query for classes without them, SRS head otherwise.
+        """
+        fallback = self.srs_head or "SRS content not available."
+        missing = []
+        for task in tasks:
+            task["srs_context"] = fallback
+            if task["category"] not in RETRIEVAL_CATEGORIES:
+                continue
+            chunks = context_chunks(self.precomputed, task["category"], task["class_name"]) \
+                if self.precomputed else None
+            if chunks:
+                task["srs_context"] = "\n\n".join(chunks)
+            else:
+                missing.append(task)
+
+        if not missing or self._get_rag() is None:
+            return
+
+        print(f"[INFO] Retrieving SRS sections for {len(missing)} class(es) in one batch...")
+        try:
+            queries = [QUERY_BUILDERS[t["category"]](t["class_name"], t["arch_item"]) for t in missing]
+            result = self._get_rag().search_many(queries, k=GENERATION_TOP_K)
+            docs_per_query = result.get("documents") or []
+            for index, task in enumerate(missing):
+                docs = docs_per_query[index] if index < len(docs_per_query) else []
+                if docs:
+                    task["srs_context"] = "\n\n".join(docs)  # Combine chunks
+        except Exception as e:
+            print(f"[WARN] RAG retrieval failed: {e}, using full SRS (first 5000 chars)")
+
+    # ----------------------------------------------------------------------
+    # Generation
+    # ----------------------------------------------------------------------
+    def run(
+        self,
+        tasks: List[Dict[str, Any]],
+        jobs: int = GENERATION_MAX_WORKERS,
+    ) -> Dict[str, Any]:
+        """
+        Runs `tasks` on up to `jobs` workers. A daily-quota or connection error
+        stops the remaining tasks; other per-file errors are reported and skipped.
+
+        Returns:
+            {"tasks": [...], "generated": [task, ...], "skipped": [task, ...],
+             "failed": [(task, error), ...],
+             "quota_error": str or None, "connection_error": str or None}
+        """
+        summary: Dict[str, Any] = {
+            "tasks": tasks, "generated": [], "skipped": [], "failed": [],
+            "quota_error": None, "connection_error": None,
+        }
+        summary["skipped"] = [task for task in tasks if self.is_up_to_date(task)]
+        if summary["skipped"]:
+            print(f"[INFO] {len(summary['skipped'])} file(s) up to date, skipping "
+                  f"(inputs unchanged since last generation).")
+            skipped = {id(task) for task in summary["skipped"]}
+            tasks = [task for task in tasks if id(task) not in skipped]
+        if not tasks:
+            return summary
+
+        workers = max(1, min(jobs, len(tasks)))
+        print(f"[INFO] Generating {len(tasks)} file(s) with {workers} worker(s)...")
+        self._stop.clear()
+        predictions = {
+            self.task_label(task): predict_call(self.call_kind(task["category"]), len(task["prompt"]))
+            for task in tasks
+        }
+        eta = EtaTracker(
+            "generate-code",
+            {label: seconds for label, (seconds, _) in predictions.items()},
+            workers=workers,
+            min_interval=llm_rate_limiter.min_interval,
+            from_history=all(known for _, known in predictions.values()),
+        )
+        eta.start()
+
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="codegen") as executor:
+            futures = {executor.submit(self.generate_file, task): task for task in tasks}
+            done = 0
+            for future in as_completed(futures):
+                if future.cancelled():
+                    continue
+                task = futures[future]
+                label = self.task_label(task)
+                try:
+                    elapsed = future.result()
+                except QuotaExceededError as qe:
+                    if summary["quota_error"] is None:
+                        summary["quota_error"] = str(qe)
+                    self._cancel(futures)
+                    continue
+                except LLMConnectionError as lce:
+                    if summary["connection_error"] is None:
+                        summary["connection_error"] = str(lce)
+                    self._cancel(futures)
+                    continue
+                except Exception as e:
+                    done += 1
+                    print(f"[{done}/{len(tasks)}] ✗ Error generating code for {label}: {e}")
+                    events.progress("generate-code", done, len(tasks), item=label, status="failed")
+                    summary["failed"].append((task, str(e)))
+                    eta.finish(label)
+                    continue
+
+                if elapsed is None:
+                    continue  # Stopped before its call
+                done += 1
+                summary["generated"].append(task)
+                print(f"[{done}/{len(tasks)}] ✓ Code generated: "
+                      f"{task['output_file'].relative_to(self.project_root)} ({elapsed:.1f}s)")
+                events.progress("generate-code", done, len(tasks), item=label, status="ok")
+                # Pacing waits are replayed by the tracker, only the call time corrects it
+                eta.finish(label, elapsed - task.get("waited_s", 0.0))
+
+        # Report in task order, not completion order
+        order = {id(task): index for index, task in enumerate(tasks)}
+        summary["generated"].sort(key=lambda t: order[id(t)])
+        return summary
+
+    def _cancel(self, futures) -> None:
+        self._stop.set()
+        for future in futures:
+            future.cancel()
+
+    def generate_file(self, task: Dict[str, Any]) -> Optional[float]:
+        """
+        Worker: one paced LLM call (retried after rate-limit responses), then
+        writes the output file. Returns the seconds spent, None if stopped.
+        """
+        started = time.perf_counter()
+        task["waited_s"] = 0.0
+        attempts = GENERATION_RATE_LIMIT_RETRIES + 1
+        for attempt in range(1, attempts + 1):
+            if self._stop.is_set():
+                return None
+            # Acquired here (not in generate_content) to measure the wait and to
+            # skip the call if another worker hit the daily quota meanwhile
+            task["waited_s"] += llm_rate_limiter.acquire()
+            if self._stop.is_set():
+                return None
+            try:
+                generated_code = self.llm_client.generate_content(
+                    task["prompt"], kind=self.call_kind(task["category"]), paced=False
+                )
+                break
+            except LLMConnectionError as e:
+                retry_after = self._retry_after(str(e))
+                if retry_after is None or attempt == attempts:
+                    raise
+                print(f"  → Rate limit for {task['file_name']}, retrying in {retry_after:.0f}s "
+                      f"({attempt}/{attempts - 1})...")
+                time.sleep(retry_after)
+
+        with span("file.write", file=task["file_name"]):
+            # Atomic: a concurrent reader (audit, IDE) never sees a half-written file
+            atomic_write_text(task["output_file"], self.clean_code(generated_code), durable=False)
+        if self.manifest is not None:
+            # Checkpoint right away: a later quota stop keeps this file
+            self.manifest.record(
+                self.checkpoint_key(task),
+                self.manifest.fingerprint(task["inputs"]),
+                task["inputs"],
+                [task["output_file"]],
+            )
+        return time.perf_counter() - started
+
+    @staticmethod
+    def _retry_after(error_message: str) -> Optional[float]:
+        """Seconds to wait for a rate-limit error, None for other connection errors."""
+        match = re.search(r"Rate limit reached\. Retry after (\d+(?:\.\d+)?) seconds", error_message)
+        return float(match.group(1)) if match else None
+
+    @staticmethod
+    def clean_code(generated_code: str) -> str:
+        """Removes markdown code fences around the generated code."""
+        generated_code = (generated_code or "").strip()
+        if generated_code.startswith("```python"):
+            generated_code = generated_code[9:]  # Remove ```python
+        if generated_code.startswith("```"):
+            generated_code = generated_code[3:]  # Remove ```
+        if generated_code.endswith("```"):
+            generated_code = generated_code[:-3]  # Remove trailing ```
+        return generated_code.strip()
@@ -5,8 +5,12 @@ from pathlib import Path
 import json
 import ast
 import re
+import time
 
 from src.agents.architect_agent.base_architect_agent import BaseArchitectAgent
+from src.core.profiler import span
+from src.core.eta import EtaTracker, predict_call
+from src.core import workspace
 
 
 class RecommendationFixerAgent(BaseArchitectAgent):
@@ -18,14 +22,18 @@ class RecommendationFixerAgent(BaseArchitectAgent):
 
     def __init__(self, rag_pipeline=None, llm_client=None):
         super().__init__(rag_pipeline, llm_client)
-        self.project_root = Path(__file__).resolve().parents[2]
+        self.project_root = workspace.workspace_root()
 
-    def apply_recommendations(self, audit_report_path: Path = None) -> Dict[str, Any]:
+    def apply_recommendations(
+        self, audit_report_path: Path = None, audit_report: Dict[str, Any] = None
+    ) -> Dict[str, Any]:
         """
         Reads audit report and applies all recommendations automatically.
         
         Args:
             audit_report_path: Path to final_audit_report.json. If None, uses default location.
+            audit_report: Report already in memory (handed over by the pipeline's audit
+                          stage); the file is not read then.
         
         Returns:
             Dict with fix results
@@ -39,7 +47,7 @@ class RecommendationFixerAgent(BaseArchitectAgent):
             audit_report_path = self.data_dir / "final_audit_report.json"
         
         # 2. Rapor yoksa işlemi durdur
-        if not audit_report_path.exists():
+        if audit_report is None and not audit_report_path.exists():
             return {
                 "success": False,
                 "error": f"Audit report not found: {audit_report_path}",
@@ -47,8 +55,9 @@ class RecommendationFixerAgent(BaseArchitectAgent):
             }
 
         try:
-            with open(audit_report_path, "r", encoding="utf-8") as f:
-                audit_report = json.load(f)
+            if audit_report is None:
+                with open(audit_report_path, "r", encoding="utf-8") as f:
+                    audit_report = json.load(f)
         except Exception as e:
             return {
                 "success": False,
@@ -72,6 +81,12 @@ class RecommendationFixerAgent(BaseArchitectAgent):
         fixed_files = []
         failed_files = []
 
+        # Import fixes are instant, the rest is one LLM call each; measured times correct the ETA
+        fix_seconds, from_history = predict_call("fix")
+        eta = EtaTracker("run-fix", {str(idx): fix_seconds for idx in range(1, len(recommendations) + 1)},
+                         from_history=from_history)
+        eta.start()
+
         for idx, rec in enumerate(recommendations, 1):
             file_path_str = rec.get("file", "")
             violation_type = rec.get("violation_type", "")
@@ -79,6 +94,7 @@ class RecommendationFixerAgent(BaseArchitectAgent):
             problem = rec.get("problem", "")
 
             print(f"[{idx}/{len(recommendations)}] Processing: {Path(file_path_str).name}")
+            started = time.perf_counter()
 
             try:  
                 result = self._apply_single_recommendation(
@@ -109,6 +125,8 @@ class RecommendationFixerAgent(BaseArchitectAgent):
                 })
                 print(f"  ❌ Exception: {e}")
 
+            eta.finish(str(idx), time.perf_counter() - started)
+
         print(f"\n[Recommendation Fixer] ✅ Fixed {len(fixed_files)} file(s), ❌ Failed {len(failed_files)} file(s)")
 
         return {
@@ -341,16 +359,17 @@ class RecommendationFixerAgent(BaseArchitectAgent):
         Uses LLM to apply the recommendation with strict protection.
         Only the specific issue mentioned in the recommendation is fixed.
         """
-        prompt = self._build_fixer_prompt(
-            file_path=file_path,
-            original_code=original_code,
-            violation_type=violation_type,
-            recommendation=recommendation,
-            problem=problem
-        )
+        with span("prompt.build"):
+            prompt = self._build_fixer_prompt(
+                file_path=file_path,
+                original_code=original_code,
+                violation_type=violation_type,
+                recommendation=recommendation,
+                problem=problem
+            )
 
         try:
-            response = self.llm.generate_content(prompt, stream=False)
+            response = self.llm.generate_content(prompt, stream=False, kind="fix")
             
             # Extract code from response (might be wrapped in code blocks)
             fixed_code = self._extract_code_from_response(response)
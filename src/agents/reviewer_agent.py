@@ -2,6 +2,8 @@ from typing import Dict, Any, List
 import json
 
 from src.agents.architect_agent.base_architect_agent import BaseArchitectAgent 
+from src.core.json_repair import AUDIT_REPORT_SCHEMA
+from src.core.profiler import span
 
 class ReviewerAgent(BaseArchitectAgent):
     """
@@ -44,23 +46,16 @@ class ReviewerAgent(BaseArchitectAgent):
             try:
                 violations_str = json.dumps(technical_violations, indent=2)
                 print(f"[ReviewerAgent] Sending {len(technical_violations)} violation(s) to Google Gemini API...")
-                prompt = self._build_reviewer_prompt(violations_str)
-                report_json = self.llm_json(prompt)
-                
-                if not report_json:
-                    print(f"[ReviewerAgent] Warning: LLM returned empty response")
-                    report = {
-                        "audit_summary": "Review complete. LLM returned empty response.",
-                        "passed": False,
-                        "recommendations": []
-                    }
-                else:
-                    report = {
-                        "audit_summary": report_json.get("summary", "Review complete. See details."),
-                        "passed": False,
-                        "recommendations": report_json.get("recommendations", [])
-                    }
-                    print(f"[ReviewerAgent] Generated report with {len(report.get('recommendations', []))} recommendation(s)")
+                with span("prompt.build"):
+                    prompt = self._build_reviewer_prompt(violations_str)
+                # Validated against the schema: both keys are always present
+                report_json = self.llm_json(prompt, schema=AUDIT_REPORT_SCHEMA)
+                report = {
+                    "audit_summary": report_json["summary"],
+                    "passed": False,
+                    "recommendations": report_json["recommendations"]
+                }
+                print(f"[ReviewerAgent] Generated report with {len(report['recommendations'])} recommendation(s)")
             except Exception as e:
                 print(f"[ReviewerAgent] Error generating report from LLM: {e}")
                 import traceback
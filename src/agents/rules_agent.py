@@ -1,9 +1,12 @@
 import ast
-import json
 from typing import Dict, List
 from pathlib import Path
 import re
 
+from src.core.profiler import span
+from src.core.artifact_store import ArtifactStore
+from src.core import workspace
+
 
 class RulesAgent:
     """
@@ -14,9 +17,10 @@ class RulesAgent:
     def __init__(self, rag_pipeline=None, llm_client=None):
         """Initialize RulesAgent. Parameters kept for compatibility but not used."""
         # Only need data_dir, no need for BaseArchitectAgent inheritance
-        project_root = Path(__file__).resolve().parents[2]
-        self.data_dir = project_root / "data"
-        self.data_dir.mkdir(exist_ok=True)
+        self.data_dir = workspace.data_dir()
+        self.data_dir.mkdir(parents=True, exist_ok=True)
+        # Version info of the last violations.json written (see src/core/artifact_store.py)
+        self.last_output = None
     
     def detect_violations(self, scaffold_root: Path) -> List[Dict[str, str]]:
         """
@@ -27,7 +31,8 @@ class RulesAgent:
         violations = []
         
         # Direct file scanning - no architecture map needed
-        violations.extend(self._check_mvc_dependency_violations_direct(scaffold_root))
+        with span("rules.scan", root=str(scaffold_root)):
+            violations.extend(self._check_mvc_dependency_violations_direct(scaffold_root))
         
         # Save violations to violations.json (Structured Output)
         violations_output = {
@@ -35,12 +40,11 @@ class RulesAgent:
             "total_count": len(violations)
         }
         
-        self.data_dir.mkdir(parents=True, exist_ok=True)
-        violations_file = self.data_dir / "violations.json"
         try:
-            with open(violations_file, "w", encoding="utf-8") as f:
-                json.dump(violations_output, f, indent=4, ensure_ascii=False)
-            print(f"[RulesAgent] Violations saved to: {violations_file}")
+            # Atomic write: readers (ReviewerAgent, extension) never see a partial file
+            self.last_output = ArtifactStore(self.data_dir).write("violations.json", violations_output)
+            print(f"[RulesAgent] Violations saved to: {self.last_output['path']} "
+                  f"(version {self.last_output['version']})")
         except Exception as e:
             print(f"[RulesAgent] Warning: Could not save violations.json: {e}")
         
@@ -1,6 +1,9 @@
 from pathlib import Path
 from typing import Dict, List, Any
 
+from src.core.profiler import span
+from src.core import workspace
+
 
 class MVCScaffolder:
     """
@@ -27,10 +30,9 @@ class MVCScaffolder:
         project_root: Path | None = None,
         scaffold_root: Path | None = None,
     ) -> None:
-        # Default project root: repo root (folder that contains src/, ui/, data/, etc.)
-        # mvc_scaffolder.py is in src/agents/scaffolder/, so parents[3] = project root
+        # Default project root: the active workspace (repo root unless MVC_WORKSPACE_ROOT is set)
         if project_root is None:
-            self.project_root = Path(__file__).resolve().parents[3]
+            self.project_root = workspace.workspace_root()
         else:
             self.project_root = Path(project_root).resolve()
 
@@ -69,10 +71,11 @@ class MVCScaffolder:
         
         self._ensure_base_dirs()
 
-        created_models = self._scaffold_models(architecture.get("model", []))
-        created_views = self._scaffold_views(architecture.get("view", []))
-        created_controllers = self._scaffold_controllers(architecture.get("controller", [])
-        )
+        with span("file.write", stage="scaffold"):
+            created_models = self._scaffold_models(architecture.get("model", []))
+            created_views = self._scaffold_views(architecture.get("view", []))
+            created_controllers = self._scaffold_controllers(architecture.get("controller", [])
+            )
 
         return {
             "models": created_models,
@@ -94,7 +97,18 @@ class MVCScaffolder:
         (self.scaffold_root / "views").mkdir(parents=True, exist_ok=True)
         (self.scaffold_root / "controllers").mkdir(parents=True, exist_ok=True)
 
-    def _safe_class_name(self, raw_name: str) -> str:
+    @classmethod
+    def class_name_for(cls, category: str, raw_name: str) -> str:
+        """Class (and file) name generated for an architecture item of `category`."""
+        base = cls._safe_class_name(raw_name)
+        if category == "view":
+            return base + "View"
+        if category == "controller" and not base.endswith("Controller"):
+            return base + "Controller"
+        return base
+
+    @staticmethod
+    def _safe_class_name(raw_name: str) -> str:
         """Normalizes a raw SRS / architecture name into a safe class/file name.
 
         Examples:
@@ -204,33 +218,46 @@ class MVCScaffolder:
         """
         Creates controller skeleton files under scaffolds/mvc_skeleton/controllers.
 
-        If the architecture JSON contains multiple actions for the same controller
-        name, we merge them into a single file with multiple method stubs.
+        Entries whose names map to the same controller class are merged into
+        a single file with one method stub per distinct action.
         """
         created_files: List[Path] = []
         controllers_dir = self.scaffold_root / "controllers"
 
-        # Group actions by controller name
+        # Group entries by generated class name ("Cart Controller" == "CartController")
         grouped: Dict[str, List[Dict[str, Any]]] = {}
+        raw_names: Dict[str, str] = {}
         for ctrl in controllers:
             raw_name = ctrl.get("name", "UnnamedController")
-            grouped.setdefault(raw_name, []).append(ctrl)
-
-        for raw_name, actions in grouped.items():
-            base_name = self._safe_class_name(raw_name)
-            if not base_name.endswith("Controller"):
-                base_name += "Controller"
+            base_name = self.class_name_for("controller", raw_name)
+            grouped.setdefault(base_name, []).append(ctrl)
+            raw_names.setdefault(base_name, raw_name)
 
+        for base_name, entries in grouped.items():
+            raw_name = raw_names[base_name]
             file_path = controllers_dir / f"{base_name}.py"
             if file_path.exists():
                 continue
 
-            # Build methods for each action
+            # Architecture JSON lists actions per controller ("actions": [...]);
+            # older files have one entry per action ("action": ...)
+            actions: List[Dict[str, Any]] = []
+            for entry in entries:
+                for action in entry.get("actions") or []:
+                    actions.append(action if isinstance(action, dict) else {"action": str(action)})
+                if entry.get("action"):
+                    actions.append(entry)
+
+            # Build methods for each action (one method per distinct name)
             methods: List[str] = []
+            seen_methods = set()
             for action in actions:
-                action_name = action.get("action", "unnamed_action")
+                action_name = action.get("action") or action.get("name") or "unnamed_action"
                 safe_action_name = self._to_snake_case(action_name)
-                description = action.get("description", "").strip()
+                if safe_action_name in seen_methods:
+                    continue
+                seen_methods.add(safe_action_name)
+                description = str(action.get("description") or "").strip()
 
                 methods.extend(
                     [
@@ -1,7 +1,8 @@
 from pathlib import Path
 
 from src.agents.architect_agent.base_architect_agent import BaseArchitectAgent
-from src.core.llm_client import QuotaExceededError, LLMConnectionError
+from src.core.errors import QuotaExceededError, LLMConnectionError
+from src.core.profiler import span
 
 class SRSWriterAgent(BaseArchitectAgent):
     """
@@ -17,15 +18,16 @@ class SRSWriterAgent(BaseArchitectAgent):
         and returns the file path.
         """
         # Load prompt from external file
-        prompt_path = Path(__file__).resolve().parents[2] / ".github" / "prompts" / "create_srs.prompt.md"
-        prompt_template = prompt_path.read_text(encoding="utf-8")
-        
-        prompt = prompt_template.replace("{{user_idea}}", user_idea)
+        with span("prompt.build"):
+            prompt_path = Path(__file__).resolve().parents[2] / ".github" / "prompts" / "create_srs.prompt.md"
+            prompt_template = prompt_path.read_text(encoding="utf-8")
+            
+            prompt = prompt_template.replace("{{user_idea}}", user_idea)
         
         print("[SRS Writer] Generating SRS text...")
         
         try:
-            srs_text = self.llm.generate_content(prompt, stream=False) 
+            srs_text = self.llm.generate_content(prompt, stream=False, kind="srs") 
 
         except QuotaExceededError as qe:
             print(f"\n{str(qe)}")
@@ -44,7 +46,8 @@ class SRSWriterAgent(BaseArchitectAgent):
         self.data_dir.mkdir(parents=True, exist_ok=True)
         srs_filename = "srs_document.txt"
         srs_path = self.data_dir / srs_filename
-        srs_path.write_text(srs_text, encoding="utf-8")
+        with span("file.write", file=srs_filename):
+            srs_path.write_text(srs_text, encoding="utf-8")
         
         print(f"[SRS Writer] SRS successfully created: {srs_path.name}")
         
@@ -0,0 +1,264 @@
+# src/cli/batch.py
+"""
+Batch runner: one `pipeline` run per SRS document, across a process pool.
+
+Manifest (JSON), relative paths are resolved against the manifest's folder:
+    {
+      "defaults": {"to_stage": "audit", "mode": "staged"},
+      "projects": [
+        {"name": "library", "srs": "srs/library.pdf"},
+        {"name": "shop", "user_idea": "Online shop with cart and checkout", "to_stage": "scaffold"}
+      ]
+    }
+A plain list of projects is accepted as well.
+
+Every project runs in its own workspace (<workspaces>/<name>/ with its own
+data/, scaffolds/, generated_src/ and vector store, see src/core/workspace.py)
+inside a worker process. Every LLM call (architect agents, summary tree, SRS
+writer, generate-code, fixer) acquires the process-wide llm_rate_limiter, and
+the workers share its slot, so N workers stay within the same quota as a
+single process.
+"""
+import json
+import multiprocessing
+import re
+import sys
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Any, Dict, List
+
+from src.core.config import BATCH_REPORT_FILE
+from src.core.events import events, LogTap
+
+
+def load_manifest(path: Path) -> List[Dict[str, Any]]:
+    """Reads and validates the batch manifest; returns one dict per project."""
+    path = Path(path).resolve()
+    with open(path, "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+
+    if isinstance(manifest, list):
+        manifest = {"projects": manifest}
+    defaults = manifest.get("defaults", {})
+    projects = []
+    names = set()
+    for index, entry in enumerate(manifest.get("projects", []), start=1):
+        if isinstance(entry, str):
+            entry = {"srs": entry}
+        if not entry.get("srs") and not entry.get("user_idea"):
+            raise ValueError(f"Project #{index} needs 'srs' or 'user_idea'.")
+
+        project = {**defaults, **entry}
+        if project.get("srs"):
+            srs = Path(project["srs"])
+            project["srs"] = str(srs if srs.is_absolute() else (path.parent / srs).resolve())
+            default_name = Path(project["srs"]).stem
+        else:
+            default_name = f"project-{index}"
+        name = re.sub(r"[^A-Za-z0-9_.-]+", "-", str(project.get("name") or default_name)).strip("-")
+        if name in names:
+            raise ValueError(f"Duplicate project name in manifest: {name}")
+        names.add(name)
+        project["name"] = name
+        projects.append(project)
+
+    if not projects:
+        raise ValueError(f"No projects in manifest: {path}")
+    return projects
+
+
+def pipeline_argv(project: Dict[str, Any]) -> List[str]:
+    argv = ["pipeline"]
+    if project.get("srs"):
+        argv += ["--srs-path", project["srs"]]
+    else:
+        argv += ["--user-idea", project["user_idea"]]
+    for option in ("to_stage", "from_stage", "mode"):
+        if project.get(option):
+            argv += [f"--{option.replace('_', '-')}", str(project[option])]
+    for flag in ("force", "no_dedup"):
+        if project.get(flag):
+            argv.append(f"--{flag.replace('_', '-')}")
+    return argv
+
+
+# --------------------------------------------------------------------------
+# Worker side
+# --------------------------------------------------------------------------
+def _init_worker(llm_slot, lock) -> None:
+    """Pool initializer: pace this process's LLM calls with every other worker."""
+    from src.core.rate_limiter import llm_rate_limiter
+
+    llm_rate_limiter.share(llm_slot, lock)
+
+
+def run_project(project: Dict[str, Any], workspace_dir: str) -> Dict[str, Any]:
+    """Runs one project's pipeline in its own workspace (in a worker process)."""
+    # Imported here so the parent process never loads the agents
+    from src.cli.mvc_arch_cli import PIPELINE_STAGES, build_parser
+    from src.core import workspace
+    from src.core.latency_history import StageRecorder
+    from src.core.profiler import profiler
+
+    root = workspace.set_workspace_root(workspace_dir)
+    log_path = root / "batch.log"
+    collected: List[Dict[str, Any]] = []
+    events.set_sink(collected.append)
+    recorder = StageRecorder("pipeline", run_id=project["name"])
+    events.add_listener(recorder)
+    profiler.start()
+
+    exit_code = 0
+    started = time.perf_counter()
+    original_stdout, original_stderr = sys.stdout, sys.stderr
+    with open(log_path, "w", encoding="utf-8") as log:
+        # [ERROR] lines become events, so the report can name the failure
+        sys.stdout = sys.stderr = LogTap(log, events)
+        try:
+            args = build_parser().parse_args(pipeline_argv(project))
+            args.func(args)
+        except SystemExit as e:
+            exit_code = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+        except Exception:
+            traceback.print_exc(file=log)
+            exit_code = 1
+        finally:
+            events.remove_listener(recorder)
+            recorder.finish()  # Stage history of the project's workspace
+            sys.stdout, sys.stderr = original_stdout, original_stderr
+    duration = time.perf_counter() - started
+    profiler.stop()
+    events.set_sink(None)
+
+    stage_ends = [e for e in collected if e["event"] == "stage_end" and e["stage"] in PIPELINE_STAGES]
+    stages = {e["stage"]: e["duration_s"] for e in stage_ends}
+    failed_stages = [e["stage"] for e in stage_ends if e["status"] != "ok"]
+    errors = [e["message"] for e in collected if e["event"] == "error"]
+    llm = profiler.summary()["phases"].get("llm.call", {})
+
+    if exit_code != 0:
+        status = "failed"
+    elif failed_stages:
+        status = "stopped"  # Clean stop, e.g. daily quota reached
+    else:
+        status = "ok"
+    return {
+        "name": project["name"],
+        "status": status,
+        "exit_code": exit_code,
+        "duration_s": round(duration, 2),
+        "stages": stages,
+        "llm_calls": llm.get("count", 0),
+        "llm_seconds": round(llm.get("total_ms", 0.0) / 1000, 2),
+        "error": errors[0] if errors else None,
+        "workspace": str(root),
+        "log": str(log_path),
+    }
+
+
+# --------------------------------------------------------------------------
+# Parent side
+# --------------------------------------------------------------------------
+def run_batch(projects: List[Dict[str, Any]], workspaces_dir: Path, workers: int) -> Dict[str, Any]:
+    """Runs every project on a process pool and returns the aggregated report."""
+    workspaces_dir = Path(workspaces_dir).resolve()
+    workspaces_dir.mkdir(parents=True, exist_ok=True)
+    workers = max(1, min(workers, len(projects)))
+
+    # spawn: workers start clean (no inherited threads, Chroma or torch state)
+    ctx = multiprocessing.get_context("spawn")
+    lock = ctx.Lock()
+    llm_slot = ctx.Value("d", 0.0, lock=False)
+
+    print(f"[INFO] Running {len(projects)} project(s) with {workers} worker process(es)...")
+    print(f"[INFO] Workspaces: {workspaces_dir}")
+    started_at = time.time()
+    started = time.perf_counter()
+    results = []
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=ctx,
+        initializer=_init_worker,
+        initargs=(llm_slot, lock),
+    ) as executor:
+        futures = {
+            executor.submit(run_project, project, str(workspaces_dir / project["name"])): project
+            for project in projects
+        }
+        for future in as_completed(futures):
+            project = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                # Worker crashed (e.g. killed): the project is reported, the batch goes on
+                result = {
+                    "name": project["name"], "status": "failed", "exit_code": None,
+                    "duration_s": None, "stages": {}, "llm_calls": 0, "llm_seconds": 0.0,
+                    "error": f"{type(e).__name__}: {e}",
+                    "workspace": str(workspaces_dir / project["name"]), "log": None,
+                }
+            results.append(result)
+            mark = {"ok": "✓", "stopped": "■"}.get(result["status"], "✗")
+            duration = f"{result['duration_s']:.1f}s" if result["duration_s"] is not None else "-"
+            print(f"[{len(results)}/{len(projects)}] {mark} {result['name']} ({result['status']}, {duration})"
+                  + (f": {result['error']}" if result["status"] != "ok" and result["error"] else ""))
+            events.progress("batch", len(results), len(projects), item=result["name"], status=result["status"])
+
+    wall = time.perf_counter() - started
+    order = {project["name"]: index for index, project in enumerate(projects)}
+    results.sort(key=lambda r: order[r["name"]])
+    report = {
+        "started_at": started_at,
+        "wall_s": round(wall, 2),
+        "workers": workers,
+        "totals": _totals(results, wall),
+        "projects": results,
+        "failures": [{"name": r["name"], "status": r["status"], "error": r["error"], "log": r["log"]}
+                     for r in results if r["status"] != "ok"],
+    }
+    report_path = workspaces_dir / BATCH_REPORT_FILE
+    with open(report_path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=4, ensure_ascii=False)
+    report["path"] = str(report_path)
+    return report
+
+
+def _totals(results: List[Dict[str, Any]], wall: float) -> Dict[str, Any]:
+    durations = [r["duration_s"] for r in results if r["duration_s"] is not None]
+    llm_calls = sum(r["llm_calls"] for r in results)
+    stage_totals: Dict[str, float] = {}
+    for r in results:
+        for stage, seconds in r["stages"].items():
+            stage_totals[stage] = round(stage_totals.get(stage, 0.0) + seconds, 2)
+    return {
+        "projects": len(results),
+        "ok": sum(r["status"] == "ok" for r in results),
+        "stopped": sum(r["status"] == "stopped" for r in results),
+        "failed": sum(r["status"] == "failed" for r in results),
+        "projects_per_hour": round(len(results) * 3600 / wall, 2) if wall > 0 else 0.0,
+        "mean_project_s": round(sum(durations) / len(durations), 2) if durations else None,
+        "llm_calls": llm_calls,
+        "llm_calls_per_min": round(llm_calls * 60 / wall, 2) if wall > 0 else 0.0,
+        "stage_seconds": stage_totals,
+    }
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    totals = report["totals"]
+    print(f"\n[BATCH] {totals['ok']}/{totals['projects']} project(s) completed, "
+          f"{totals['stopped']} stopped, {totals['failed']} failed in {report['wall_s']:.1f}s "
+          f"({report['workers']} worker(s))")
+    print(f"[BATCH] Throughput: {totals['projects_per_hour']:.1f} project(s)/h, "
+          f"{totals['llm_calls']} LLM call(s) ({totals['llm_calls_per_min']:.1f}/min)")
+    if totals["mean_project_s"] is not None:
+        print(f"[BATCH] Mean project time: {totals['mean_project_s']:.1f}s")
+    for stage, seconds in totals["stage_seconds"].items():
+        print(f"  {stage:<20} {seconds:>8.1f}s")
+    if report["failures"]:
+        print("[BATCH] Not completed:")
+        for failure in report["failures"]:
+            print(f"  - {failure['name']} ({failure['status']}): {failure['error'] or 'see log'}"
+                  + (f" [{failure['log']}]" if failure["log"] else ""))
+    print(f"[BATCH] Report: {report['path']}")
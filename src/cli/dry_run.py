@@ -0,0 +1,355 @@
+# src/cli/dry_run.py
+"""
+Cost and latency estimates for `extract --dry-run` and `generate-code --dry-run`.
+
+The estimator builds the prompts a run would send without sending them. It
+counts their tokens, then predicts the wall time from:
+    - the configured pacing (LLM_MIN_CALL_INTERVAL, shared by every call),
+    - the worker counts (--jobs, MAPREDUCE_MAX_WORKERS),
+    - the latency history of previous runs (src/core/latency_history.py).
+Without history, DRY_RUN_DEFAULT_CALL_SECONDS / DRY_RUN_DEFAULT_OUTPUT_TOKENS
+are used. Calls are compared with LLM_DAILY_REQUEST_QUOTA.
+
+Stages and files the run would skip (unchanged inputs, see the build
+manifests) are not counted. Some prompts cannot be built exactly before the
+run: prompts that depend on retrieval results or on earlier LLM answers
+(extraction stages, summary reduce calls). For those, the SRS chunks and the
+summary budget the stage would receive are sized from the document itself.
+Such phases are marked "~" in the report.
+
+    mvc_arch_cli extract --srs-path data/srs.pdf --output data/architecture_map.json --dry-run
+    mvc_arch_cli generate-code --category all --arch-path data/architecture_map.json --dry-run
+"""
+import math
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from src.core.config import (
+    LLM_MODEL_NAME, CHARS_PER_TOKEN, DRY_RUN_DEFAULT_CALL_SECONDS, DRY_RUN_DEFAULT_OUTPUT_TOKENS,
+    LLM_DAILY_REQUEST_QUOTA, LATENCY_DB_FILE,
+)
+from src.core.eta import simulate_wall_time, format_seconds
+from src.core.events import events
+from src.core.latency_history import history
+from src.core.profiler import span
+from src.core.rate_limiter import llm_rate_limiter
+from src.core import workspace
+
+
+def _phase(name: str, kind: str, prompt_chars: List[int], workers: int = 1,
+           exact: bool = True) -> Dict[str, Any]:
+    return {"name": name, "kind": kind, "prompt_chars": prompt_chars,
+            "workers": workers, "exact": exact}
+
+
+# --------------------------------------------------------------------------
+# extract
+# --------------------------------------------------------------------------
+def _load_pages(srs_path: Path) -> List[str]:
+    """Document text like RAGPipeline.load_document (no pipeline needed)."""
+    if srs_path.suffix.lower() == ".pdf":
+        from src.rag.rag_pipeline import PDFLoader
+        with srs_path.open("rb") as f:
+            return PDFLoader().load_pdf(f)
+    return [srs_path.read_text(encoding="utf-8")]
+
+
+def _stage_runs(manifest, stage: str, inputs: Dict[str, Any]) -> bool:
+    """
+    True unless the manifest entry was recorded with the same `inputs` and
+    its outputs are unchanged. Upstream artifacts are not compared: they only
+    change if an earlier stage runs, which the caller handles.
+    """
+    entry = manifest.stages.get(stage)
+    if not entry:
+        return True
+    recorded = entry.get("inputs", {})
+    if any(recorded.get(key) != value for key, value in inputs.items()):
+        return True
+    return not manifest.is_fresh(stage, entry["fingerprint"])
+
+
+def estimate_extraction(srs_path: Path, mode: str = "staged", force: bool = False) -> Dict[str, Any]:
+    """Calls `extract` would make for `srs_path` in `mode`, as a report (see _report)."""
+    from src.core.config import (
+        DEFAULT_TOP_K, REQUIREMENTS_TOP_K, FUSED_CHUNK_BUDGET, COMBINED_TOP_K,
+        SUMMARY_MIN_CHUNKS, SUMMARY_CONTEXT_MAX_CHARS, SUMMARY_FANOUT,
+        MAPREDUCE_SECTION_MAX_CHARS, MAPREDUCE_MAX_WORKERS,
+    )
+    from src.core.manifest import BuildManifest, hash_file
+    from src.agents.architect_agent.requirements_agent import RequirementsAgent
+    from src.agents.architect_agent.model_architect_agent import ModelArchitectAgent
+    from src.agents.architect_agent.controller_architect_agent import ControllerArchitectAgent
+    from src.agents.architect_agent.view_architect_agent import ViewArchitectAgent
+    from src.agents.architect_agent.combined_architect_agent import CombinedArchitectAgent
+    from src.agents.architect_agent.map_reduce_architect_agent import MapReduceArchitectAgent
+    from src.rag.rag_pipeline import Chunker, RAGPipeline, SectionChunker
+    from src.rag.summary_tree import (
+        SummaryTree, SECTION_PROMPT, REDUCE_PROMPT, SECTION_CALL_KIND, REDUCE_CALL_KIND,
+    )
+
+    srs_path = Path(srs_path).resolve()
+    data_dir = workspace.data_dir()
+    prompts_dir = workspace.prompts_dir()
+    manifest = BuildManifest(data_dir / "extraction_manifest.json")
+    srs_hash = hash_file(srs_path)
+
+    pages = _load_pages(srs_path)
+    text = "\n\n".join(pages)
+    chunker = Chunker()
+    chunks = chunker.prepare_chunks(pages)
+    if not chunks:
+        raise ValueError(f"No content found in SRS: {srs_path}")
+
+    phases: List[Dict[str, Any]] = []
+    skipped: List[str] = []
+
+    if mode == "mapreduce":
+        inputs = {"srs": srs_hash, "prompt": hash_file(prompts_dir / CombinedArchitectAgent.PROMPT_FILE),
+                  "model_name": LLM_MODEL_NAME, "section_max_chars": MAPREDUCE_SECTION_MAX_CHARS}
+        if force or _stage_runs(manifest, mode, inputs):
+            # Exact: the map step prompts only depend on the document
+            agent = MapReduceArchitectAgent()
+            sections = SectionChunker(max_chars=MAPREDUCE_SECTION_MAX_CHARS).split(text)
+            with span("prompt.build", calls=len(sections)):
+                prompt_chars = [len(agent._build_section_prompt(section)) for section in sections]
+            phases.append(_phase("mapreduce", "MapReduceArchitectAgent", prompt_chars,
+                                 workers=MAPREDUCE_MAX_WORKERS))
+        else:
+            skipped.append(mode)
+        return _report("extract", phases, skipped, mode=mode)
+
+    # (stage, agent class, representative prompt) in run order
+    if mode == "combined":
+        planned = [(
+            "combined", CombinedArchitectAgent, COMBINED_TOP_K,
+            lambda agent, sample: agent._build_combined_prompt(sample),
+        )]
+    else:
+        planned = [
+            ("requirements", RequirementsAgent, REQUIREMENTS_TOP_K,
+             lambda agent, sample: agent._build_requirements_prompt(sample)),
+            ("model", ModelArchitectAgent, DEFAULT_TOP_K,
+             lambda agent, sample: agent._build_model_prompt(sample)),
+            ("controller", ControllerArchitectAgent, DEFAULT_TOP_K,
+             lambda agent, sample: agent._build_controller_prompt(sample)),
+            ("view", ViewArchitectAgent, DEFAULT_TOP_K,
+             lambda agent, sample: agent._build_view_prompt(sample)),
+        ]
+
+    running = []
+    for stage, agent_class, k, _ in planned:
+        inputs = {"srs": srs_hash, "prompt": hash_file(prompts_dir / agent_class.PROMPT_FILE),
+                  "model_name": LLM_MODEL_NAME, "k": k}
+        # Once a stage runs, its output (an upstream input) changes for the rest
+        if force or running or _stage_runs(manifest, stage, inputs):
+            running.append(stage)
+        else:
+            skipped.append(stage)
+    if not running:
+        return _report("extract", phases, skipped, mode=mode)
+
+    # Summary tree: built for its only reader, the requirements stage, unless cached or the SRS fits top-k
+    sections = [chunker.prepare_chunks([section]) for section in SectionChunker().split(text)]
+    cache_path = (
+        data_dir / "summary_cache"
+        / f"{RAGPipeline.namespace_for(srs_path)}-{SummaryTree.cache_key(srs_hash, LLM_MODEL_NAME)}.json"
+    )
+    needs_tree = "requirements" in running
+    cached_tree = SummaryTree.load_cached(cache_path) if needs_tree else None
+    has_tree = needs_tree and (
+        cached_tree is not None or sum(len(c) for c in sections) >= SUMMARY_MIN_CHUNKS
+    )
+    if cached_tree is None and has_tree:
+        section_template = SECTION_PROMPT.read_text(encoding="utf-8")
+        phases.append(_phase(
+            "summary.section", SECTION_CALL_KIND,
+            [len(section_template.replace("{{context}}", SummaryTree.section_context(c))) for c in sections],
+        ))
+        # Reduce prompts carry section summaries, sized like the measured (or default) section output
+        stats = history().llm_stats(SECTION_CALL_KIND)
+        summary_chars = ((stats or {}).get("mean_output_tokens") or DRY_RUN_DEFAULT_OUTPUT_TOKENS) \
+            * _chars_per_token()[0]
+        reduce_template_chars = len(REDUCE_PROMPT.read_text(encoding="utf-8"))
+        phases.append(_phase(
+            "summary.reduce", REDUCE_CALL_KIND,
+            [int(reduce_template_chars + size * summary_chars)
+             for size in SummaryTree.reduce_group_sizes(len(sections), SUMMARY_FANOUT)],
+            exact=False,
+        ))
+    if cached_tree is not None:
+        summary_chars = len(cached_tree.context())
+    else:
+        summary_chars = SUMMARY_CONTEXT_MAX_CHARS if has_tree else 0
+
+    for stage, agent_class, k, build in planned:
+        if stage not in running:
+            continue
+        if stage == "requirements" and has_tree:
+            # The requirements agent adds the summary context and keeps fewer chunks
+            extra_chars = summary_chars
+            k = min(k, DEFAULT_TOP_K)
+        else:
+            extra_chars = 0
+        if stage in ("controller", "view"):
+            k = max(k, FUSED_CHUNK_BUDGET)  # Fused sub-query retrieval budget
+        with span("prompt.build", stage=stage):
+            prompt = build(agent_class(), chunks[:k])
+        phases.append(_phase(stage, agent_class.__name__, [len(prompt) + extra_chars], exact=False))
+
+    return _report("extract", phases, skipped, mode=mode)
+
+
+# --------------------------------------------------------------------------
+# generate-code
+# --------------------------------------------------------------------------
+def estimate_generation(generator, tasks: List[Dict[str, Any]], jobs: int) -> Dict[str, Any]:
+    """Calls generate-code would make for `tasks` (built by CodeGeneratorAgent.build_tasks)."""
+    pending = [task for task in tasks if not generator.is_up_to_date(task)]
+    skipped = [generator.checkpoint_key(task) for task in tasks if generator.is_up_to_date(task)]
+
+    # One pool for every category; phases only split the report by prompt kind
+    phases = []
+    for category in generator.CATEGORIES:
+        prompt_chars = [len(task["prompt"]) for task in pending if task["category"] == category]
+        if prompt_chars:
+            phases.append(_phase(f"{category}s", generator.call_kind(category), prompt_chars,
+                                 workers=jobs))
+    return _report("generate-code", phases, skipped, shared_pool=True)
+
+
+# --------------------------------------------------------------------------
+# Prediction
+# --------------------------------------------------------------------------
+def _chars_per_token():
+    """(chars per token, source): measured by earlier calls, else CHARS_PER_TOKEN."""
+    measured = history().chars_per_token(LLM_MODEL_NAME)
+    return (measured, "measured") if measured else (CHARS_PER_TOKEN, "heuristic")
+
+
+def _report(command: str, phases: List[Dict[str, Any]], skipped: List[str],
+            mode: Optional[str] = None, shared_pool: bool = False) -> Dict[str, Any]:
+    """
+    Turns planned phases into predictions:
+        {"command", "mode", "phases": [{"name", "kind", "calls", "prompt_tokens",
+         "output_tokens", "latency_s", "latency_source", "seconds", "exact"}, ...],
+         "skipped", "totals": {...}, "quota": {...}, "tokens": {...}, "pacing": {...}}
+    Phases run one after another (shared_pool: all on one worker pool) and
+    every call takes a slot of the one process-wide limiter, like in a real run.
+    """
+    chars_per_token, token_source = _chars_per_token()
+    store = history()
+
+    rows = []
+    clock = 0.0
+    next_slot = 0.0
+    interval = llm_rate_limiter.min_interval
+    latencies: List[float] = []  # shared_pool: every call, replayed on one pool below
+    for phase in phases:
+        stats = store.llm_stats(phase["kind"], LLM_MODEL_NAME)
+        # Per call: fitted to the prompt size once the history has enough calls of this kind
+        call_latencies = [
+            store.predict_llm_seconds(phase["kind"], chars, LLM_MODEL_NAME) if stats else DRY_RUN_DEFAULT_CALL_SECONDS
+            for chars in phase["prompt_chars"]
+        ]
+        latency = sum(call_latencies) / len(call_latencies) if call_latencies else DRY_RUN_DEFAULT_CALL_SECONDS
+        output_tokens = (stats or {}).get("mean_output_tokens") or DRY_RUN_DEFAULT_OUTPUT_TOKENS
+        calls = len(phase["prompt_chars"])
+
+        if shared_pool:
+            latencies.extend(call_latencies)
+            seconds = None
+        else:
+            started = clock
+            clock, next_slot = simulate_wall_time(
+                call_latencies, phase["workers"], interval, start=clock, next_slot=next_slot,
+            )
+            seconds = clock - started
+
+        rows.append({
+            "name": phase["name"],
+            "kind": phase["kind"],
+            "calls": calls,
+            "prompt_tokens": sum(math.ceil(chars / chars_per_token) for chars in phase["prompt_chars"]),
+            "output_tokens": int(round(output_tokens * calls)),
+            "latency_s": round(latency, 2),
+            "latency_source": f"history (n={stats['count']})" if stats else "default",
+            "seconds": round(seconds, 1) if seconds is not None else None,
+            "exact": phase["exact"],
+            "workers": phase["workers"],
+            "min_interval_s": interval,
+        })
+
+    if shared_pool and phases:
+        clock, _ = simulate_wall_time(latencies, phases[0]["workers"], interval)
+
+    total_calls = sum(row["calls"] for row in rows)
+    midnight = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0).timestamp()
+    used_today = store.calls_since(midnight)
+    return {
+        "command": command,
+        "mode": mode,
+        "phases": rows,
+        "skipped": skipped,
+        "totals": {
+            "calls": total_calls,
+            "prompt_tokens": sum(row["prompt_tokens"] for row in rows),
+            "output_tokens": sum(row["output_tokens"] for row in rows),
+            "wall_s": round(clock, 1),
+        },
+        "quota": {
+            "daily_requests": LLM_DAILY_REQUEST_QUOTA,
+            "used_today": used_today,
+            "share_pct": round(100 * total_calls / LLM_DAILY_REQUEST_QUOTA, 1) if LLM_DAILY_REQUEST_QUOTA else None,
+            "remaining_after": LLM_DAILY_REQUEST_QUOTA - used_today - total_calls,
+        },
+        "tokens": {"chars_per_token": round(chars_per_token, 2), "source": token_source},
+        "history": str(workspace.data_dir() / LATENCY_DB_FILE),
+    }
+
+
+# --------------------------------------------------------------------------
+# Output
+# --------------------------------------------------------------------------
+def print_estimate(report: Dict[str, Any]) -> None:
+    mode = f" (mode: {report['mode']})" if report["mode"] else ""
+    print(f"\n[DRY RUN] {report['command']}{mode}: no LLM call was made.")
+    totals = report["totals"]
+    if not report["phases"]:
+        print("[DRY RUN] Nothing to do: every stage/file is up to date (use --force to estimate a full run).")
+    else:
+        print(f"  {'phase':<18} {'calls':>6} {'prompt tok':>11} {'output tok':>11} {'latency/call':>22} {'time':>9}")
+        for row in report["phases"]:
+            marker = "" if row["exact"] else "~"
+            latency = f"{row['latency_s']:.1f}s {row['latency_source']}"
+            seconds = format_seconds(row["seconds"]) if row["seconds"] is not None else "-"
+            print(f"  {row['name']:<18} {row['calls']:>6} {marker + format(row['prompt_tokens'], ','):>11} "
+                  f"{row['output_tokens']:>11,} {latency:>22} {seconds:>9}")
+        print(f"  {'total':<18} {totals['calls']:>6} {totals['prompt_tokens']:>11,} "
+              f"{totals['output_tokens']:>11,} {'':>22} {format_seconds(totals['wall_s']):>9}")
+        pacing = sorted({(row["workers"], row["min_interval_s"]) for row in report["phases"]})
+        print("[DRY RUN] Pacing: " + "; ".join(
+            f"{workers} worker(s), " + (f"{interval:.1f}s between call starts" if interval else "unpaced")
+            for workers, interval in pacing))
+        if any(not row["exact"] for row in report["phases"]):
+            print("[DRY RUN] ~ Prompt depends on retrieval or earlier answers; sized from the SRS chunks.")
+    if report["skipped"]:
+        print(f"[DRY RUN] Up to date, not counted: {', '.join(report['skipped'])}")
+
+    tokens = report["tokens"]
+    print(f"[DRY RUN] Tokens: {tokens['chars_per_token']:.2f} chars/token ({tokens['source']}); "
+          f"latency history: {report['history']}")
+    quota = report["quota"]
+    print(f"[DRY RUN] Daily quota: {totals['calls']} of {quota['daily_requests']} request(s) "
+          f"({quota['share_pct']}%), {quota['used_today']} already used today, "
+          f"{quota['remaining_after']} left after the run.")
+    if quota["remaining_after"] < 0:
+        print(f"[WARN] The run needs more requests than are left today; it would stop after about "
+              f"{max(0, quota['daily_requests'] - quota['used_today'])} call(s).")
+
+    events.metric("dry_run_calls", totals["calls"])
+    events.metric("dry_run_prompt_tokens", totals["prompt_tokens"], unit="tokens")
+    events.metric("dry_run_output_tokens", totals["output_tokens"], unit="tokens")
+    events.metric("dry_run_wall_s", totals["wall_s"], unit="s")
+    events.metric("dry_run_quota_share_pct", quota["share_pct"], unit="%")
@@ -0,0 +1,124 @@
+# src/cli/import_benchmark.py
+"""
+Import-time benchmark for the CLI and its main modules.
+
+Every measurement runs in a fresh interpreter (nothing cached in sys.modules),
+so the numbers are the real cold-start cost of a command.
+
+    python -m src.cli.import_benchmark            # table of median import times
+    python -m src.cli.import_benchmark --repeat 7
+    python -m src.cli.import_benchmark --check    # exit 1 if the CLI loads a heavy dependency
+
+Python's own per-module breakdown is available with:
+    python -X importtime -m src.cli.mvc_arch_cli --help
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+
+# Light modules first; the last two are the heavy subsystems that the CLI
+# must only import inside the commands that use them.
+TARGET_MODULES = [
+    "src.cli.mvc_arch_cli",
+    "src.agents.scaffolder.mvc_scaffolder",
+    "src.agents.rules_agent",
+    "src.core.llm_client",
+    "src.rag.rag_pipeline",
+]
+
+# Third-party packages that dominate startup time when loaded eagerly
+HEAVY_PACKAGES = [
+    "chromadb",
+    "torch",
+    "sentence_transformers",
+    "google.generativeai",
+    "langchain",
+    "pdfplumber",
+]
+
+_PROBE = """
+import json, sys, time
+started = time.perf_counter()
+error = None
+try:
+    __import__({module!r})
+except Exception as e:
+    error = f"{{type(e).__name__}}: {{e}}"
+elapsed = time.perf_counter() - started
+heavy = [p for p in {heavy!r} if p in sys.modules]
+print(json.dumps({{"seconds": elapsed, "heavy": heavy, "error": error}}))
+"""
+
+
+def measure(module: str, repeat: int = 5) -> Dict:
+    """Median import time of `module` over `repeat` fresh interpreters."""
+    timings: List[float] = []
+    heavy: List[str] = []
+    error = None
+    for _ in range(repeat):
+        proc = subprocess.run(
+            [sys.executable, "-c", _PROBE.format(module=module, heavy=HEAVY_PACKAGES)],
+            cwd=PROJECT_ROOT,
+            capture_output=True,
+            text=True,
+        )
+        try:
+            sample = json.loads(proc.stdout.strip().splitlines()[-1])
+        except (IndexError, json.JSONDecodeError):
+            error = proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "no output"
+            break
+        timings.append(sample["seconds"])
+        heavy = sample["heavy"]
+        error = sample["error"]
+        if error:
+            break
+
+    return {
+        "module": module,
+        "median_s": statistics.median(timings) if timings else None,
+        "heavy": heavy,
+        "error": error,
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Measure cold import times of the CLI modules.")
+    parser.add_argument("--repeat", type=int, default=5, help="Fresh interpreters per module (default: 5).")
+    parser.add_argument("--modules", nargs="+", default=TARGET_MODULES, help="Modules to measure.")
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        help="Exit with status 1 if importing the CLI loads any heavy dependency.",
+    )
+    args = parser.parse_args(argv)
+
+    print(f"[INFO] Cold import times (median of {args.repeat} fresh interpreters)")
+    print(f"{'module':<42} {'time':>9}  heavy dependencies loaded")
+    print("-" * 90)
+
+    results = [measure(module, args.repeat) for module in args.modules]
+    for r in results:
+        if r["error"]:
+            print(f"{r['module']:<42} {'-':>9}  [ERROR] {r['error']}")
+            continue
+        heavy = ", ".join(r["heavy"]) or "-"
+        print(f"{r['module']:<42} {r['median_s'] * 1000:>7.1f}ms  {heavy}")
+
+    if args.check:
+        cli = measure("src.cli.mvc_arch_cli", args.repeat) if "src.cli.mvc_arch_cli" not in args.modules \
+            else next(r for r in results if r["module"] == "src.cli.mvc_arch_cli")
+        if cli["error"] or cli["heavy"]:
+            print(f"\n[ERROR] CLI import is not lazy: {cli['error'] or ', '.join(cli['heavy'])}")
+            return 1
+        print("\n[SUCCESS] CLI import does not load any heavy dependency.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
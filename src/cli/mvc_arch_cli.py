@@ -8,53 +8,160 @@ import re
 import sys
 import time
 import traceback
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 
-from src.rag.rag_pipeline import RAGPipeline 
-from src.core.llm_client import LLMClient, QuotaExceededError, LLMConnectionError 
+# Heavy subsystems (RAGPipeline: chromadb/torch, LLMClient: Gemini SDK) are
+# imported inside the commands that use them, so e.g. 'scaffold' and the
+# rules part of 'audit' start without loading them. See src/cli/import_benchmark.py.
+from src.core.errors import QuotaExceededError, LLMConnectionError
+from src.core.resources import get_llm_client, get_embedding_function
 from src.agents.scaffolder.mvc_scaffolder import MVCScaffolder
 from src.agents.recommendation_fixer_agent import RecommendationFixerAgent
 from src.agents.srs_writer_agent import SRSWriterAgent
+from src.agents.architect_agent.base_architect_agent import BaseArchitectAgent
 from src.agents.architect_agent.requirements_agent import RequirementsAgent
 from src.agents.architect_agent.model_architect_agent import ModelArchitectAgent
 from src.agents.architect_agent.view_architect_agent import ViewArchitectAgent
 from src.agents.architect_agent.controller_architect_agent import ControllerArchitectAgent
+from src.agents.architect_agent.combined_architect_agent import CombinedArchitectAgent
+from src.agents.architect_agent.map_reduce_architect_agent import MapReduceArchitectAgent
 from src.agents.rules_agent import RulesAgent
 from src.agents.reviewer_agent import ReviewerAgent
+from src.agents.code_generator_agent import CodeGeneratorAgent
+from src.core.config import (
+    CHROMA_PERSIST_DIR, INDEX_MAX_WORKERS, DEFAULT_TOP_K, GENERATION_MAX_WORKERS, CODEGEN_MANIFEST_FILE,
+    PROFILE_DIR, BATCH_MAX_WORKERS, BATCH_WORKSPACES_DIR, RUNS_DIR, RETRIEVAL_CONTEXTS_FILE,
+    STAGE_HISTORY_RUNS, STAGE_REGRESSION_RATIO, STAGE_REGRESSION_MIN_SECONDS, STAGE_REGRESSION_MIN_RUNS,
+)
+from src.core.manifest import BuildManifest
+from src.core.artifact_store import ArtifactStore, atomic_write_text
+from src.core.profiler import profiler, span
+from src.core.events import events, LogTap
+from src.core.locks import resource_lock
+from src.core.latency_history import StageRecorder, history
+from src.core.eta import EtaTracker, predict_stage, format_seconds
+from src.core import workspace
+
+# Artifacts (data/, scaffolds/, generated_src/) live in the workspace root: the
+# repository root unless --workspace / MVC_WORKSPACE_ROOT is set (src/core/workspace.py).
+
+
+def _vector_store_dir(project_root: Path | None = None) -> Path:
+    """Location of the persistent Chroma store shared by index/extract/generate-code."""
+    return (project_root or workspace.workspace_root()) / CHROMA_PERSIST_DIR
+
+
+def _extraction_eta(mode: str, stages: list) -> EtaTracker:
+    """ETA over the LLM stages of extract, from earlier durations of the same stages."""
+    if mode == "combined":
+        planned = [("combined", CombinedArchitectAgent.__name__)]
+    elif mode == "mapreduce":
+        planned = [("mapreduce", None)]  # Many calls per stage: stage history only
+    else:
+        planned = [(stage, agent_class.__name__) for stage, agent_class, *_ in stages]
+    predictions = {stage: predict_stage(stage, fallback_kind=kind) for stage, kind in planned}
+    return EtaTracker(
+        "extract",
+        {stage: seconds for stage, (seconds, _) in predictions.items()},
+        from_history=all(known for _, known in predictions.values()),
+        print_interval=0.0,  # Few, long stages: an update after each one
+    )
+
+
+def _handed_over(args: argparse.Namespace, path: Path):
+    """
+    Artifact `path` as an earlier stage of the same `pipeline` run left it in
+    the shared PipelineContext (args.context), or None outside a pipeline.
+    """
+    context = getattr(args, "context", None)
+    path = Path(str(path)).resolve()
+    if context is None or path.parent != context.data_dir.resolve():
+        return None
+    return context.get(path.name)
+
+
+def _hand_over(context, path: Path, data) -> None:
+    """Leaves an artifact already written to `path` to later stages of the same pipeline run."""
+    path = Path(str(path)).resolve()
+    if context is not None and path.parent == context.data_dir.resolve():
+        context.put(path.name, data, persist=False)
 
 
 def _run_extraction_pipeline(
     user_idea: str = None,
     srs_path: Path = None,
     output_path: Path = None,
+    project: str = None,
+    force: bool = False,
+    mode: str = "staged",
+    dedup: bool = True,
+    context=None,
 ):
-    """Common architecture extraction logic. MODULAR: Only Architect Agent, writes to disk only."""
+    """
+    Common architecture extraction logic. MODULAR: Only Architect Agent, writes to disk only.
+
+    Incremental: data/extraction_manifest.json records, for every stage, a
+    fingerprint of its inputs (SRS, prompt template, upstream JSON files,
+    model name, retrieval settings) and the hashes of its outputs. Stages
+    whose fingerprint is unchanged are skipped; the RAG pipeline (embedding
+    model + index) is only loaded once a stage actually has to run.
+
+    Agents hand their results to each other in memory through a
+    PipelineContext; the JSON/.md files are written by its background sink.
+    The `pipeline` command passes its own context, so the architecture map and
+    the retrieval contexts reach scaffold and generate-code without a re-read.
+
+    mode="combined" replaces the four staged LLM calls with a single call
+    (CombinedArchitectAgent) that writes the same per-stage files.
+    mode="mapreduce" extracts every SRS section concurrently and merges the
+    results (MapReduceArchitectAgent), for documents too large for top-k.
 
-    print("[INFO] Initializing RAG and LLM Clients...")
+    Unless dedup=False, near-duplicate models/controllers/views are merged
+    (ArchitectureDeduplicator) before the architecture map is written.
+    """
+    from src.core.config import (
+        DEFAULT_TOP_K, REQUIREMENTS_TOP_K, LLM_MODEL_NAME, EMBEDDING_MODEL_NAME,
+        DEFAULT_CHUNK_SIZE, DEFAULT_CHUNK_OVERLAP, FUSED_PER_QUERY_K, FUSED_CHUNK_BUDGET,
+        MAX_SUBQUERIES, SUMMARY_SECTION_MAX_CHARS, SUMMARY_FANOUT, SUMMARY_CONTEXT_MAX_CHARS,
+        SUMMARY_MIN_CHUNKS, COMBINED_TOP_K, MAPREDUCE_SECTION_MAX_CHARS,
+        GENERATION_TOP_K, RETRIEVAL_CONTEXTS_FILE, DEDUP_SIMILARITY_THRESHOLD, DEDUP_REPORT_FILE,
+    )
+    from src.core.manifest import BuildManifest, hash_file, hash_json
+    from src.core.pipeline_context import PipelineContext, write_json
+    from src.rag.retrieval_contexts import build_retrieval_contexts
+    from src.rag.dedup import ArchitectureDeduplicator
+    from src.rag.rag_pipeline import RAGPipeline
+
+    print("[INFO] Initializing LLM Client...")
     try:
-        llm_client = LLMClient()
-        rag_pipeline = RAGPipeline(llm_client=llm_client)
+        llm_client = get_llm_client()
     except Exception as e:
         print(f"[FATAL ERROR] Client initialization failed: {e}")
         traceback.print_exc(file=sys.stdout)
         sys.exit(1)
 
-    print("[INFO] Initializing SRS Writer and Architect Agents...")
-    try:
-        srs_writer = SRSWriterAgent(rag_pipeline, llm_client)
-        requirements_agent = RequirementsAgent(rag_pipeline, llm_client)
-        model_agent = ModelArchitectAgent(rag_pipeline, llm_client)
-        controller_agent = ControllerArchitectAgent(rag_pipeline, llm_client)
-        view_agent = ViewArchitectAgent(rag_pipeline, llm_client)
-    except Exception as e:
-        print(f"[FATAL ERROR] Agent initialization failed: {e}")
-        sys.exit(1)
+    # RAG pipeline and agents are created lazily: a fully up-to-date run
+    # never loads the embedding model (see src/core/resources.py).
+    state = {"rag": None, "indexed": False, "summarized": False, "agents": {}}
+
+    def get_rag() -> RAGPipeline:
+        if state["rag"] is None:
+            print("[INFO] Initializing RAG pipeline...")
+            state["rag"] = RAGPipeline(
+                llm_client=llm_client,
+                persist_directory=_vector_store_dir(),
+                project=project,
+            )
+        return state["rag"]
 
     current_srs_path: Path | None = None
 
     if user_idea:
         print(f"[INFO] Generating SRS from user idea: '{user_idea[:40]}...'")
         try:
+            srs_writer = SRSWriterAgent(llm_client=llm_client)
             current_srs_path = srs_writer.generate_srs(user_idea)
         except QuotaExceededError as qe:
             print(f"\n{str(qe)}")
@@ -82,40 +189,248 @@ def _run_extraction_pipeline(
         print("[FATAL ERROR] No output path provided for architecture JSON.")
         sys.exit(1)
 
-    print(f"PHASE 0.5: Indexing SRS file: {current_srs_path.name}")
-    rag_pipeline.index_srs(current_srs_path)
-    
-    print("PHASE 1-2: Extracting MVC Architecture (Extraction Only)...")
-    from src.core.config import DEFAULT_TOP_K, REQUIREMENTS_TOP_K
-    
-    requirements_analysis = requirements_agent.extract_analysis(k=REQUIREMENTS_TOP_K)
-    model_json = model_agent.extract_models(k=DEFAULT_TOP_K)
-    controller_json = controller_agent.extract_controllers(k=DEFAULT_TOP_K)
-    view_json = view_agent.extract_views(k=DEFAULT_TOP_K)
+    data_dir = workspace.data_dir()
+    prompts_dir = workspace.prompts_dir()
+    owns_context = context is None
+    if owns_context:
+        context = PipelineContext(data_dir, writer=BaseArchitectAgent.write_output)
+
+    def ensure_indexed(summaries: bool = False) -> RAGPipeline:
+        """
+        Indexes the SRS once. The summary tree is only built for its one
+        reader, the requirements stage (summaries=True): the other stages,
+        combined / mapreduce mode and the retrieval contexts make no summary calls.
+        """
+        rag_pipeline = get_rag()
+        if not state["indexed"]:
+            print(f"PHASE 0.5: Indexing SRS file: {current_srs_path.name}")
+            with events.stage("index"):
+                rag_pipeline.index_srs(current_srs_path)  # Skipped if already indexed by 'index' command
+            state["indexed"] = True
+        if summaries and not state["summarized"]:
+            try:
+                rag_pipeline.build_summary_tree(
+                    current_srs_path,
+                    cache_dir=data_dir / "summary_cache",
+                )
+            except (QuotaExceededError, LLMConnectionError, ValueError) as e:
+                print(f"[WARN] Summary tree unavailable, using top-k retrieval only: {e}")
+            state["summarized"] = True
+        return rag_pipeline
+
+    def get_agent(agent_class):
+        if agent_class not in state["agents"]:
+            rag_pipeline = ensure_indexed(summaries=agent_class is RequirementsAgent)
+            state["agents"][agent_class] = agent_class(rag_pipeline, llm_client, context=context)
+        return state["agents"][agent_class]
+
+    manifest = BuildManifest(data_dir / "extraction_manifest.json")
+    srs_hash = hash_file(current_srs_path)
+    retrieval_settings = {
+        "embedding_model": EMBEDDING_MODEL_NAME,
+        "chunking": [DEFAULT_CHUNK_SIZE, DEFAULT_CHUNK_OVERLAP],
+        "fused": [FUSED_PER_QUERY_K, FUSED_CHUNK_BUDGET, MAX_SUBQUERIES],
+    }
+    # Only the requirements stage reads the summary context (combined mode builds no tree)
+    summary_settings = {
+        "settings": [SUMMARY_SECTION_MAX_CHARS, SUMMARY_FANOUT, SUMMARY_CONTEXT_MAX_CHARS, SUMMARY_MIN_CHUNKS],
+        "prompts": [
+            hash_file(prompts_dir / "summarize_srs_section.prompt.md"),
+            hash_file(prompts_dir / "summarize_srs_summaries.prompt.md"),
+        ],
+    }
+
+    # (stage, agent class, upstream artifacts, output artifact, k, runner)
+    stages = [
+        ("requirements", RequirementsAgent, [], "requirements_analysis.json", REQUIREMENTS_TOP_K,
+         lambda agent, k: agent.extract_analysis(k=k)),
+        ("model", ModelArchitectAgent, ["requirements_analysis.json"], "model_architecture.json", DEFAULT_TOP_K,
+         lambda agent, k: agent.extract_models(k=k)),
+        ("controller", ControllerArchitectAgent, ["requirements_analysis.json", "model_architecture.json"],
+         "controller_architecture.json", DEFAULT_TOP_K,
+         lambda agent, k: agent.extract_controllers(k=k)),
+        ("view", ViewArchitectAgent, ["model_architecture.json", "controller_architecture.json"],
+         "view_architecture.json", DEFAULT_TOP_K,
+         lambda agent, k: agent.extract_views(k=k)),
+    ]
+
+    print(f"PHASE 1-2: Extracting MVC Architecture (Extraction Only, mode: {mode})...")
+    results = {}
+    eta = _extraction_eta(mode, stages)
+    if mode in ("combined", "mapreduce"):
+        # All four layers come from one agent, split back into the per-stage files
+        output_names = list(CombinedArchitectAgent.STAGE_OUTPUTS)
+        inputs = {
+            "srs": srs_hash,
+            "prompt": hash_file(prompts_dir / CombinedArchitectAgent.PROMPT_FILE),
+            "model_name": llm_client.model_name,
+        }
+        if mode == "combined":
+            # One LLM call over a fused top-k chunk set
+            inputs.update({"k": COMBINED_TOP_K, "retrieval": retrieval_settings})
+            run_stage = lambda: get_agent(CombinedArchitectAgent).extract_all(k=COMBINED_TOP_K)
+        else:
+            # One call per SRS section (whole document, no retrieval) + deterministic merge
+            inputs.update({"section_max_chars": MAPREDUCE_SECTION_MAX_CHARS})
+            run_stage = lambda: MapReduceArchitectAgent(
+                get_rag(), llm_client, context=context
+            ).extract_all(current_srs_path, max_chars=MAPREDUCE_SECTION_MAX_CHARS)
+        fingerprint = manifest.fingerprint(inputs)
+
+        if not force and manifest.is_fresh(mode, fingerprint):
+            print(f"[INFO] Stage '{mode}' is up to date, skipping.")
+            events.stage_skip(mode)
+        else:
+            print(f"[INFO] Running stage '{mode}'...")
+            eta.start()
+            stage_started = time.perf_counter()
+            with events.stage(mode):
+                run_stage()
+            eta.finish(mode, time.perf_counter() - stage_started)
+            context.when_persisted(
+                manifest.record,
+                mode,
+                fingerprint,
+                inputs,
+                [path for name in output_names
+                 for path in (data_dir / name, (data_dir / name).with_suffix(".md"))],
+            )
+
+        for (stage, *_), output_name in zip(stages, output_names):
+            results[stage] = context.load(output_name)
+    else:
+        for stage, agent_class, upstream, output_name, k, runner in stages:
+            output_file = data_dir / output_name
+            inputs = {
+                "srs": srs_hash,
+                "prompt": hash_file(prompts_dir / agent_class.PROMPT_FILE),
+                # Upstream results are already in memory (or loaded once from disk)
+                "upstream": {name: hash_json(context.load(name)) for name in upstream},
+                "model_name": llm_client.model_name,
+                "k": k,
+                "retrieval": retrieval_settings,
+            }
+            if stage == "requirements":
+                inputs["summary"] = summary_settings
+            fingerprint = manifest.fingerprint(inputs)
+
+            if not force and manifest.is_fresh(stage, fingerprint):
+                print(f"[INFO] Stage '{stage}' is up to date, skipping ({output_name}).")
+                events.stage_skip(stage)
+                eta.skip(stage)
+                results[stage] = context.load(output_name)
+                continue
+
+            print(f"[INFO] Running stage '{stage}'...")
+            eta.start()
+            stage_started = time.perf_counter()
+            with events.stage(stage):
+                results[stage] = runner(get_agent(agent_class), k)
+            eta.finish(stage, time.perf_counter() - stage_started)
+            # Output hashes can only be taken once the sink has written the files
+            context.when_persisted(
+                manifest.record,
+                stage,
+                fingerprint,
+                inputs,
+                [output_file, output_file.with_suffix(".md")],
+            )
+
+    model_json = results["model"]
+    controller_json = results["controller"]
+    view_json = results["view"]
     
     architecture_map = {
         "model": model_json.get("model", []),
         "view": view_json.get("view", []),
         "controller": controller_json.get("controller", []),
     }
-    
-    model_agent.save_output(architecture_map, "architecture_map.json")
+
+    if dedup:
+        # Merge near-duplicates ("Product"/"Products") before anything downstream sees them
+        dedup_inputs = {
+            "architecture": hash_json(architecture_map),
+            "threshold": DEDUP_SIMILARITY_THRESHOLD,
+            "embedding_model": EMBEDDING_MODEL_NAME,
+        }
+        dedup_fingerprint = manifest.fingerprint(dedup_inputs)
+        dedup_file = data_dir / DEDUP_REPORT_FILE
+        if not force and manifest.is_fresh("dedup", dedup_fingerprint) and dedup_file.exists():
+            print(f"[INFO] Stage 'dedup' is up to date, skipping ({DEDUP_REPORT_FILE}).")
+            events.stage_skip("dedup")
+            architecture_map = context.load(DEDUP_REPORT_FILE)["architecture"]
+        else:
+            print("PHASE 2.2: Merging near-duplicate architecture items...")
+            try:
+                with events.stage("dedup"):
+                    architecture_map, dedup_report = ArchitectureDeduplicator().deduplicate(architecture_map)
+                    dedup_report["architecture"] = architecture_map
+                    write_json(data_dir, dedup_report, DEDUP_REPORT_FILE)
+                    manifest.record("dedup", dedup_fingerprint, dedup_inputs, [dedup_file])
+                events.result("dedup_report", dedup_file)
+            except Exception as e:
+                print(f"[WARN] Deduplication skipped, using the raw architecture: {e}")
+
+    # Per-class retrieval contexts for generate-code, computed in one batch so
+    # generate-code does not need the embedding stack.
+    contexts_inputs = {
+        "srs": srs_hash,
+        "architecture": hash_json(architecture_map),
+        "k": GENERATION_TOP_K,
+        "retrieval": retrieval_settings,
+    }
+    contexts_fingerprint = manifest.fingerprint(contexts_inputs)
+    contexts_file = data_dir / RETRIEVAL_CONTEXTS_FILE
+    if not force and manifest.is_fresh("retrieval_contexts", contexts_fingerprint):
+        print(f"[INFO] Stage 'retrieval_contexts' is up to date, skipping ({RETRIEVAL_CONTEXTS_FILE}).")
+        events.stage_skip("retrieval_contexts")
+    else:
+        print("PHASE 2.5: Materializing per-class retrieval contexts...")
+        try:
+            rag_pipeline = ensure_indexed()
+            with events.stage("retrieval_contexts"):
+                contexts_document = build_retrieval_contexts(
+                    rag_pipeline, architecture_map, srs_hash=srs_hash, k=GENERATION_TOP_K
+                )
+                write_json(data_dir, contexts_document, RETRIEVAL_CONTEXTS_FILE)
+                _hand_over(context, contexts_file, contexts_document)
+                manifest.record("retrieval_contexts", contexts_fingerprint, contexts_inputs, [contexts_file])
+        except Exception as e:
+            print(f"[WARN] Retrieval contexts not materialized, generate-code will query RAG: {e}")
     
     try:
-        srs_context = rag_pipeline.get_full_context()
+        srs_context = state["rag"].get_full_context()
     except AttributeError:
         srs_context = "SRS context extraction failed."
 
     full_data = {
         "srs": srs_context,
+        "srs_hash": srs_hash,  # Checked against retrieval_contexts.json by generate-code
         "architecture": architecture_map
     }
 
-    output_path_str = str(Path(str(output_path)).resolve())
-    with open(output_path_str, "w", encoding="utf-8") as f:
-        json.dump(full_data, f, indent=4, ensure_ascii=False)
+    # Wait for the deferred JSON/.md writes before reporting success
+    if owns_context:
+        context.close()
+    else:
+        context.flush()
+
+    output_file = Path(str(output_path)).resolve()
+    output_path_str = str(output_file)
+    map_artifact = ArtifactStore(output_file.parent).write(output_file.name, full_data)
+    atomic_write_text(
+        output_file.with_suffix(".md"),
+        BaseArchitectAgent._json_to_markdown(architecture_map, output_file.name),
+        durable=False,
+    )
+    # In memory only: written once above, with the SRS context
+    _hand_over(context, output_file, full_data)
     
-    print(f"[SUCCESS] Extraction complete. JSON written to: {output_path_str}")
+    print(f"[SUCCESS] Extraction complete. JSON written to: {output_path_str} "
+          f"(version {map_artifact['version']})")
+    for key in ("model", "view", "controller"):
+        events.metric(f"{key}_count", len(architecture_map.get(key, [])))
+    events.result("architecture_map", output_path_str, version=map_artifact["version"])
 
 
 def cmd_create_srs(args: argparse.Namespace) -> None:
@@ -125,10 +440,10 @@ def cmd_create_srs(args: argparse.Namespace) -> None:
         user_idea = args.user_idea
 
         # 1) Bağımlılıkları Başlat (LLM için gerekli)
-        print("[INFO] Initializing RAG and LLM Clients for SRS creation...")
+        print("[INFO] Initializing LLM Client for SRS creation...")
         try:
-            llm_client = LLMClient()
-            rag_pipeline = RAGPipeline(llm_client=llm_client)
+            # SRS writing only prompts the LLM; no RAG pipeline / embedding model needed
+            llm_client = get_llm_client()
         except Exception as e:
             print(f"[FATAL ERROR] Client initialization failed: {e}")
             traceback.print_exc(file=sys.stdout)
@@ -136,7 +451,7 @@ def cmd_create_srs(args: argparse.Namespace) -> None:
 
         print("[INFO] Initializing SRS Writer Agent...")
         try:
-            srs_writer = SRSWriterAgent(rag_pipeline, llm_client)
+            srs_writer = SRSWriterAgent(llm_client=llm_client)
         except Exception as e:
             print(f"[FATAL ERROR] Agent initialization failed: {e}")
             traceback.print_exc(file=sys.stdout)
@@ -166,6 +481,7 @@ def cmd_create_srs(args: argparse.Namespace) -> None:
             final_srs_path = output_path
 
         print(f"[SUCCESS] SRS created successfully at: {final_srs_path}")
+        events.result("srs", final_srs_path)
     except Exception as e:
         print(f"\n{'='*60}", flush=True)
         print(f"[FATAL ERROR] Create-SRS command failed", flush=True)
@@ -189,7 +505,27 @@ def cmd_extract(args: argparse.Namespace) -> None:
             print(f"[ERROR] SRS file not found: {srs_path}")
             sys.exit(1)
 
-        _run_extraction_pipeline(srs_path=srs_path, output_path=str(output_path))
+        if getattr(args, "dry_run", False):
+            # Build the prompts and predict calls/tokens/time; nothing is sent or written
+            from src.cli.dry_run import estimate_extraction, print_estimate
+            print_estimate(estimate_extraction(
+                srs_path,
+                mode=getattr(args, "mode", "staged"),
+                force=getattr(args, "force", False),
+            ))
+            return
+
+        # One extraction per workspace at a time (shared data/ artifacts and caches)
+        with resource_lock("extraction"):
+            _run_extraction_pipeline(
+                srs_path=srs_path,
+                output_path=str(output_path),
+                project=getattr(args, "project", None),
+                force=getattr(args, "force", False),
+                mode=getattr(args, "mode", "staged"),
+                dedup=not getattr(args, "no_dedup", False),
+                context=getattr(args, "context", None),
+            )
     except Exception as e:
         print(f"\n{'='*60}", flush=True)
         print(f"[FATAL ERROR] Extract command failed", flush=True)
@@ -201,6 +537,180 @@ def cmd_extract(args: argparse.Namespace) -> None:
         print(f"{'='*60}\n", flush=True)
         sys.exit(1)
 
+def _collect_index_inputs(paths) -> list:
+    """Expands files/directories into the list of .txt/.pdf documents to index."""
+    documents = []
+    for raw in paths:
+        path = Path(str(raw)).resolve()
+        if path.is_dir():
+            documents.extend(
+                p for p in sorted(path.iterdir())
+                if p.is_file() and p.suffix.lower() in (".txt", ".pdf")
+            )
+        elif path.is_file() and path.suffix.lower() in (".txt", ".pdf"):
+            documents.append(path)
+        else:
+            print(f"[WARN] Skipping unsupported or missing input: {path}")
+    # Keep order, drop duplicates
+    return list(dict.fromkeys(documents))
+
+
+def cmd_index(args: argparse.Namespace) -> None:
+    """Index SRS documents into the persistent vector store. No LLM calls unless --summaries is given."""
+    try:
+        documents = _collect_index_inputs(args.paths)
+        if not documents:
+            print("[ERROR] No .txt/.pdf documents found to index.")
+            sys.exit(1)
+
+        print("[INFO] Initializing RAG pipeline (persistent store)...")
+        from src.rag.rag_pipeline import RAGPipeline
+        try:
+            # LLM is only needed when summary trees are requested
+            llm_client = get_llm_client() if args.summaries else None
+            rag_pipeline = RAGPipeline(
+                llm_client=llm_client,
+                persist_directory=_vector_store_dir(),
+                project=args.project,
+            )
+        except Exception as e:
+            print(f"[FATAL ERROR] RAG initialization failed: {e}")
+            traceback.print_exc(file=sys.stdout)
+            sys.exit(1)
+
+        # One namespace per document; suffix duplicates so two files never share one
+        namespaces = {}
+        for doc in documents:
+            base = RAGPipeline.namespace_for(doc)
+            namespace = base
+            suffix = 2
+            while namespace in namespaces.values():
+                namespace = f"{base}-{suffix}"
+                suffix += 1
+            namespaces[doc] = namespace
+
+        workers = max(1, min(args.workers, len(documents)))
+        print(f"[INFO] Indexing {len(documents)} document(s) with {workers} worker(s)...")
+
+        results = []
+        failures = []
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                executor.submit(rag_pipeline.index_srs, doc, namespace=namespaces[doc]): doc
+                for doc in documents
+            }
+            for future in as_completed(futures):
+                doc = futures[future]
+                try:
+                    info = future.result()
+                except Exception as e:
+                    failures.append((doc, e))
+                    print(f"  ✗ {doc.name}: {e}")
+                    events.progress("index", len(results) + len(failures), len(documents),
+                                    item=doc.name, status="failed")
+                    continue
+                results.append(info)
+                events.progress("index", len(results) + len(failures), len(documents), item=doc.name,
+                                status="skipped" if info.get("skipped") else "ok")
+                if info.get("skipped"):
+                    print(f"  = {doc.name} → {info['namespace']} (unchanged)")
+                else:
+                    print(
+                        f"  ✓ {doc.name} → {info['namespace']}: {info['page_count']} page(s), "
+                        f"{info['chunks_added']} chunk(s), embed {info['embed_seconds']:.2f}s"
+                    )
+        elapsed = max(time.perf_counter() - started, 1e-9)
+
+        total_pages = sum(r["page_count"] for r in results)
+        total_chunks = sum(r["chunks_added"] for r in results)
+        embed_seconds = sum(r["embed_seconds"] for r in results)
+
+        print("\n[SUCCESS] Indexing complete.")
+        print(f"[INFO] Documents: {len(results)} indexed/up-to-date, {len(failures)} failed")
+        print(f"[INFO] Wall time: {elapsed:.2f}s")
+        embed_rate = total_chunks / embed_seconds if embed_seconds > 0 else 0.0
+        print(f"[INFO] Throughput: {total_pages / elapsed:.2f} pages/s, "
+              f"{total_chunks / elapsed:.2f} chunks/s, "
+              f"{embed_rate:.2f} embeddings/s (per embedding worker)")
+        print(f"[INFO] Vector store: {_vector_store_dir()} ({rag_pipeline.vstore.count()} chunk(s) total)")
+        events.metric("chunks_per_s", round(total_chunks / elapsed, 2), unit="chunks/s")
+        events.metric("pages_per_s", round(total_pages / elapsed, 2), unit="pages/s")
+
+        if args.summaries:
+            # Summary calls run one after another to stay within LLM rate limits
+            cache_dir = workspace.data_dir() / "summary_cache"
+            indexed = [doc for doc in documents if doc not in {d for d, _ in failures}]
+            for doc in indexed:
+                try:
+                    tree = rag_pipeline.build_summary_tree(doc, cache_dir=cache_dir)
+                except QuotaExceededError as qe:
+                    print(f"\n{str(qe)}")
+                    print("[INFO] Summary tree building stopped. Vector index is complete.")
+                    break
+                except (LLMConnectionError, ValueError) as e:
+                    print(f"  ✗ Summary tree for {doc.name} failed: {e}")
+                    continue
+                if tree is None:
+                    print(f"  = {doc.name}: small document, no summary tree needed")
+                else:
+                    print(f"  ✓ {doc.name}: summary tree with {len(tree.levels)} level(s)")
+
+        if failures:
+            sys.exit(1)
+    except Exception as e:
+        print(f"\n{'='*60}", flush=True)
+        print(f"[FATAL ERROR] Index command failed", flush=True)
+        print(f"{'='*60}", flush=True)
+        print(f"Error Type: {type(e).__name__}", flush=True)
+        print(f"Error Message: {str(e)}", flush=True)
+        print(f"\nFull Traceback:", flush=True)
+        traceback.print_exc(file=sys.stdout)
+        print(f"{'='*60}\n", flush=True)
+        sys.exit(1)
+
+
+def cmd_search(args: argparse.Namespace) -> None:
+    """Search one or more project collections concurrently (fan-out). No LLM calls."""
+    try:
+        from src.rag.collection_registry import CollectionRegistry
+
+        registry = CollectionRegistry(_vector_store_dir(), get_embedding_function())
+        projects = args.projects or registry.projects()
+        if not projects:
+            print("[ERROR] No project collections found. Run 'index --project <name>' first.")
+            sys.exit(1)
+
+        unknown = [p for p in projects if p not in registry.projects()]
+        if unknown:
+            print(f"[WARN] Unknown project(s), skipped: {unknown}")
+            projects = [p for p in projects if p not in unknown]
+            if not projects:
+                print("[ERROR] None of the given projects is indexed. Run 'index --project <name>' first.")
+                sys.exit(1)
+
+        started = time.perf_counter()
+        hits = registry.fan_out_search(args.query, projects=projects, k=args.k)
+        elapsed = time.perf_counter() - started
+
+        print(f"[INFO] Searched {len(projects)} project collection(s) in {elapsed:.2f}s")
+        for rank, hit in enumerate(hits, 1):
+            snippet = " ".join(hit["document"].split())[:160]
+            print(f"{rank:>2}. [{hit['project']}] (distance {hit['distance']:.4f}) {snippet}")
+        if not hits:
+            print("[WARN] No matching chunks found.")
+    except Exception as e:
+        print(f"\n{'='*60}", flush=True)
+        print(f"[FATAL ERROR] Search command failed", flush=True)
+        print(f"{'='*60}", flush=True)
+        print(f"Error Type: {type(e).__name__}", flush=True)
+        print(f"Error Message: {str(e)}", flush=True)
+        print(f"\nFull Traceback:", flush=True)
+        traceback.print_exc(file=sys.stdout)
+        print(f"{'='*60}\n", flush=True)
+        sys.exit(1)
+
+
 # Legacy alias for backward compatibility
 def cmd_index_srs(args: argparse.Namespace) -> None:
     """Legacy alias for extract command."""
@@ -212,15 +722,19 @@ def cmd_scaffold(args: argparse.Namespace) -> None:
     try:
         arch_path = Path(str(args.arch_path)).resolve()
 
-        if not arch_path.exists():
+        # Handed over in memory by the extract stage of a pipeline run
+        full_data = _handed_over(args, arch_path)
+
+        if full_data is None and not arch_path.exists():
             print(f"[ERROR] Architecture JSON not found: {arch_path}")
             print(f"[ERROR] Please run 'extract' command first to generate architecture_map.json")
             sys.exit(1)
 
         # Validate JSON structure
         try:
-            with arch_path.open("r", encoding="utf-8") as f:
-                full_data = json.load(f)
+            if full_data is None:
+                with arch_path.open("r", encoding="utf-8") as f:
+                    full_data = json.load(f)
         except json.JSONDecodeError as e:
             print(f"[ERROR] Invalid JSON file: {arch_path}")
             print(f"[ERROR] JSON parse error: {e}")
@@ -263,7 +777,8 @@ def cmd_scaffold(args: argparse.Namespace) -> None:
             f"{scaffolder.scaffold_root} (models/views/controllers)"
         )
 
-        result = scaffolder.scaffold_all(architecture)
+        with resource_lock("scaffolds"):
+            result = scaffolder.scaffold_all(architecture)
 
         total_created = (
             len(result.get("models", []))
@@ -275,6 +790,8 @@ def cmd_scaffold(args: argparse.Namespace) -> None:
             print("[WARN] No files were generated. Architecture may be empty.")
             return
 
+        events.metric("scaffold_files", total_created)
+        events.result("scaffold", scaffolder.scaffold_root)
         print("[SUCCESS] Scaffold created with the following files:")
         for key in ("models", "views", "controllers"):
             files = result.get(key, [])
@@ -311,8 +828,8 @@ def cmd_run_audit(args: argparse.Namespace) -> None:
                 print(f"[INFO] Continuing with direct file scanning (architecture_map.json not required).")
                 arch_path = None
         
-        # Get project root (CLI is in src/cli/, so parents[2] = project root)
-        project_root = Path(__file__).resolve().parents[2]
+        # Workspace root (the repository root unless --workspace / MVC_WORKSPACE_ROOT is set)
+        project_root = workspace.workspace_root()
         
         # Use default path if not provided
         if arch_path is None:
@@ -327,10 +844,10 @@ def cmd_run_audit(args: argparse.Namespace) -> None:
         data_dir.mkdir(parents=True, exist_ok=True)
         
         try:
-            llm_client = LLMClient()
-            rag_pipeline = RAGPipeline(llm_client=llm_client) 
-            rules_agent = RulesAgent(rag_pipeline, llm_client)
-            reviewer_agent = ReviewerAgent(rag_pipeline, llm_client)
+            # Rules checking is deterministic; only the reviewer needs the LLM,
+            # and it creates the client on its first call (none if there are no violations)
+            rules_agent = RulesAgent()
+            reviewer_agent = ReviewerAgent()
         except Exception as e:
             print(f"[FATAL ERROR] Agent initialization failed: {e}")
             traceback.print_exc(file=sys.stdout)
@@ -366,25 +883,23 @@ def cmd_run_audit(args: argparse.Namespace) -> None:
         print(f"[INFO] Analyzing {file_count} Python file(s) in current codebase...")
         
         print(f"[INFO] Step 1: Rules Agent detecting violations...")
-        technical_violations = rules_agent.detect_violations(audit_root)
+        # Shared lock: other audits may scan too, but generate-code / run-fix wait
+        with events.stage("rules") as stage, resource_lock("generated_src", shared=True):
+            technical_violations = rules_agent.detect_violations(audit_root)
+            stage["items"] = file_count  # Scan rate (files/s) in the timing history
         print(f"[INFO] Found {len(technical_violations)} violation(s). Saved to violations.json")
-        
-        # Verify violations.json was created
-        violations_file = data_dir / "violations.json"
-        if violations_file.exists():
-            try:
-                with open(violations_file, "r", encoding="utf-8") as f:
-                    violations_data = json.load(f)
-                print(f"[INFO] Verified violations.json exists with {violations_data.get('total_count', 0)} violation(s)")
-            except Exception as e:
-                print(f"[WARN] Could not verify violations.json: {e}")
+        events.metric("violations", len(technical_violations))
+        if rules_agent.last_output is not None:
+            # Written atomically by the artifact store: no read-back needed
+            events.result("violations", rules_agent.last_output["path"], version=rules_agent.last_output["version"])
         else:
-            print(f"[WARN] violations.json was not created at: {violations_file}")
+            print(f"[WARN] violations.json was not written to: {data_dir / 'violations.json'}")
         
         print(f"[INFO] Step 2: Reviewer Agent generating audit report from violations.json...")
         
         try:
-            final_report = reviewer_agent.generate_audit_report(technical_violations=None)
+            with events.stage("review"):
+                final_report = reviewer_agent.generate_audit_report(technical_violations=None)
         except QuotaExceededError as qe:
             print(f"\n{str(qe)}")
             print(f"\n[INFO] Audit report generation stopped due to quota limit.")
@@ -414,52 +929,13 @@ def cmd_run_audit(args: argparse.Namespace) -> None:
         print(f"[INFO] Report generated. Content keys: {list(final_report.keys())}")
         print(f"[INFO] Report summary: {final_report.get('audit_summary', 'N/A')[:100]}")
         
-        # Ensure data directory exists
-        data_dir.mkdir(parents=True, exist_ok=True)
-        
-        # Save report to data directory (overwrites previous report if exists)
+        # Save report to data directory (previous report stays available as a version)
         try:
             print(f"[INFO] Saving audit report to: {output_file}")
-            print(f"[INFO] Report content size: {len(json.dumps(final_report))} bytes")
-            
-            with open(output_file, "w", encoding="utf-8") as f:
-                json.dump(final_report, f, indent=4, ensure_ascii=False)
-                f.flush()  # Force write to buffer
-                try:
-                    os.fsync(f.fileno())  # Force write to disk (Windows compatible)
-                except (OSError, AttributeError):
-                    # Some file systems don't support fsync
-                    pass
-            
-            # Wait a moment for file system to sync (Windows)
-            import time
-            time.sleep(0.5)
-            
-            # Verify file was written
-            if not output_file.exists():
-                print(f"[ERROR] File was not created: {output_file}")
-                sys.exit(1)
-            
-            file_size = output_file.stat().st_size
-            print(f"[INFO] File written. Size: {file_size} bytes")
-            
-            if file_size == 0:
-                print(f"[ERROR] File was written but is empty: {output_file}")
-                sys.exit(1)
-            
-            # Read back and verify content
-            try:
-                with open(output_file, "r", encoding="utf-8") as f:
-                    read_back = json.load(f)
-                if not read_back or len(str(read_back)) == 0:
-                    print(f"[ERROR] File content is empty after read-back")
-                    sys.exit(1)
-                print(f"[INFO] File content verified. Keys: {list(read_back.keys())}")
-            except json.JSONDecodeError as je:
-                print(f"[ERROR] File contains invalid JSON: {je}")
-                sys.exit(1)
-            except Exception as read_err:
-                print(f"[WARN] Could not verify file content: {read_err}")
+            # Temp file + atomic rename: the file is complete once write() returns
+            report_artifact = ArtifactStore(data_dir).write(output_file.name, final_report)
+            print(f"[INFO] File written. Size: {report_artifact['bytes']} bytes, "
+                  f"version: {report_artifact['version']}")
             
             if previous_report_exists:
                 print(f"[SUCCESS] Audit report updated: {output_file}")
@@ -476,6 +952,8 @@ def cmd_run_audit(args: argparse.Namespace) -> None:
             sys.exit(1)
         
         if final_report:
+            _hand_over(getattr(args, "context", None), output_file, final_report)
+            events.result("audit_report", output_file, version=report_artifact["version"])
             print("[SUCCESS] Audit completed.")
             print(f"Audit Report saved to: {output_file}")
             print(f"[INFO] Report reflects current state of code. Re-run /audit after code changes to update.")
@@ -498,25 +976,34 @@ def cmd_generate_code(args: argparse.Namespace) -> None:
     """
     Generate complete code for scaffold files using LLM.
     Reads scaffold files, uses prompt templates, and generates real code.
+    Several categories (or "all") run as one task list on a bounded worker pool.
     """
     try:
-        category = args.category  # 'model', 'controller', or 'view'
-        category_plural = f"{category}s"
+        categories = args.category if isinstance(args.category, list) else [args.category]
+        if "all" in categories:
+            categories = list(CodeGeneratorAgent.CATEGORIES)
+        # Keep the model -> controller -> view order, drop duplicates
+        categories = [c for c in CodeGeneratorAgent.CATEGORIES if c in categories]
+        jobs = max(1, getattr(args, "jobs", None) or GENERATION_MAX_WORKERS)
+        dry_run = getattr(args, "dry_run", False)
         
-        # 1) Initialize LLM and RAG
-        print("[INFO] Initializing LLM Client...")
-        try:
-            llm_client = LLMClient()
-            rag_pipeline = RAGPipeline(llm_client=llm_client)
-        except Exception as e:
-            print(f"[FATAL ERROR] Client initialization failed: {e}")
-            traceback.print_exc(file=sys.stdout)
-            sys.exit(1)
+        # 1) Initialize LLM (RAG is only created if a class has no precomputed context)
+        llm_client = None  # --dry-run builds the prompts without a client
+        if not dry_run:
+            print("[INFO] Initializing LLM Client...")
+            try:
+                llm_client = get_llm_client()
+            except Exception as e:
+                print(f"[FATAL ERROR] Client initialization failed: {e}")
+                traceback.print_exc(file=sys.stdout)
+                sys.exit(1)
         
         # 2) Get project root (CLI is in src/cli/, so parents[2] = project root)
         # Alternative: derive from arch_path (usually data/architecture_map.json)
         arch_path = Path(str(args.arch_path)).resolve()
-        if not arch_path.exists():
+        # Handed over in memory by the extract stage of a pipeline run
+        full_data = _handed_over(args, arch_path)
+        if full_data is None and not arch_path.exists():
             print(f"[ERROR] Architecture JSON not found: {arch_path}")
             sys.exit(1)
         
@@ -525,219 +1012,87 @@ def cmd_generate_code(args: argparse.Namespace) -> None:
         if "data" in arch_path.parts:
             project_root = arch_path.parent.parent  # data/architecture_map.json -> project root
         else:
-            # Fallback: calculate from CLI file location
-            project_root = Path(__file__).resolve().parents[2]  # src/cli/mvc_arch_cli.py -> project root
+            # Fallback: the active workspace (repository root by default)
+            project_root = workspace.workspace_root()
         
         print(f"[INFO] Project root: {project_root}")
         
         # 3) Load architecture data
-        
-        with arch_path.open("r", encoding="utf-8") as f:
-            full_data = json.load(f)
+        if full_data is None:
+            with arch_path.open("r", encoding="utf-8") as f:
+                full_data = json.load(f)
         
         if "architecture" in full_data:
             architecture = full_data["architecture"]
         else:
             architecture = full_data
         
-        # 4) Load and index SRS for RAG (if not already indexed)
-        srs_path = project_root / "data" / "srs_document.txt"
-        srs_indexed = False
-        if srs_path.exists():
-            # Check if SRS is already indexed (collection has chunks)
-            try:
-                if rag_pipeline.vstore.count() == 0:
-                    print("[INFO] Indexing SRS for RAG retrieval...")
-                    rag_pipeline.index_srs(srs_path)
-                    srs_indexed = True
-                else:
-                    print("[INFO] SRS already indexed, using existing RAG index.")
-                    srs_indexed = True
-            except Exception as e:
-                print(f"[WARN] Could not index SRS: {e}")
-                print(f"[WARN] Will use limited SRS context (first 5000 chars)")
-                srs_indexed = False
-        
-        # 5) Get scaffold files
-        scaffold_dir = project_root / "scaffolds" / "mvc_skeleton" / category_plural
-        if not scaffold_dir.exists():
-            print(f"[ERROR] Scaffold directory not found: {scaffold_dir}")
-            print(f"[ERROR] Run 'scaffold' command first.")
-            sys.exit(1)
-        
-        scaffold_files = sorted([f for f in scaffold_dir.glob("*.py")])
-        if not scaffold_files:
-            print(f"[ERROR] No scaffold files found in {scaffold_dir}")
-            print(f"[ERROR] Run 'scaffold' command first.")
-            sys.exit(1)
-        
-        # 6) Load prompt template
-        prompt_template_path = project_root / ".github" / "prompts" / f"generate_{category}_code.prompt.md"
-        if not prompt_template_path.exists():
-            print(f"[ERROR] Prompt template not found: {prompt_template_path}")
+        # 4) Build the task list (skeletons, SRS contexts, prompts) for every category
+        generator = CodeGeneratorAgent(
+            project_root,
+            architecture,
+            llm_client,
+            arch_path=arch_path,
+            project=getattr(args, "project", None),
+            manifest=BuildManifest(project_root / "data" / CODEGEN_MANIFEST_FILE),
+            force=getattr(args, "force", False),
+            srs_hash=full_data.get("srs_hash"),
+            retrieval_contexts=_handed_over(args, arch_path.parent / RETRIEVAL_CONTEXTS_FILE),
+        )
+        try:
+            # Skeletons are read here; a concurrent scaffold run must not rewrite them meanwhile
+            with resource_lock("scaffolds", shared=True, data_dir=project_root / "data"):
+                tasks = generator.build_tasks(categories)
+        except FileNotFoundError as e:
+            print(f"[ERROR] {e}")
             sys.exit(1)
         
-        prompt_template = prompt_template_path.read_text(encoding="utf-8")
+        print(f"[INFO] Processing {len(tasks)} file(s) across: {', '.join(categories)}")
+
+        if dry_run:
+            from src.cli.dry_run import estimate_generation, print_estimate
+            print_estimate(estimate_generation(generator, tasks, jobs))
+            return
         
-        # 7) Create output directory structure
-        generated_src_root = project_root / "generated_src"
-        generated_dir = generated_src_root / category_plural
+        # 5) Generate on the worker pool; files are written as their calls complete
+        with resource_lock("generated_src", data_dir=project_root / "data"), events.stage("generate") as stage:
+            summary = generator.run(tasks, jobs=jobs)
+            stage["items"] = len(summary["generated"])
         
-        try:
-            # First ensure generated_src root exists
-            generated_src_root.mkdir(parents=True, exist_ok=True)
-            print(f"[INFO] Created/verified generated_src root: {generated_src_root}")
-            
-            # Then create category subdirectory
-            generated_dir.mkdir(parents=True, exist_ok=True)
-            print(f"[INFO] Output directory: {generated_dir}")
-        except Exception as e:
-            print(f"[ERROR] Failed to create output directory: {generated_dir}")
-            print(f"[ERROR] Error: {e}")
+        if summary["quota_error"]:
+            print(f"\n{summary['quota_error']}")
+            print(f"\n[INFO] Code generation stopped. {len(summary['generated'])} file(s) generated successfully.")
+            print(f"[INFO] Re-run the same command to resume; finished files are skipped.")
+            sys.exit(0)
+        if summary["connection_error"]:
+            print(f"\n[FATAL ERROR] LLM connection failed: {summary['connection_error']}")
+            print(f"[INFO] {len(summary['generated'])} file(s) generated successfully before error.")
             sys.exit(1)
         
-        # 8) Process each file
-        print(f"[INFO] Processing {len(scaffold_files)} {category} file(s)...")
-        
-        for idx, scaffold_file in enumerate(scaffold_files, 1):
-            fileName = scaffold_file.name
-            skeleton_content = scaffold_file.read_text(encoding="utf-8")
-            
-            # Extract class name from skeleton
-            class_match = re.search(r'class\s+(\w+)', skeleton_content)
-            className = class_match.group(1) if class_match else fileName.replace('.py', '')
-            
-            print(f"[{idx}/{len(scaffold_files)}] Generating code for: {fileName} (Class: {className})")
-            
-            # Find matching architecture item
-            arch_items = architecture.get(category, [])
-            arch_item = None
-            for item in arch_items:
-                item_name = item.get("name", "").lower()
-                if (item_name == className.lower() or 
-                    item_name.replace('view', '').replace('controller', '') == 
-                    className.lower().replace('view', '').replace('controller', '')):
-                    arch_item = item
-                    break
-            
-            if not arch_item and arch_items:
-                arch_item = arch_items[0]  # Fallback to first item
-            
-            # Get SRS context - use RAG for views/controllers, full text for models
-            srs_context = "SRS content not available."
-            if srs_path.exists():
-                if category == 'view' and srs_indexed:
-                    # For views, use RAG to get relevant SRS sections
-                    try:
-                        view_name = className.replace('View', '').replace('Screen', '').strip()
-                        query = f"user interface screen {view_name} display elements layout components"
-                        if arch_item and arch_item.get("description"):
-                            query += f" {arch_item.get('description')}"
-                        
-                        print(f"  → Retrieving relevant SRS sections for {className}...")
-                        from src.core.config import DEFAULT_TOP_K
-                        chunks = rag_pipeline.search(query, k=min(DEFAULT_TOP_K, 5))  # Get top 5 chunks
-                        if chunks and chunks.get("documents") and chunks["documents"][0]:
-                            srs_context = "\n\n".join(chunks["documents"][0])  # Combine chunks
-                            print(f"  → Retrieved {len(chunks['documents'][0])} relevant SRS chunks")
-                        else:
-                            # Fallback to full SRS (first 5000 chars)
-                            srs_context = srs_path.read_text(encoding="utf-8")[:5000]
-                            print(f"  → RAG returned no results, using first 5000 chars of SRS")
-                    except Exception as e:
-                        print(f"  → RAG retrieval failed: {e}, using full SRS (first 5000 chars)")
-                        srs_context = srs_path.read_text(encoding="utf-8")[:5000]
-                elif category == 'controller' and srs_indexed:
-                    # For controllers, use RAG to get relevant business logic sections
-                    try:
-                        controller_name = className.replace('Controller', '').strip()
-                        query = f"business logic {controller_name} actions operations workflow"
-                        if arch_item and arch_item.get("actions"):
-                            actions_str = " ".join(arch_item.get("actions", [])[:3])
-                            query += f" {actions_str}"
-                        
-                        print(f"  → Retrieving relevant SRS sections for {className}...")
-                        from src.core.config import DEFAULT_TOP_K
-                        chunks = rag_pipeline.search(query, k=min(DEFAULT_TOP_K, 5))
-                        if chunks and chunks.get("documents") and chunks["documents"][0]:
-                            srs_context = "\n\n".join(chunks["documents"][0])
-                            print(f"  → Retrieved {len(chunks['documents'][0])} relevant SRS chunks")
-                        else:
-                            srs_context = srs_path.read_text(encoding="utf-8")[:5000]
-                            print(f"  → RAG returned no results, using first 5000 chars of SRS")
-                    except Exception as e:
-                        print(f"  → RAG retrieval failed: {e}, using full SRS (first 5000 chars)")
-                        srs_context = srs_path.read_text(encoding="utf-8")[:5000]
-                else:
-                    # For models or if RAG not available, use first 5000 chars
-                    srs_context = srs_path.read_text(encoding="utf-8")[:5000]
-            
-            # Build prompt
-            prompt = prompt_template
-            prompt = prompt.replace("{{class_name}}", className)
-            prompt = prompt.replace("{{file_name}}", fileName)
-            prompt = prompt.replace("{{skeleton}}", skeleton_content)
-            prompt = prompt.replace("{{arch_info}}", json.dumps(arch_item or {}, indent=2))
-            prompt = prompt.replace("{{srs_context}}", srs_context)
-            
-            # For controllers, add related models and views
-            if category == 'controller':
-                related_models = json.dumps(architecture.get("model", [])[:3], indent=2)
-                related_views = json.dumps(architecture.get("view", [])[:3], indent=2)
-                prompt = prompt.replace("{{related_models}}", related_models)
-                prompt = prompt.replace("{{related_views}}", related_views)
-            
-            # Generate code using LLM
-            try:
-                print(f"  → Calling LLM to generate code...")
-                generated_code = llm_client.generate_content(prompt)
-                
-                # Clean up the code (remove markdown code blocks if present)
-                generated_code = generated_code.strip()
-                if generated_code.startswith("```python"):
-                    generated_code = generated_code[9:]  # Remove ```python
-                if generated_code.startswith("```"):
-                    generated_code = generated_code[3:]  # Remove ```
-                if generated_code.endswith("```"):
-                    generated_code = generated_code[:-3]  # Remove trailing ```
-                generated_code = generated_code.strip()
-                
-                # Write to generated_src
-                output_file = generated_dir / fileName
-                try:
-                    output_file.write_text(generated_code, encoding="utf-8")
-                    print(f"  ✓ Code generated: {output_file.relative_to(project_root)}")
-                except Exception as e:
-                    print(f"  ✗ Failed to write file {output_file}: {e}")
-                    raise
-                
-                # Rate limiting - wait between requests
-                if idx < len(scaffold_files):
-                    time.sleep(2)  # 2 second delay between files
-                    
-            except QuotaExceededError as qe:
-                print(f"\n{str(qe)}")
-                print(f"\n[INFO] Code generation stopped. {idx-1} file(s) generated successfully.")
-                sys.exit(0)
-            except LLMConnectionError as lce:
-                print(f"\n[FATAL ERROR] LLM connection failed: {lce}")
-                print(f"[INFO] {idx-1} file(s) generated successfully before error.")
-                sys.exit(1)
-            except Exception as e:
-                print(f"  ✗ Error generating code for {fileName}: {e}")
-                # Continue with next file
-                continue
-        
+        events.metric("generated_files", len(summary["generated"]))
+        events.metric("skipped_files", len(summary["skipped"]))
+        events.metric("failed_files", len(summary["failed"]))
+
         # Verify generated files
-        generated_files = sorted([f for f in generated_dir.glob("*.py")])
         print(f"\n[SUCCESS] Code generation complete!")
-        print(f"[SUCCESS] Generated {len(generated_files)} file(s) in: {generated_dir}")
-        if generated_files:
-            print(f"[INFO] Generated files:")
-            for gen_file in generated_files:
-                print(f"  - {gen_file.name}")
-        else:
-            print(f"[WARN] No files were generated. Check errors above.")
+        if summary["skipped"]:
+            print(f"[INFO] {len(summary['skipped'])} file(s) were up to date and not regenerated "
+                  f"(use --force to regenerate them).")
+        for category in categories:
+            generated_dir = project_root / "generated_src" / f"{category}s"
+            generated_files = sorted([f for f in generated_dir.glob("*.py")])
+            print(f"[SUCCESS] Generated {len(generated_files)} file(s) in: {generated_dir}")
+            events.result(f"generated_{category}s", generated_dir)
+            if generated_files:
+                print(f"[INFO] Generated files:")
+                for gen_file in generated_files:
+                    print(f"  - {gen_file.name}")
+            else:
+                print(f"[WARN] No files were generated. Check errors above.")
+        if summary["failed"]:
+            print(f"[WARN] {len(summary['failed'])} file(s) failed:")
+            for task, error in summary["failed"]:
+                print(f"  - {task['category']}s/{task['file_name']}: {error}")
         
     except Exception as e:
         print(f"\n{'='*60}", flush=True)
@@ -751,16 +1106,35 @@ def cmd_generate_code(args: argparse.Namespace) -> None:
         sys.exit(1)
 
 
+def _confirm_fix() -> None:
+    """Interactive yes/no confirmation before run-fix modifies generated_src/."""
+    print("\n" + "="*60)
+    print("⚠️  WARNING: This will modify files in generated_src/ directory")
+    print("="*60)
+    print("\nDo you want to proceed with applying fixes? (yes/no): ", end="", flush=True)
+    
+    try:
+        user_input = input().strip().lower()
+        if user_input not in ['yes', 'y']:
+            print("\n[INFO] Fix operation cancelled by user.")
+            sys.exit(0)
+    except KeyboardInterrupt:
+        print("\n\n[INFO] Fix operation cancelled by user (Ctrl+C).")
+        sys.exit(0)
+    except EOFError:
+        print("\n\n[INFO] Fix operation cancelled (EOF).")
+        sys.exit(0)
+
+
 def cmd_run_fix(args: argparse.Namespace) -> None:
     """
     Automatically applies recommendations from audit report.
     Only fixes the specific issues mentioned in recommendations.
     """
     try:
-        # 1) Initialize LLM and RAG
+        # 1) Initialize LLM (fixes are prompt-only, no RAG pipeline needed)
         try:
-            llm_client = LLMClient()
-            rag_pipeline = RAGPipeline(llm_client=llm_client)
+            llm_client = get_llm_client()
         except Exception as e:
             print(f"[FATAL ERROR] Client initialization failed: {e}")
             traceback.print_exc(file=sys.stdout)
@@ -768,10 +1142,7 @@ def cmd_run_fix(args: argparse.Namespace) -> None:
 
         # 2) Initialize RecommendationFixerAgent
         try:
-            fixer_agent = RecommendationFixerAgent(
-                rag_pipeline=rag_pipeline,
-                llm_client=llm_client
-            )
+            fixer_agent = RecommendationFixerAgent(llm_client=llm_client)
         except Exception as e:
             print(f"[FATAL ERROR] Fixer agent initialization failed: {e}")
             traceback.print_exc(file=sys.stdout)
@@ -785,27 +1156,24 @@ def cmd_run_fix(args: argparse.Namespace) -> None:
                 print(f"[ERROR] Audit report not found: {audit_report_path}")
                 sys.exit(1)
 
-        # 4) Ask for user confirmation
-        print("\n" + "="*60)
-        print("⚠️  WARNING: This will modify files in generated_src/ directory")
-        print("="*60)
-        print("\nDo you want to proceed with applying fixes? (yes/no): ", end="", flush=True)
-        
-        try:
-            user_input = input().strip().lower()
-            if user_input not in ['yes', 'y']:
-                print("\n[INFO] Fix operation cancelled by user.")
-                sys.exit(0)
-        except KeyboardInterrupt:
-            print("\n\n[INFO] Fix operation cancelled by user (Ctrl+C).")
-            sys.exit(0)
-        except EOFError:
-            print("\n\n[INFO] Fix operation cancelled (EOF).")
-            sys.exit(0)
-        
+        # 4) Ask for user confirmation (skipped with --yes, e.g. confirmed in VS Code)
+        if not getattr(args, "yes", False):
+            _confirm_fix()
+
+        # Handed over in memory by the audit stage of a pipeline run
+        audit_report = None
+        if audit_report_path is None:
+            audit_report = _handed_over(args, workspace.data_dir() / "final_audit_report.json")
+
         # 5) Apply recommendations
         print("\n[INFO] Applying recommendations from audit report...")
-        result = fixer_agent.apply_recommendations(audit_report_path=audit_report_path)
+        with resource_lock("generated_src"), events.stage("fix") as stage:
+            result = fixer_agent.apply_recommendations(
+                audit_report_path=audit_report_path, audit_report=audit_report,
+            )
+            stage["items"] = result.get("total_recommendations")
+        events.metric("fixed_files", len(result.get("fixed_files", [])))
+        events.metric("failed_files", len(result.get("failed_files", [])))
         
         if result["success"]:
             print("\n[SUCCESS] All recommendations applied successfully!")
@@ -830,14 +1198,292 @@ def cmd_run_fix(args: argparse.Namespace) -> None:
         sys.exit(1)
 
 
+# ---------------------------------------------------------
+# End-to-end pipeline (single process)
+# ---------------------------------------------------------
+PIPELINE_STAGES = [
+    "create-srs",
+    "extract",
+    "scaffold",
+    "generate-code",
+    "audit",
+    "fix",
+]
+
+
+def _pipeline_steps(args: argparse.Namespace) -> list:
+    """(stage, command function, namespace) for every selected pipeline stage."""
+    # Defaults are resolved here, after --workspace has been applied
+    srs_path = str(Path(str(args.srs_path or workspace.data_dir() / "srs_document.txt")).resolve())
+    arch_path = str(Path(str(args.arch_path or workspace.data_dir() / "architecture_map.json")).resolve())
+    project = getattr(args, "project", None)
+
+    commands = {
+        "create-srs": (cmd_create_srs, argparse.Namespace(user_idea=args.user_idea, output=srs_path)),
+        "extract": (cmd_extract, argparse.Namespace(
+            srs_path=srs_path, output=arch_path, project=project, force=args.force,
+            mode=args.mode, no_dedup=args.no_dedup,
+        )),
+        "scaffold": (cmd_scaffold, argparse.Namespace(arch_path=arch_path)),
+        # Every category as one task list on one worker pool
+        "generate-code": (cmd_generate_code, argparse.Namespace(
+            category=["all"], arch_path=arch_path, project=project, jobs=args.jobs,
+        )),
+        "audit": (cmd_run_audit, argparse.Namespace(arch_path=arch_path)),
+        # Selecting the fix stage explicitly is the confirmation
+        "fix": (cmd_run_fix, argparse.Namespace(audit_report=None, yes=True)),
+    }
+
+    from_stage = args.from_stage or ("create-srs" if args.user_idea else "extract")
+    to_stage = args.to_stage
+    start, end = PIPELINE_STAGES.index(from_stage), PIPELINE_STAGES.index(to_stage)
+    if start > end:
+        raise ValueError(f"--from-stage '{from_stage}' comes after --to-stage '{to_stage}'.")
+    return [(stage, *commands[stage]) for stage in PIPELINE_STAGES[start:end + 1]]
+
+
+def cmd_pipeline(args: argparse.Namespace) -> None:
+    """
+    Runs a range of stages (create-srs -> extract -> scaffold -> generate-code
+    -> audit -> fix) in ONE process: the LLM client, embedding model and
+    Chroma clients are initialised once and shared by every stage.
+
+    The stages share one PipelineContext: the architecture map, retrieval
+    contexts and audit report are handed to the next stage in memory. The
+    files are still written, so a resumed run (--from-stage) reads them.
+    """
+    try:
+        if args.from_stage == "create-srs" and not args.user_idea:
+            print("[ERROR] The create-srs stage needs --user-idea.")
+            sys.exit(1)
+
+        try:
+            steps = _pipeline_steps(args)
+        except ValueError as e:
+            print(f"[ERROR] {e}")
+            sys.exit(1)
+
+        from src.core.pipeline_context import PipelineContext
+
+        print(f"[PIPELINE] Stages: {' -> '.join(stage for stage, *_ in steps)}")
+        context = PipelineContext(workspace.data_dir(), writer=BaseArchitectAgent.write_output)
+        timings = []
+        try:
+            for stage, command, stage_args in steps:
+                print(f"\n[PIPELINE] ===== {stage} =====", flush=True)
+                stage_args.context = context
+                started = time.perf_counter()
+                try:
+                    with span(f"stage.{stage}"), events.stage(stage):
+                        command(stage_args)
+                except SystemExit as e:
+                    # Commands exit on failure (or on a clean stop such as a quota limit)
+                    code = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+                    print(f"\n[PIPELINE] Stopped at stage '{stage}' (exit {code}).")
+                    print(f"[PIPELINE] Resume with: pipeline --from-stage {stage} --to-stage {args.to_stage}")
+                    sys.exit(code)
+                timings.append((stage, time.perf_counter() - started))
+        finally:
+            # Files of a stopped run must be complete for --from-stage
+            context.close()
+
+        print("\n[PIPELINE] Stage timings:")
+        for stage, seconds in timings:
+            print(f"  {stage:<20} {seconds:8.1f}s")
+        print(f"[SUCCESS] Pipeline complete ({sum(t for _, t in timings):.1f}s).")
+    except Exception as e:
+        print(f"\n{'='*60}", flush=True)
+        print(f"[FATAL ERROR] Pipeline command failed", flush=True)
+        print(f"{'='*60}", flush=True)
+        print(f"Error Type: {type(e).__name__}", flush=True)
+        print(f"Error Message: {str(e)}", flush=True)
+        print(f"\nFull Traceback:", flush=True)
+        traceback.print_exc(file=sys.stdout)
+        print(f"{'='*60}\n", flush=True)
+        sys.exit(1)
+
+
+def cmd_batch(args: argparse.Namespace) -> None:
+    """Run the pipeline for every project of a manifest, each in its own workspace, on a process pool."""
+    try:
+        from src.cli.batch import load_manifest, run_batch, print_report
+
+        try:
+            projects = load_manifest(Path(str(args.manifest)))
+        except (OSError, ValueError) as e:
+            print(f"[ERROR] Invalid batch manifest: {e}")
+            sys.exit(1)
+
+        for project in projects:
+            # Command-line options apply to projects that do not set their own
+            for option in ("to_stage", "mode"):
+                project.setdefault(option, getattr(args, option))
+            if args.force:
+                project["force"] = True
+
+        workspaces_dir = Path(str(args.workspaces_dir or workspace.workspace_root() / BATCH_WORKSPACES_DIR))
+        report = run_batch(projects, workspaces_dir, workers=args.workers)
+        print_report(report)
+        events.result("batch_report", report["path"])
+
+        if report["totals"]["failed"]:
+            sys.exit(1)
+    except Exception as e:
+        print(f"\n{'='*60}", flush=True)
+        print(f"[FATAL ERROR] Batch command failed", flush=True)
+        print(f"{'='*60}", flush=True)
+        print(f"Error Type: {type(e).__name__}", flush=True)
+        print(f"Error Message: {str(e)}", flush=True)
+        print(f"\nFull Traceback:", flush=True)
+        traceback.print_exc(file=sys.stdout)
+        print(f"{'='*60}\n", flush=True)
+        sys.exit(1)
+
+
+def cmd_artifacts(args: argparse.Namespace) -> None:
+    """List, show or roll back the stored versions of a data/ artifact."""
+    try:
+        store = ArtifactStore(workspace.data_dir())
+        try:
+            if args.action == "list":
+                versions = store.versions(args.name)
+                if not versions:
+                    print(f"[INFO] No stored versions of {args.name} in: {store.data_dir}")
+                    return
+                current = store.current_version(args.name)
+                print(f"[INFO] {len(versions)} version(s) of {args.name} (newest first, * = current):")
+                for entry in reversed(versions):
+                    marker = "*" if entry["version"] == current else " "
+                    stamp = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(entry["ts"]))
+                    print(f"  {marker} {entry['version']}  {stamp}  {entry['bytes']:>9} bytes")
+            elif args.action == "show":
+                data = store.read(args.name, args.version) if args.version else store.snapshot(args.name)[1]
+                print(json.dumps(data, indent=4, ensure_ascii=False))
+            else:
+                if not args.version:
+                    print("[ERROR] 'rollback' needs --version (see 'artifacts list').")
+                    sys.exit(1)
+                info = store.rollback(args.name, args.version)
+                print(f"[SUCCESS] {args.name} restored to version {info['version']}: {info['path']}")
+                events.result("artifact", info["path"], version=info["version"])
+        except FileNotFoundError as e:
+            print(f"[ERROR] {e}")
+            sys.exit(1)
+    except Exception as e:
+        print(f"\n{'='*60}", flush=True)
+        print(f"[FATAL ERROR] Artifacts command failed", flush=True)
+        print(f"{'='*60}", flush=True)
+        print(f"Error Type: {type(e).__name__}", flush=True)
+        print(f"Error Message: {str(e)}", flush=True)
+        print(f"\nFull Traceback:", flush=True)
+        traceback.print_exc(file=sys.stdout)
+        print(f"{'='*60}\n", flush=True)
+        sys.exit(1)
+
+
+def cmd_timings(args: argparse.Namespace) -> None:
+    """Print per-stage and per-call-kind timing trends from the latency history."""
+    try:
+        store = history()
+        keys = store.stage_keys(args.stage_command)
+        kinds = store.llm_kinds() if not args.stage_command else []
+        if not keys and not kinds:
+            print(f"[INFO] No timing history yet in: {store.path}")
+            return
+
+        print(f"[INFO] Timing history: {store.path} (last {args.runs} successful run(s) per stage)")
+        if keys:
+            print(f"  {'command/stage':<34} {'runs':>5} {'last':>9} {'median':>9} {'p90':>9} "
+                  f"{'rate':>12} {'trend':>7}")
+        for command, stage in keys:
+            stats = store.stage_stats(stage, command, limit=args.runs)
+            if not stats:
+                continue  # Only failed runs so far
+            trend = (stats["last_s"] / stats["median_s"] - 1) * 100 if stats["median_s"] > 0 else 0.0
+            regressed = (
+                stats["count"] >= STAGE_REGRESSION_MIN_RUNS
+                and stats["last_s"] >= stats["median_s"] * STAGE_REGRESSION_RATIO
+                and stats["last_s"] - stats["median_s"] >= STAGE_REGRESSION_MIN_SECONDS
+            )
+            rate = f"{stats['median_rate']:.2f}/s" if stats["median_rate"] else "-"
+            print(f"  {command + '/' + stage:<34} {stats['count']:>5} {format_seconds(stats['last_s']):>9} "
+                  f"{format_seconds(stats['median_s']):>9} {format_seconds(stats['p90_s']):>9} "
+                  f"{rate:>12} {trend:>+6.0f}%" + ("  ⚠ regression" if regressed else ""))
+
+        if kinds:
+            print(f"\n  {'LLM call kind':<34} {'calls':>5} {'median':>9} {'p90':>9} {'output tok':>12}")
+        for kind in kinds:
+            stats = store.llm_stats(kind, limit=args.runs * 10)
+            output_tokens = f"{stats['mean_output_tokens']:.0f}" if stats["mean_output_tokens"] else "-"
+            print(f"  {kind:<34} {stats['count']:>5} {format_seconds(stats['median_s']):>9} "
+                  f"{format_seconds(stats['p90_s']):>9} {output_tokens:>12}")
+    except Exception as e:
+        print(f"\n{'='*60}", flush=True)
+        print(f"[FATAL ERROR] Timings command failed", flush=True)
+        print(f"{'='*60}", flush=True)
+        print(f"Error Type: {type(e).__name__}", flush=True)
+        print(f"Error Message: {str(e)}", flush=True)
+        print(f"\nFull Traceback:", flush=True)
+        traceback.print_exc(file=sys.stdout)
+        print(f"{'='*60}\n", flush=True)
+        sys.exit(1)
+
+
+def cmd_serve(args: argparse.Namespace) -> None:
+    """Serve CLI commands over JSON-RPC (stdio) from one warm process."""
+    from src.cli.server import serve
+    serve(build_parser, global_options)
+
+
 # ---------------------------------------------------------
 # Main CLI parser
 # ---------------------------------------------------------
-def main() -> None:
+def build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(
         prog="mvc_arch_cli",
         description="CLI for MVC Test Orchestrator (SRS → Architecture → Scaffold)",
     )
+    # Global profiling options (before the subcommand: mvc_arch_cli --profile extract ...)
+    parser.add_argument(
+        "--profile",
+        nargs="?",
+        const="",
+        default=None,
+        metavar="TRACE_PATH",
+        help=f"Record phase timings; writes a Chrome/Perfetto trace (default: {PROFILE_DIR}/<command>-<time>.trace.json) "
+             "and prints a per-phase summary.",
+    )
+    parser.add_argument(
+        "--profile-cpu",
+        action="store_true",
+        help="With --profile: also write a cProfile dump (.prof, open with snakeviz or pstats).",
+    )
+    parser.add_argument(
+        "--profile-memory",
+        action="store_true",
+        help="With --profile: also trace allocations with tracemalloc (top sites + peak memory).",
+    )
+    parser.add_argument(
+        "--workspace",
+        default=None,
+        metavar="DIR",
+        help="Workspace root for data/, scaffolds/ and generated_src/ (default: repository root, "
+             "or $MVC_WORKSPACE_ROOT). Prompts are always read from the repository.",
+    )
+    parser.add_argument(
+        "--run-id",
+        default=None,
+        metavar="ID",
+        help=f"Run in its own workspace {RUNS_DIR}/<ID>/ under the workspace root ('auto': time + pid), "
+             "so independent runs on one machine never share artifacts.",
+    )
+    parser.add_argument(
+        "--events",
+        choices=["text", "ndjson"],
+        default="text",
+        help="ndjson: write structured progress events (one JSON object per line) to stdout "
+             "and the human-readable log to stderr. See src/core/events.py.",
+    )
 
     subparsers = parser.add_subparsers(dest="command", required=True)
 
@@ -872,8 +1518,87 @@ def main() -> None:
         required=True,
         help="Path to write architecture JSON (default: data/architecture_map.json).",
     )
+    p_extract.add_argument(
+        "--project",
+        default=None,
+        help="Project collection used for retrieval (default: shared collection).",
+    )
+    p_extract.add_argument(
+        "--force",
+        action="store_true",
+        help="Re-run every extraction stage even if its inputs are unchanged.",
+    )
+    p_extract.add_argument(
+        "--mode",
+        choices=["staged", "combined", "mapreduce"],
+        default="staged",
+        help="'staged': one LLM call per layer (default). 'combined': one call for requirements, "
+             "model, controller and view (faster for small/medium SRS). 'mapreduce': one call per "
+             "SRS section, run concurrently and merged (very large SRS).",
+    )
+    p_extract.add_argument(
+        "--no-dedup",
+        action="store_true",
+        help="Keep near-duplicate models/controllers/views (skip embedding-based merging).",
+    )
+    p_extract.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Only estimate the run: LLM calls, tokens, wall time and daily quota share. "
+             "Builds the prompts but sends nothing and writes no artifacts.",
+    )
     p_extract.set_defaults(func=cmd_extract)
     
+    p_index_docs = subparsers.add_parser(
+        "index",
+        help="Index SRS documents (.txt/.pdf files or directories) into the persistent vector store. No LLM calls.",
+    )
+    p_index_docs.add_argument(
+        "paths",
+        nargs="+",
+        help="SRS files and/or directories containing .txt/.pdf files.",
+    )
+    p_index_docs.add_argument(
+        "--workers",
+        type=int,
+        default=INDEX_MAX_WORKERS,
+        help=f"Number of documents ingested in parallel (default: {INDEX_MAX_WORKERS}).",
+    )
+    p_index_docs.add_argument(
+        "--summaries",
+        action="store_true",
+        help="Also build the cached hierarchical summary tree per document (uses the LLM).",
+    )
+    p_index_docs.add_argument(
+        "--project",
+        default=None,
+        help="Project collection to index into (default: shared collection).",
+    )
+    p_index_docs.set_defaults(func=cmd_index)
+
+    p_search = subparsers.add_parser(
+        "search",
+        help="Search indexed SRS chunks across project collections (concurrent fan-out). No LLM calls.",
+    )
+    p_search.add_argument(
+        "--query",
+        required=True,
+        help="Search text.",
+    )
+    p_search.add_argument(
+        "--projects",
+        nargs="+",
+        default=None,
+        help="Project collections to search (default: all registered projects).",
+    )
+    p_search.add_argument(
+        "-k",
+        type=int,
+        default=DEFAULT_TOP_K,
+        help=f"Number of merged results (default: {DEFAULT_TOP_K}).",
+    )
+    p_search.set_defaults(func=cmd_search)
+
     p_index = subparsers.add_parser(
         "index-srs",
         help="[LEGACY] Alias for 'extract' command.",
@@ -911,7 +1636,7 @@ def main() -> None:
         "--arch-path",
         required=False,
         help="[OPTIONAL] Path to architecture JSON file. Audit works without it (direct file scanning).",
-        default="data/architecture_map.json",
+        default=None,
     )
     p_audit.set_defaults(func=cmd_run_audit)
     
@@ -933,14 +1658,38 @@ def main() -> None:
     p_generate_code.add_argument(
         "--category",
         required=True,
-        choices=["model", "controller", "view"],
-        help="Category to generate code for (model, controller, or view)",
+        nargs="+",
+        choices=["model", "controller", "view", "all"],
+        help="Category/categories to generate code for (model, controller, view, or all)",
+    )
+    p_generate_code.add_argument(
+        "--jobs",
+        type=int,
+        default=GENERATION_MAX_WORKERS,
+        help=f"LLM calls in flight at the same time (default: {GENERATION_MAX_WORKERS}; "
+             "call starts are still paced by LLM_MIN_CALL_INTERVAL).",
+    )
+    p_generate_code.add_argument(
+        "--force",
+        action="store_true",
+        help="Regenerate every file, even if its inputs are unchanged since the last run.",
     )
     p_generate_code.add_argument(
         "--arch-path",
         required=True,
         help="Path to architecture JSON file (from 'extract' command).",
     )
+    p_generate_code.add_argument(
+        "--project",
+        default=None,
+        help="Project collection used for retrieval (default: shared collection).",
+    )
+    p_generate_code.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Only estimate the run: LLM calls, tokens, wall time and daily quota share. "
+             "Builds the prompts but sends nothing and writes no code.",
+    )
     p_generate_code.set_defaults(func=cmd_generate_code)
     
     p_fix = subparsers.add_parser(
@@ -952,12 +1701,266 @@ def main() -> None:
         type=str,
         help="Path to audit report JSON (default: data/final_audit_report.json)",
     )
+    p_fix.add_argument(
+        "--yes",
+        action="store_true",
+        help="Apply fixes without the interactive confirmation (the caller has already confirmed).",
+    )
     p_fix.set_defaults(func=cmd_run_fix)
 
+    p_pipeline = subparsers.add_parser(
+        "pipeline",
+        help="Run a range of stages (create-srs ... fix) in one process with shared clients.",
+    )
+    p_pipeline.add_argument(
+        "--user-idea",
+        default=None,
+        help="Project idea; starts the pipeline with create-srs.",
+    )
+    p_pipeline.add_argument(
+        "--srs-path",
+        default=None,
+        help="SRS file (written by create-srs, read by extract). Default: data/srs_document.txt",
+    )
+    p_pipeline.add_argument(
+        "--arch-path",
+        default=None,
+        help="Architecture JSON (written by extract). Default: data/architecture_map.json",
+    )
+    p_pipeline.add_argument(
+        "--from-stage",
+        choices=PIPELINE_STAGES,
+        default=None,
+        help="First stage to run (default: create-srs with --user-idea, otherwise extract). "
+             "Use it to resume after a failed stage.",
+    )
+    p_pipeline.add_argument(
+        "--to-stage",
+        choices=PIPELINE_STAGES,
+        default="audit",
+        help="Last stage to run (default: audit; 'fix' applies the audit recommendations).",
+    )
+    p_pipeline.add_argument(
+        "--project",
+        default=None,
+        help="Project collection used for retrieval (default: shared collection).",
+    )
+    p_pipeline.add_argument(
+        "--mode",
+        choices=["staged", "combined", "mapreduce"],
+        default="staged",
+        help="Extraction mode (see 'extract --mode').",
+    )
+    p_pipeline.add_argument(
+        "--force",
+        action="store_true",
+        help="Re-run every extraction stage even if its inputs are unchanged.",
+    )
+    p_pipeline.add_argument(
+        "--no-dedup",
+        action="store_true",
+        help="Keep near-duplicate models/controllers/views.",
+    )
+    p_pipeline.add_argument(
+        "--jobs",
+        type=int,
+        default=None,
+        help=f"Concurrent generate-code calls (default: {GENERATION_MAX_WORKERS}).",
+    )
+    p_pipeline.set_defaults(func=cmd_pipeline)
+
+    p_batch = subparsers.add_parser(
+        "batch",
+        help="Run the pipeline for every SRS in a manifest, each project in its own workspace, "
+             "on a process pool with one shared LLM rate limit.",
+    )
+    p_batch.add_argument(
+        "manifest",
+        help="JSON manifest: {\"defaults\": {...}, \"projects\": [{\"name\": ..., \"srs\": ...}, ...]}. "
+             "See src/cli/batch.py.",
+    )
+    p_batch.add_argument(
+        "--workers",
+        type=int,
+        default=BATCH_MAX_WORKERS,
+        help=f"Projects running at the same time, one process each (default: {BATCH_MAX_WORKERS}).",
+    )
+    p_batch.add_argument(
+        "--workspaces-dir",
+        default=None,
+        help=f"Folder for the per-project workspaces and the report (default: {BATCH_WORKSPACES_DIR}/).",
+    )
+    p_batch.add_argument(
+        "--to-stage",
+        choices=PIPELINE_STAGES,
+        default="audit",
+        help="Last pipeline stage for projects that do not set 'to_stage' (default: audit).",
+    )
+    p_batch.add_argument(
+        "--mode",
+        choices=["staged", "combined", "mapreduce"],
+        default="staged",
+        help="Extraction mode for projects that do not set 'mode' (default: staged).",
+    )
+    p_batch.add_argument(
+        "--force",
+        action="store_true",
+        help="Re-run every stage of every project even if its inputs are unchanged.",
+    )
+    p_batch.set_defaults(func=cmd_batch)
+
+    p_artifacts = subparsers.add_parser(
+        "artifacts",
+        help="List, show or roll back stored versions of a data/ artifact (e.g. final_audit_report.json).",
+    )
+    p_artifacts.add_argument(
+        "action",
+        choices=["list", "show", "rollback"],
+        help="'list': stored versions; 'show': print one version (current without --version); "
+             "'rollback': make --version the current file again.",
+    )
+    p_artifacts.add_argument(
+        "name",
+        help="Artifact file name in data/, e.g. architecture_map.json, violations.json.",
+    )
+    p_artifacts.add_argument(
+        "--version",
+        default=None,
+        help="Version id (content hash) from 'artifacts list'.",
+    )
+    p_artifacts.set_defaults(func=cmd_artifacts)
+
+    p_timings = subparsers.add_parser(
+        "timings",
+        help="Show the stage and LLM call timing history (trends, regressions) of this workspace.",
+    )
+    p_timings.add_argument(
+        "--command",
+        dest="stage_command",
+        default=None,
+        help="Only stages of this command (e.g. extract, generate-code, audit, pipeline).",
+    )
+    p_timings.add_argument(
+        "--runs",
+        type=int,
+        default=STAGE_HISTORY_RUNS,
+        help=f"Latest successful runs per stage to summarize (default: {STAGE_HISTORY_RUNS}).",
+    )
+    p_timings.set_defaults(func=cmd_timings)
+
+    p_serve = subparsers.add_parser(
+        "serve",
+        help="Run as a long-lived JSON-RPC server on stdio (keeps LLM client, embedding model and indexes warm).",
+    )
+    p_serve.set_defaults(func=cmd_serve)
+
+    return parser
+
+
+def _start_profiling(args: argparse.Namespace) -> None:
+    if args.profile is None and (args.profile_cpu or args.profile_memory):
+        args.profile = ""
+    if args.profile is None:
+        return
+    profiler.start(cprofile=args.profile_cpu, tracemalloc=args.profile_memory)
+
+
+def _finish_profiling(args: argparse.Namespace, started_at: float) -> None:
+    """Writes the trace (and optional cProfile / tracemalloc files) and prints the phase summary."""
+    if args.profile is None:
+        return
+    profiler.stop()
+    if args.profile:
+        trace_path = Path(args.profile).resolve()
+    else:
+        stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(started_at))
+        trace_path = workspace.workspace_root() / PROFILE_DIR / f"{args.command}-{stamp}.trace.json"
+    name = trace_path.name
+    stem = name[:-len(".trace.json")] if name.endswith(".trace.json") else trace_path.stem
+
+    try:
+        profiler.print_summary()
+        profiler.write_chrome_trace(trace_path, {"command": args.command, "argv": sys.argv[1:]})
+        print(f"[PROFILE] Trace: {trace_path} (open in https://ui.perfetto.dev or chrome://tracing)", flush=True)
+        cprofile_path = profiler.write_cprofile(trace_path.with_name(stem + ".prof"))
+        if cprofile_path:
+            print(f"[PROFILE] cProfile: {cprofile_path}", flush=True)
+        memory_path = profiler.write_tracemalloc(trace_path.with_name(stem + ".memory.txt"))
+        if memory_path:
+            print(f"[PROFILE] tracemalloc: {memory_path}", flush=True)
+    except OSError as e:
+        print(f"[WARN] Could not write profile output: {e}", flush=True)
+
+
+def _apply_run_id(run_id: str) -> str:
+    """Selects the run workspace <workspace root>/runs/<run id>/; returns the run id."""
+    if run_id == "auto":
+        run_id = f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}"
+    elif not re.fullmatch(r"[A-Za-z0-9_.-]+", run_id) or run_id in (".", ".."):
+        print(f"[ERROR] Invalid --run-id '{run_id}' (allowed: letters, digits, '_', '.', '-').")
+        sys.exit(2)
+    root = workspace.set_workspace_root(workspace.workspace_root() / RUNS_DIR / run_id)
+    print(f"[INFO] Run workspace: {root}", file=sys.stderr, flush=True)
+    return run_id
+
+
+def _apply_global_options(args: argparse.Namespace) -> None:
+    """Applies --workspace, then --run-id (a run workspace under that root)."""
+    if args.workspace:
+        workspace.set_workspace_root(args.workspace)
+    if args.run_id:
+        args.run_id = _apply_run_id(args.run_id)
+
+
+@contextmanager
+def global_options(args: argparse.Namespace):
+    """
+    Applies the global options of one command (--workspace, --run-id, --profile)
+    and undoes them afterwards, so the 'serve' process can run every request
+    in its own workspace. --events does not apply there: events are always
+    sent as notifications.
+    """
+    previous_root = os.environ.get(workspace.WORKSPACE_ENV_VAR)
+    started_at = time.time()
+    profiling = False
+    try:
+        _apply_global_options(args)
+        _start_profiling(args)
+        profiling = True
+        yield
+    finally:
+        if profiling:
+            _finish_profiling(args, started_at)
+        if previous_root is None:
+            os.environ.pop(workspace.WORKSPACE_ENV_VAR, None)
+        else:
+            os.environ[workspace.WORKSPACE_ENV_VAR] = previous_root
+
+
+def main() -> None:
+    parser = build_parser()
     args = parser.parse_args()
+    started_at = time.time()
+    _apply_global_options(args)
+    _start_profiling(args)
+    if args.events == "ndjson":
+        # stdout is reserved for events; the usual prints go to stderr
+        events.to_ndjson(sys.stdout)
+        sys.stdout = LogTap(sys.stderr, events)
+    # Stage timings of this run go to the latency history (regressions are flagged at the end)
+    recorder = StageRecorder(args.command, run_id=args.run_id)
+    events.add_listener(recorder)
+    events.emit("command_start", command=args.command, run_id=args.run_id,
+                workspace=str(workspace.workspace_root()))
+    exit_code = 0
     try:
-        args.func(args)
+        with span(f"command.{args.command}"):
+            args.func(args)
+    except SystemExit as e:
+        exit_code = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+        raise
     except Exception as e:
+        exit_code = 1
         print(f"\n{'='*60}", flush=True)
         print(f"[FATAL ERROR] Command execution failed", flush=True)
         print(f"{'='*60}", flush=True)
@@ -967,6 +1970,12 @@ def main() -> None:
         traceback.print_exc(file=sys.stdout)
         print(f"{'='*60}\n", flush=True)
         sys.exit(1)
+    finally:
+        events.remove_listener(recorder)
+        recorder.finish()
+        _finish_profiling(args, started_at)
+        events.emit("command_end", command=args.command, exit_code=exit_code,
+                    duration_s=round(time.time() - started_at, 3))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,265 @@
+# src/cli/server.py
+"""
+Long-lived CLI server speaking JSON-RPC 2.0 over stdio (one JSON object per line).
+
+`python -m src.cli.mvc_arch_cli serve` keeps the process alive between
+requests, so the LLM client, the embedding model, Chroma clients and the
+in-process caches (src/core/resources.py) are paid for once instead of once
+per command.
+
+Requests:
+    {"jsonrpc": "2.0", "id": 1, "method": "extract", "params": {"argv": ["--srs-path", "..."]}}
+    {"jsonrpc": "2.0", "id": 2, "method": "ping"}
+
+Every CLI subcommand is a method; its params are the usual command-line
+arguments ("argv" list, or the list itself as params). Global options
+(--workspace, --run-id, --profile) go in an optional "global" list:
+    {"jsonrpc": "2.0", "id": 3, "method": "extract",
+     "params": {"global": ["--run-id", "auto"], "argv": ["--mode", "combined"]}}
+They apply to that request only; the previous workspace is restored afterwards.
+Built-in methods: ping, status, shutdown.
+
+While a command runs, its printed lines are streamed as notifications
+    {"jsonrpc": "2.0", "method": "log", "params": {"id": 1, "text": "..."}}
+and its structured progress events (src/core/events.py) as
+    {"jsonrpc": "2.0", "method": "event", "params": {"id": 1, "event": "progress", ...}}
+and the response carries the exit code and the full output:
+    {"jsonrpc": "2.0", "id": 1, "result": {"exit_code": 0, "output": "..."}}
+"""
+import argparse
+import io
+import json
+import sys
+import threading
+import time
+import traceback
+from contextlib import nullcontext, redirect_stderr, redirect_stdout
+from typing import Any, Callable, ContextManager, Dict, List, Optional, TextIO
+
+from src.core.events import events, LogTap
+from src.core.latency_history import StageRecorder
+from src.core.resources import registry
+
+# JSON-RPC 2.0 error codes
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+
+# Subcommands that cannot run inside the server
+EXCLUDED_COMMANDS = ("serve",)
+
+
+class _StreamingOutput(io.TextIOBase):
+    """
+    File-like object installed as sys.stdout/stderr during a command: keeps the
+    whole output and forwards every completed line as a "log" notification.
+    """
+
+    def __init__(self, emit_line: Callable[[str], None]):
+        self._emit_line = emit_line
+        self._buffer = ""
+        self._lines: List[str] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, text: str) -> int:
+        self._buffer += text
+        while "\n" in self._buffer:
+            line, self._buffer = self._buffer.split("\n", 1)
+            self._lines.append(line)
+            self._emit_line(line)
+        return len(text)
+
+    def flush(self) -> None:
+        pass
+
+    def getvalue(self) -> str:
+        if self._buffer:
+            self._lines.append(self._buffer)
+            self._emit_line(self._buffer)
+            self._buffer = ""
+        return "\n".join(self._lines)
+
+
+class CLIServer:
+    """
+    Runs CLI subcommands in-process, one request at a time (commands share
+    process state such as data/ files), with warm shared resources.
+    """
+
+    def __init__(
+        self,
+        parser_factory: Callable[[], argparse.ArgumentParser],
+        stdin: Optional[TextIO] = None,
+        stdout: Optional[TextIO] = None,
+        global_scope: Optional[Callable[[argparse.Namespace], ContextManager]] = None,
+    ):
+        self.parser_factory = parser_factory
+        # Applies and afterwards restores the global options of one command
+        self.global_scope = global_scope or (lambda args: nullcontext())
+        self.stdin = stdin or sys.stdin
+        self.stdout = stdout or sys.stdout
+        self.started_at = time.time()
+        self.requests_served = 0
+        self._running = False
+        self._write_lock = threading.Lock()
+
+    # ----------------------------------------------------------------------
+    # Main Loop
+    # ----------------------------------------------------------------------
+    def serve_forever(self) -> None:
+        self._running = True
+        self._notify("ready", {"commands": self._commands()})
+        for line in self.stdin:
+            line = line.strip()
+            if not line:
+                continue
+            response = self.handle_line(line)
+            if response is not None:
+                self._send(response)
+            if not self._running:
+                break
+
+    def handle_line(self, line: str) -> Optional[Dict[str, Any]]:
+        try:
+            request = json.loads(line)
+        except json.JSONDecodeError as e:
+            return self._error(None, PARSE_ERROR, f"Parse error: {e}")
+        if not isinstance(request, dict) or not isinstance(request.get("method"), str):
+            return self._error(request.get("id") if isinstance(request, dict) else None,
+                               INVALID_REQUEST, "Invalid request")
+
+        request_id = request.get("id")
+        method = request["method"]
+        params = request.get("params")
+
+        try:
+            if method == "ping":
+                result = "pong"
+            elif method == "status":
+                result = self._status()
+            elif method == "shutdown":
+                self._running = False
+                result = "bye"
+            elif method in self._commands():
+                result = self._run_command(request_id, method, params)
+            else:
+                return self._error(request_id, METHOD_NOT_FOUND, f"Unknown method: {method}")
+        except ValueError as e:
+            return self._error(request_id, INVALID_PARAMS, str(e))
+
+        self.requests_served += 1
+        # Requests without an id are notifications: no response
+        if request_id is None:
+            return None
+        return {"jsonrpc": "2.0", "id": request_id, "result": result}
+
+    # ----------------------------------------------------------------------
+    # Commands
+    # ----------------------------------------------------------------------
+    def _commands(self) -> List[str]:
+        parser = self.parser_factory()
+        for action in parser._actions:
+            if isinstance(action, argparse._SubParsersAction):
+                return [name for name in action.choices if name not in EXCLUDED_COMMANDS]
+        return []
+
+    def _run_command(self, request_id: Any, method: str, params: Any) -> Dict[str, Any]:
+        global_argv: List[str] = []
+        if params is None:
+            argv: List[str] = []
+        elif isinstance(params, list):
+            argv = params
+        elif (isinstance(params, dict) and isinstance(params.get("argv", []), list)
+              and isinstance(params.get("global", []), list)):
+            argv = params.get("argv", [])
+            global_argv = params.get("global", [])
+        else:
+            raise ValueError("params must be a list of arguments or {\"argv\": [...], \"global\": [...]}")
+        argv = [str(arg) for arg in argv]
+        global_argv = [str(arg) for arg in global_argv]
+
+        output = _StreamingOutput(
+            lambda text: self._notify("log", {"id": request_id, "text": text})
+        )
+        log = LogTap(output, events)
+        exit_code = 0
+        started = time.perf_counter()
+        # stdin is the protocol stream: commands must never read from it
+        original_stdin = sys.stdin
+        sys.stdin = io.StringIO("")
+        events.set_sink(lambda event: self._notify("event", {"id": request_id, **event}))
+        recorder = StageRecorder(method)
+        events.add_listener(recorder)
+        events.emit("command_start", command=method)
+        try:
+            with redirect_stdout(log), redirect_stderr(log):
+                try:
+                    # The root parser reads the global options, as on the command line
+                    args = self.parser_factory().parse_args(global_argv + [method] + argv)
+                    if args.command != method:
+                        print(f"[ERROR] params.global takes global options only, not a command.")
+                        sys.exit(2)
+                    with self.global_scope(args):
+                        recorder.run_id = args.run_id
+                        args.func(args)
+                except SystemExit as e:
+                    exit_code = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+                    if isinstance(e.code, str):
+                        print(e.code)
+                except Exception:
+                    traceback.print_exc(file=sys.stdout)
+                    exit_code = 1
+                recorder.finish()  # Regression warnings go to this request's log
+        finally:
+            events.remove_listener(recorder)
+            sys.stdin = original_stdin
+            events.emit("command_end", command=method, exit_code=exit_code,
+                        duration_s=round(time.perf_counter() - started, 3))
+            events.set_sink(None)
+
+        return {
+            "exit_code": exit_code,
+            "output": output.getvalue(),
+            "duration_s": round(time.perf_counter() - started, 3),
+        }
+
+    def _status(self) -> Dict[str, Any]:
+        return {
+            "uptime_s": round(time.time() - self.started_at, 1),
+            "requests_served": self.requests_served,
+            "loaded_resources": [f"{kind}:{config}" for kind, config in registry.loaded()],
+        }
+
+    # ----------------------------------------------------------------------
+    # Protocol
+    # ----------------------------------------------------------------------
+    @staticmethod
+    def _error(request_id: Any, code: int, message: str) -> Dict[str, Any]:
+        return {"jsonrpc": "2.0", "id": request_id, "error": {"code": code, "message": message}}
+
+    def _notify(self, method: str, params: Dict[str, Any]) -> None:
+        self._send({"jsonrpc": "2.0", "method": method, "params": params})
+
+    def _send(self, message: Dict[str, Any]) -> None:
+        with self._write_lock:
+            self.stdout.write(json.dumps(message, ensure_ascii=False) + "\n")
+            self.stdout.flush()
+
+
+def serve(
+    parser_factory: Callable[[], argparse.ArgumentParser],
+    global_scope: Optional[Callable[[argparse.Namespace], ContextManager]] = None,
+) -> None:
+    """Entry point of the 'serve' subcommand (stdio transport)."""
+    # Protocol messages own the real stdout; stray prints outside a request go to stderr
+    protocol_out = sys.stdout
+    sys.stdout = sys.stderr
+    try:
+        CLIServer(
+            parser_factory, stdin=sys.stdin, stdout=protocol_out, global_scope=global_scope,
+        ).serve_forever()
+    finally:
+        sys.stdout = protocol_out
@@ -0,0 +1,107 @@
+# src/core/architecture_merge.py
+"""
+Helpers for merging architecture items (entities, functions, controllers,
+views) that describe the same thing. Used by the map-reduce extraction merge
+and by the embedding-based deduplication stage.
+"""
+import re
+from typing import Any, Dict, Iterable, List, Optional
+
+# Suffixes ignored when matching names ("UserController" == "User")
+CONTROLLER_SUFFIXES = ("controller",)
+VIEW_SUFFIXES = ("view", "screen", "page")
+
+
+def normalize_name(name: str, strip_suffixes: Iterable[str] = ()) -> str:
+    """'User Controller', 'user_controller', 'UserController' -> 'user'."""
+    key = re.sub(r"[^a-z0-9]", "", str(name).lower())
+    for suffix in strip_suffixes:
+        if key.endswith(suffix) and len(key) > len(suffix):
+            key = key[: -len(suffix)]
+            break
+    return key
+
+
+# Plural forms a suffix rule cannot handle, and words whose singular already ends in "s"
+_IRREGULAR_PLURALS = {"people": "person", "children": "child"}
+_SINGULAR_ENDINGS = ("ss", "us", "is", "news", "series", "species")
+_IE_SINGULARS = ("movie", "cookie", "calorie", "rookie", "selfie", "zombie", "pie", "tie")
+
+
+def singularize(key: str) -> str:
+    """
+    English singular of a normalised name key ('categories' -> 'category',
+    'addresses' -> 'address', 'statuses' -> 'status', 'houses' -> 'house').
+    Singular words ending in s ('status', 'address', 'analysis') are kept.
+    """
+    for plural, singular in _IRREGULAR_PLURALS.items():
+        if key.endswith(plural):
+            return key[: -len(plural)] + singular
+    if len(key) <= 3 or not key.endswith("s") or key.endswith(_SINGULAR_ENDINGS):
+        return key
+    if key.endswith("ies"):
+        return key[:-1] if key[:-1].endswith(_IE_SINGULARS) else key[:-3] + "y"
+    if key.endswith(("sses", "xes", "ches", "shes")):
+        return key[:-2]
+    if key.endswith("uses") and len(key) > 4 and key[-5] not in "aeiou":
+        return key[:-2]  # statuses, bonuses (but houses, causes)
+    return key[:-1]
+
+
+def union(first: List[Any], second: List[Any]) -> List[Any]:
+    """Order-preserving union; strings are compared by normalised form."""
+    result = list(first)
+    seen = {normalize_name(item) if isinstance(item, str) else repr(item) for item in result}
+    for item in second:
+        key = normalize_name(item) if isinstance(item, str) else repr(item)
+        if key not in seen:
+            seen.add(key)
+            result.append(item)
+    return result
+
+
+def merge_into(target: Dict[str, Any], entry: Dict[str, Any]) -> None:
+    """
+    Merges `entry` into `target` (the name of `target` is kept):
+    - list fields (e.g. actions) are unioned in first-seen order
+    - text fields keep the most detailed (longest) value
+    """
+    for field, value in entry.items():
+        if field == "name":
+            continue
+        current = target.get(field)
+        if isinstance(value, list):
+            target[field] = union(current if isinstance(current, list) else [], value)
+        elif isinstance(value, str):
+            if len(value.strip()) > len(str(current or "").strip()):
+                target[field] = value
+        elif current is None:
+            target[field] = value
+
+
+def merge_entries(
+    groups: Iterable[Optional[List[Any]]],
+    strip_suffixes: Iterable[str] = (),
+) -> List[Dict[str, Any]]:
+    """
+    Deduplicates entries by normalised name (see merge_into for the fields).
+    The first-seen spelling of the name is kept.
+    """
+    strip_suffixes = tuple(strip_suffixes)
+    merged: Dict[str, Dict[str, Any]] = {}
+
+    for entries in groups:
+        for entry in entries or []:
+            if not isinstance(entry, dict) or not str(entry.get("name") or "").strip():
+                continue
+            key = normalize_name(entry["name"], strip_suffixes)
+            target = merged.get(key)
+            if target is None:
+                merged[key] = {
+                    field: list(value) if isinstance(value, list) else value
+                    for field, value in entry.items()
+                }
+            else:
+                merge_into(target, entry)
+
+    return list(merged.values())
@@ -0,0 +1,205 @@
+# src/core/artifact_store.py
+"""
+Atomic, content-versioned JSON artifacts in data/.
+
+    store = ArtifactStore(workspace.data_dir())
+    info = store.write("violations.json", {"violations": [...], "total_count": 3})
+    info["version"]                                   # "3f9a0c2d41e7b5a8"
+    store.read("violations.json", version="3f9a0c2d41e7b5a8")
+
+Layout (per data directory):
+    <name>                              current version, pretty JSON (ARTIFACT_PRETTY_JSON)
+    .versions/<name>/<version>.json     compact JSON, immutable, named by content hash
+    .versions/<name>/history.jsonl      one line per change: version, time, size
+
+Every file is written to a temporary file in the same directory and moved
+into place with os.replace(), so readers see either the previous or the new
+content, never a partial file; no read-back check is needed. Identical
+content maps to the same version, so re-writing an unchanged artifact costs
+no extra file. Reading a version is a direct path lookup. Only the last
+ARTIFACT_MAX_VERSIONS versions of each artifact are kept.
+
+Writers of one artifact are serialised by a thread lock and an advisory
+file lock (data/.locks/artifact.<name>.lock), so runs in other processes
+sharing the data directory never interleave their history updates. Readers
+take no lock: version files never change once written, and snapshot()
+returns the latest version together with its content.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.core.config import ARTIFACT_PRETTY_JSON, ARTIFACT_MAX_VERSIONS, LOCKS_DIR
+from src.core.locks import FileLock
+
+VERSIONS_DIR = ".versions"
+HISTORY_FILE = "history.jsonl"
+
+# Shared by every store instance of the process (several may point at one data/)
+_write_lock = threading.Lock()
+
+
+def atomic_write_text(path: Path, text: str, durable: bool = True) -> Path:
+    """Writes `text` through a temporary file and an atomic rename."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(text)
+            if durable:
+                f.flush()
+                try:
+                    os.fsync(f.fileno())
+                except OSError:
+                    pass  # Some file systems don't support fsync
+        os.replace(tmp_path, path)
+    finally:
+        if tmp_path.exists():
+            tmp_path.unlink()
+    return path
+
+
+def compact_json(data: Any) -> str:
+    """Machine format: no whitespace, key order kept."""
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+
+
+class ArtifactStore:
+    """Versioned JSON artifacts of one data directory (safe across threads and processes)."""
+
+    def __init__(
+        self,
+        data_dir: Path,
+        pretty: bool = ARTIFACT_PRETTY_JSON,
+        max_versions: int = ARTIFACT_MAX_VERSIONS,
+    ):
+        self.data_dir = Path(data_dir)
+        self.pretty = pretty
+        self.max_versions = max_versions
+
+    # ----------------------------------------------------------------------
+    # Paths
+    # ----------------------------------------------------------------------
+    def path(self, name: str) -> Path:
+        return self.data_dir / name
+
+    def version_path(self, name: str, version: str) -> Path:
+        return self.data_dir / VERSIONS_DIR / name / f"{version}.json"
+
+    def _history_path(self, name: str) -> Path:
+        return self.data_dir / VERSIONS_DIR / name / HISTORY_FILE
+
+    def _file_lock(self, name: str) -> FileLock:
+        return FileLock(self.data_dir / LOCKS_DIR / f"artifact.{name}.lock", label=f"artifact {name}")
+
+    # ----------------------------------------------------------------------
+    # Writing
+    # ----------------------------------------------------------------------
+    def write(self, name: str, data: Any, pretty: Optional[bool] = None) -> Dict[str, Any]:
+        """
+        Stores `data` as the current version of `name`.
+
+        Returns:
+            {"name", "version", "path", "version_path", "bytes", "changed"}
+        """
+        compact = compact_json(data)
+        version = hashlib.sha256(compact.encode("utf-8")).hexdigest()[:16]
+        version_path = self.version_path(name, version)
+        pretty = self.pretty if pretty is None else pretty
+
+        with _write_lock, self._file_lock(name):
+            if not version_path.exists():
+                atomic_write_text(version_path, compact)
+            text = json.dumps(data, indent=4, ensure_ascii=False) if pretty else compact
+            atomic_write_text(self.path(name), text)
+
+            history = self._read_history(name)
+            changed = not history or history[-1]["version"] != version
+            if changed:
+                self._append_history(name, {"version": version, "ts": round(time.time(), 3),
+                                            "bytes": len(compact.encode("utf-8"))})
+                self._prune(name, history + [{"version": version}])
+
+        return {
+            "name": name,
+            "version": version,
+            "path": self.path(name),
+            "version_path": version_path,
+            "bytes": len(text.encode("utf-8")),
+            "changed": changed,
+        }
+
+    def rollback(self, name: str, version: str) -> Dict[str, Any]:
+        """Makes a stored version the current one again (recorded as a new history entry)."""
+        return self.write(name, self.read(name, version))
+
+    def _append_history(self, name: str, entry: Dict[str, Any]) -> None:
+        history_path = self._history_path(name)
+        history_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(history_path, "a", encoding="utf-8") as f:
+            f.write(compact_json(entry) + "\n")
+
+    def _prune(self, name: str, history: List[Dict[str, Any]]) -> None:
+        """Deletes version files no longer among the last `max_versions` entries."""
+        if self.max_versions <= 0 or len(history) <= self.max_versions:
+            return
+        kept = history[-self.max_versions:]
+        keep = {entry["version"] for entry in kept}
+        for entry in history[:-self.max_versions]:
+            if entry["version"] not in keep:
+                self.version_path(name, entry["version"]).unlink(missing_ok=True)
+        atomic_write_text(
+            self._history_path(name),
+            "".join(compact_json(entry) + "\n" for entry in self._read_history(name)[-self.max_versions:]),
+        )
+
+    # ----------------------------------------------------------------------
+    # Reading
+    # ----------------------------------------------------------------------
+    def read(self, name: str, version: Optional[str] = None) -> Any:
+        """Current content of `name`, or the stored `version` (a direct file lookup)."""
+        path = self.path(name) if version is None else self.version_path(name, version)
+        if not path.exists():
+            raise FileNotFoundError(
+                f"Artifact not found: {name}" + (f" (version {version})" if version else "")
+            )
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def snapshot(self, name: str) -> Tuple[Optional[str], Any]:
+        """
+        (version, content) of the latest version, read without a lock from
+        its immutable version file; (None, content of the current file) for
+        artifacts written before versioning.
+        """
+        version = self.current_version(name)
+        if version and self.version_path(name, version).exists():
+            return version, self.read(name, version)
+        return None, self.read(name)
+
+    def versions(self, name: str) -> List[Dict[str, Any]]:
+        """Stored versions of `name`, oldest first: [{"version", "ts", "bytes"}, ...]."""
+        return [entry for entry in self._read_history(name)
+                if self.version_path(name, entry["version"]).exists()]
+
+    def current_version(self, name: str) -> Optional[str]:
+        history = self._read_history(name)
+        return history[-1]["version"] if history else None
+
+    def _read_history(self, name: str) -> List[Dict[str, Any]]:
+        history_path = self._history_path(name)
+        if not history_path.exists():
+            return []
+        entries = []
+        with open(history_path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entries.append(json.loads(line))
+                except json.JSONDecodeError:
+                    continue  # Torn last line of an interrupted append
+        return entries
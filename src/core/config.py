@@ -8,10 +8,87 @@ LLM_MODEL_NAME = "gemini-2.5-flash"
 
 # RAG / Embedding
 COLLECTION_NAME = "srs_collection"
+CHROMA_PERSIST_DIR = "data/chroma_db"   # Persistent vector store (relative to project root)
 EMBEDDING_MODEL_NAME = "distiluse-base-multilingual-cased-v1"
 
 DEFAULT_CHUNK_SIZE = 1000       # characters
 DEFAULT_CHUNK_OVERLAP = 100     # characters
 
 DEFAULT_TOP_K = 5               # Default RAG chunk count for targeted queries
-REQUIREMENTS_TOP_K = 10         # Higher chunk count for requirements analysis (entire document overview)
\ No newline at end of file
+REQUIREMENTS_TOP_K = 10         # Higher chunk count for requirements analysis (entire document overview)
+
+INDEX_MAX_WORKERS = 4           # Parallel document ingestion for the 'index' command
+
+# Hierarchical summary tree (whole-document queries)
+SUMMARY_SECTION_MAX_CHARS = 6000    # Max characters per SRS section summarized in one call
+SUMMARY_FANOUT = 6                  # Summaries merged per reduce call (higher tree levels)
+SUMMARY_CONTEXT_MAX_CHARS = 8000    # Fixed summary budget in whole-document prompts
+SUMMARY_MIN_CHUNKS = 10             # Below this chunk count the whole SRS fits top-k, no tree needed
+
+# Query decomposition / fused retrieval (controller & view agents)
+FUSED_PER_QUERY_K = 3           # Chunks retrieved per focused sub-query
+FUSED_CHUNK_BUDGET = 10         # Max distinct chunks kept after rank fusion
+MAX_SUBQUERIES = 24             # Upper bound on sub-queries per agent call
+RRF_K = 60                      # Reciprocal rank fusion constant
+
+# Per-project collections (shards) in the persistent store
+MAX_LOADED_COLLECTIONS = 16         # Collections kept in memory before LRU eviction
+COLLECTION_IDLE_SECONDS = 900       # Collections unused this long are evicted
+FANOUT_MAX_WORKERS = 8              # Concurrent shard queries in fan-out search
+
+# Combined (single-call) extraction mode
+COMBINED_TOP_K = 12                 # Distinct chunks sent in the single combined MVC prompt
+
+# LLM call pacing (free-tier quota): minimum seconds between two call starts.
+# One limiter for every call of the process (and of all batch workers): one API key, one quota.
+LLM_MIN_CALL_INTERVAL = 12.0
+
+# Map-reduce extraction mode (very large SRS documents)
+MAPREDUCE_SECTION_MAX_CHARS = 8000  # Max characters of SRS text per section extraction call
+MAPREDUCE_MAX_WORKERS = 4           # Section extraction calls in flight at the same time
+
+# Schema-validated LLM JSON (src/core/json_repair.py)
+LLM_JSON_MAX_FOLLOWUPS = 1          # Targeted follow-up prompts for missing required keys
+
+# Embedding-based deduplication of extracted models/controllers/views (src/rag/dedup.py)
+DEDUP_SIMILARITY_THRESHOLD = 0.85   # Min cosine similarity of "name: description" embeddings to merge
+DEDUP_REPORT_FILE = "dedup_report.json"  # Merged clusters + deduplicated architecture
+
+# Code generation
+GENERATION_TOP_K = 5                # SRS chunks per view/controller in generate-code prompts
+RETRIEVAL_CONTEXTS_FILE = "retrieval_contexts.json"  # Precomputed per-class contexts (next to architecture_map.json)
+GENERATION_MAX_WORKERS = 4          # Default --jobs: code generation calls in flight at the same time
+GENERATION_RATE_LIMIT_RETRIES = 2   # Retries of one file after a 429 rate-limit response
+CODEGEN_MANIFEST_FILE = "codegen_manifest.json"  # Per-file generate-code checkpoints (in data/)
+
+# Phase profiler (global --profile flag, src/core/profiler.py)
+PROFILE_DIR = "data/profiles"       # Chrome traces / cProfile / tracemalloc output (relative to project root)
+
+# Batch runner (src/cli/batch.py)
+BATCH_MAX_WORKERS = 2               # Projects (processes) running at the same time; LLM pacing stays global
+BATCH_WORKSPACES_DIR = "batch_runs" # One workspace per project under this folder (relative to the workspace root)
+BATCH_REPORT_FILE = "batch_report.json"  # Aggregated status/throughput report (in the workspaces folder)
+
+# LLM latency history and --dry-run estimates (src/core/latency_history.py, src/cli/dry_run.py)
+LATENCY_DB_FILE = "latency_history.sqlite"  # Timings + token usage of every LLM call (in data/)
+CHARS_PER_TOKEN = 4.0               # Token estimate until the history has measured token counts
+DRY_RUN_DEFAULT_CALL_SECONDS = 20.0 # Assumed latency of one LLM call without history for its prompt kind
+DRY_RUN_DEFAULT_OUTPUT_TOKENS = 1500  # Assumed output tokens of one call without history
+LLM_DAILY_REQUEST_QUOTA = 250       # Requests per day allowed for the API key (quota share in --dry-run)
+LATENCY_FIT_MIN_CALLS = 8           # Calls of one kind before latency is predicted from prompt size
+
+# Stage timing history: ETAs and regression flags (src/core/eta.py, `timings` command)
+STAGE_HISTORY_RUNS = 20             # Earlier runs of a stage used as its baseline
+STAGE_REGRESSION_RATIO = 1.5        # Stage flagged when this many times slower than its baseline...
+STAGE_REGRESSION_MIN_SECONDS = 5.0  # ...and at least this many seconds slower (ignores jitter of fast stages)
+STAGE_REGRESSION_MIN_RUNS = 3       # Earlier runs needed before a stage can be flagged
+ETA_PRINT_INTERVAL = 15.0           # Min seconds between two [ETA] lines of one tracker
+
+# Versioned artifact store (src/core/artifact_store.py)
+ARTIFACT_PRETTY_JSON = True         # Current artifact files indented for humans; versions are always compact
+ARTIFACT_MAX_VERSIONS = 20          # Versions kept per artifact in data/.versions/
+
+# Concurrent runs on one machine (src/core/locks.py, global --run-id flag)
+LOCKS_DIR = ".locks"                # Advisory lock files (in data/)
+LOCK_TIMEOUT_SECONDS = 1800.0       # Max wait for a lock held by another run before giving up
+RUNS_DIR = "runs"                   # --run-id workspaces: <workspace root>/runs/<run id>/
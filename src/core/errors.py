@@ -0,0 +1,20 @@
+# src/core/errors.py
+# Exceptions shared by the LLM client and its callers. Kept free of heavy
+# imports so CLI commands can handle them without loading the Gemini SDK.
+
+# ============================================================
+# Custom Exception Classes (Graceful Error Handling)
+# ============================================================
+class QuotaExceededError(Exception):
+    """Günlük API kota limiti dolduğunda fırlatılır."""
+    pass
+
+
+class LLMConnectionError(Exception):
+    """Genel LLM bağlantı hatası."""
+    pass
+
+
+class LockTimeoutError(Exception):
+    """Çalışma alanı kilidi (src/core/locks.py) zamanında serbest kalmadığında fırlatılır."""
+    pass
@@ -0,0 +1,147 @@
+# src/core/eta.py
+"""
+Remaining-time estimates while a command runs.
+
+    tracker = EtaTracker("generate-code", {label: predicted_seconds, ...},
+                         workers=4, min_interval=12.0)
+    tracker.start()                      # [ETA] generate-code: 12 item(s), ~3m 40s expected
+    tracker.finish(label, seconds)       # [ETA] generate-code: 5/12 done, ~1m 50s left (about 14:32)
+
+Predictions come from the latency history (src/core/latency_history.py):
+LLM latency by call kind and prompt size, or earlier durations of the same
+stage. As items finish, the ratio of measured to predicted time corrects
+the prediction of the rest, so a slow day or a faster model shows up in the
+ETA after the first few items. The remaining items are replayed on the
+worker pool and the rate limiter like in a real run (simulate_wall_time).
+"""
+import heapq
+import threading
+import time
+from typing import Dict, List, Optional
+
+from src.core.config import DRY_RUN_DEFAULT_CALL_SECONDS, ETA_PRINT_INTERVAL, LLM_MODEL_NAME
+from src.core.events import events
+from src.core.latency_history import history
+
+# Measured/predicted ratio is kept within these bounds (one outlier must not dominate)
+_MIN_CORRECTION, _MAX_CORRECTION = 0.25, 4.0
+
+
+def simulate_wall_time(calls: List[float], workers: int, min_interval: float,
+                       start: float = 0.0, next_slot: float = 0.0):
+    """
+    Replays RateLimiter.acquire() for `calls` (latencies, in order) on
+    `workers` workers: a call starts when a worker is free and its slot has
+    come. Returns (end time, next free limiter slot).
+    """
+    free = [start] * max(1, min(workers, len(calls) or 1))
+    heapq.heapify(free)
+    end = start
+    for latency in calls:
+        slot = max(heapq.heappop(free), next_slot)
+        next_slot = slot + min_interval
+        heapq.heappush(free, slot + latency)
+        end = max(end, slot + latency)
+    return end, next_slot
+
+
+def format_seconds(seconds: float) -> str:
+    if seconds < 10:
+        return f"{seconds:.1f}s"
+    if seconds < 60:
+        return f"{seconds:.0f}s"
+    minutes, seconds = divmod(int(round(seconds)), 60)
+    if minutes < 60:
+        return f"{minutes}m {seconds:02d}s"
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}h {minutes:02d}m"
+
+
+def predict_call(kind: str, prompt_chars: Optional[int] = None):
+    """(seconds, from history) for one LLM call of `kind`."""
+    seconds = history().predict_llm_seconds(kind, prompt_chars, LLM_MODEL_NAME)
+    return (seconds, True) if seconds is not None else (DRY_RUN_DEFAULT_CALL_SECONDS, False)
+
+
+def predict_stage(stage: str, fallback_kind: Optional[str] = None):
+    """(seconds, from history) for one stage: its median duration, else its LLM call kind."""
+    stats = history().stage_stats(stage)
+    if stats:
+        return stats["median_s"], True
+    return predict_call(fallback_kind) if fallback_kind else (DRY_RUN_DEFAULT_CALL_SECONDS, False)
+
+
+class EtaTracker:
+    """ETA of a set of items (thread-safe; finish() may be called from any thread)."""
+
+    def __init__(
+        self,
+        label: str,
+        predicted: Dict[str, float],
+        workers: int = 1,
+        min_interval: float = 0.0,
+        from_history: bool = True,
+        print_interval: float = ETA_PRINT_INTERVAL,
+    ):
+        self.label = label
+        self.predicted = dict(predicted)
+        self.total = len(self.predicted)
+        self.workers = max(1, workers)
+        self.min_interval = min_interval
+        self.from_history = from_history
+        self.print_interval = print_interval
+        self._pending = dict(self.predicted)
+        self._done = 0
+        self._measured = 0.0
+        self._predicted_done = 0.0
+        self._last_print = 0.0
+        self._started = False
+        self._lock = threading.Lock()
+
+    def remaining_seconds(self) -> float:
+        correction = 1.0
+        if self._predicted_done > 0 and self._measured > 0:
+            correction = min(max(self._measured / self._predicted_done, _MIN_CORRECTION), _MAX_CORRECTION)
+        end, _ = simulate_wall_time([seconds * correction for seconds in self._pending.values()],
+                                    self.workers, self.min_interval)
+        return end
+
+    def start(self) -> None:
+        """Prints the expected total once (no-op if there is nothing to do)."""
+        with self._lock:
+            if self._started or not self._pending:
+                return
+            self._started = True
+            self._last_print = time.monotonic()
+            expected = self.remaining_seconds()
+        source = "from history" if self.from_history else "no history yet, default latency"
+        print(f"[ETA] {self.label}: {self.total} item(s), ~{format_seconds(expected)} expected ({source})",
+              flush=True)
+        events.eta(self.label, 0, self.total, expected)
+
+    def skip(self, key: str) -> None:
+        """Drops an item that turned out not to need any work (up to date)."""
+        with self._lock:
+            if self._pending.pop(key, None) is not None:
+                self.total -= 1
+
+    def finish(self, key: str, seconds: Optional[float] = None) -> None:
+        """Marks `key` done; `seconds` (its measured duration) corrects the remaining predictions."""
+        with self._lock:
+            predicted = self._pending.pop(key, None)
+            if predicted is None:
+                return
+            self._done += 1
+            if seconds is not None:
+                self._measured += seconds
+                self._predicted_done += predicted
+            remaining = self.remaining_seconds()
+            now = time.monotonic()
+            if not self._pending or now - self._last_print < self.print_interval:
+                return
+            self._last_print = now
+            done, total = self._done, self.total
+        finish_at = time.strftime("%H:%M", time.localtime(time.time() + remaining))
+        print(f"[ETA] {self.label}: {done}/{total} done, ~{format_seconds(remaining)} left "
+              f"(about {finish_at})", flush=True)
+        events.eta(self.label, done, total, remaining)
@@ -0,0 +1,169 @@
+# src/core/events.py
+"""
+Structured progress events for machine consumers (VS Code extension, CI).
+
+    mvc_arch_cli --events ndjson generate-code --category all
+
+With `--events ndjson`, stdout carries only compact JSON events, one per line,
+and the human-readable log moves to stderr:
+
+    {"v":1,"ts":1718000000.12,"event":"stage_start","stage":"model"}
+    {"v":1,"ts":1718000004.80,"event":"progress","stage":"generate-code","done":3,"total":12,"item":"models/user.py"}
+    {"v":1,"ts":1718000009.01,"event":"result","kind":"architecture_map","path":"/.../data/architecture_map.json"}
+
+Event types:
+    command_start  command
+    command_end    command, exit_code, duration_s
+    stage_start    stage
+    stage_end      stage, status ("ok" | "failed"), duration_s, [items]
+    stage_skip     stage, reason
+    timing         stage, duration_s, [items]   (work measured inside a stage, e.g. embedding)
+    progress       stage, done, total, [item, status]
+    eta            stage, done, total, remaining_s
+    metric         name, value, [unit]
+    warning        message      (also every "[WARN] ..." log line)
+    error          message      (also every "[ERROR]/[FATAL ERROR] ..." log line)
+    result         kind, path, [version]   (version: content hash in data/.versions/)
+
+Emitting is a no-op while no sink or listener is installed, so commands
+call it unconditionally. In server mode the events are sent as "event"
+notifications. Listeners (e.g. the stage timing history, see
+src/core/latency_history.py) receive every event whether or not a sink is set.
+"""
+import io
+import json
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, TextIO
+
+EVENT_SCHEMA_VERSION = 1
+
+# Log line prefixes turned into warning/error events
+_LOG_LEVELS = (
+    ("[WARN]", "warning"),
+    ("[FATAL ERROR]", "error"),
+    ("[ERROR]", "error"),
+)
+
+
+class EventStream:
+    """Thread-safe emitter; events go to the installed sink (if any)."""
+
+    def __init__(self):
+        self._sink: Optional[Callable[[Dict[str, Any]], None]] = None
+        self._listeners: List[Callable[[Dict[str, Any]], None]] = []
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self._sink is not None
+
+    def set_sink(self, sink: Optional[Callable[[Dict[str, Any]], None]]) -> None:
+        self._sink = sink
+
+    def add_listener(self, listener: Callable[[Dict[str, Any]], None]) -> None:
+        with self._lock:
+            self._listeners.append(listener)
+
+    def remove_listener(self, listener: Callable[[Dict[str, Any]], None]) -> None:
+        with self._lock:
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+
+    def to_ndjson(self, stream: TextIO) -> None:
+        """Writes every event as one compact JSON line to `stream`."""
+        def write(event: Dict[str, Any]) -> None:
+            stream.write(json.dumps(event, ensure_ascii=False, separators=(",", ":"), default=str) + "\n")
+            stream.flush()
+        self.set_sink(write)
+
+    def emit(self, event: str, **fields: Any) -> None:
+        sink = self._sink
+        if sink is None and not self._listeners:
+            return
+        payload = {"v": EVENT_SCHEMA_VERSION, "ts": round(time.time(), 3), "event": event}
+        payload.update({key: value for key, value in fields.items() if value is not None})
+        with self._lock:
+            for listener in self._listeners:
+                listener(payload)
+            if sink is not None:
+                sink(payload)
+
+    # ----------------------------------------------------------------------
+    # Typed helpers
+    # ----------------------------------------------------------------------
+    @contextmanager
+    def stage(self, name: str, **fields: Any) -> Iterator[Dict[str, Any]]:
+        """
+        Emits stage_start, then stage_end with the status and duration.
+        Yields a dict for extra stage_end fields, e.g. info["items"] = 12.
+        """
+        self.emit("stage_start", stage=name, **fields)
+        started = time.perf_counter()
+        status = "failed"
+        info: Dict[str, Any] = {}
+        try:
+            yield info
+            status = "ok"
+        finally:
+            self.emit("stage_end", stage=name, status=status,
+                      duration_s=round(time.perf_counter() - started, 3), **info)
+
+    def stage_skip(self, name: str, reason: str = "up to date") -> None:
+        self.emit("stage_skip", stage=name, reason=reason)
+
+    def progress(self, stage: str, done: int, total: int, item: Optional[str] = None,
+                 status: Optional[str] = None) -> None:
+        self.emit("progress", stage=stage, done=done, total=total, item=item, status=status)
+
+    def timing(self, stage: str, seconds: float, items: Optional[int] = None) -> None:
+        self.emit("timing", stage=stage, duration_s=round(seconds, 3), items=items)
+
+    def eta(self, stage: str, done: int, total: int, remaining_s: float) -> None:
+        self.emit("eta", stage=stage, done=done, total=total, remaining_s=round(remaining_s, 1))
+
+    def metric(self, name: str, value: Any, unit: Optional[str] = None) -> None:
+        self.emit("metric", name=name, value=value, unit=unit)
+
+    def warning(self, message: str) -> None:
+        self.emit("warning", message=message)
+
+    def result(self, kind: str, path: Any, version: Optional[str] = None) -> None:
+        self.emit("result", kind=kind, path=str(path), version=version)
+
+
+class LogTap(io.TextIOBase):
+    """
+    Text stream wrapper for the human log in events mode: passes everything
+    through to `target` and turns [WARN]/[ERROR] lines into events.
+    """
+
+    def __init__(self, target: TextIO, stream: "EventStream"):
+        self._target = target
+        self._stream = stream
+        self._buffer = ""
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, text: str) -> int:
+        self._target.write(text)
+        self._buffer += text
+        while "\n" in self._buffer:
+            line, self._buffer = self._buffer.split("\n", 1)
+            self._tap(line.strip())
+        return len(text)
+
+    def flush(self) -> None:
+        self._target.flush()
+
+    def _tap(self, line: str) -> None:
+        for prefix, event in _LOG_LEVELS:
+            if line.startswith(prefix):
+                self._stream.emit(event, message=line[len(prefix):].strip())
+                return
+
+
+# Shared by every module in the process
+events = EventStream()
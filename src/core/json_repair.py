@@ -0,0 +1,309 @@
+# src/core/json_repair.py
+"""
+Schema definitions for every LLM-produced artifact plus a local repair pass.
+
+Most broken generations have small defects (code fences, comments, trailing
+commas, Python literals, a truncated tail, a missing key). Instead of
+re-generating the whole response, the text is repaired locally, validated
+against the artifact schema, defaults are filled in, and only fields that
+are really missing are requested again with a short follow-up prompt.
+
+Schema notation (plain Python values):
+    str / int / float / bool   -> scalar of that type
+    [item_schema]              -> list of items
+    {"key": schema, ...}       -> object; top-level keys are required,
+                                  nested keys get defaults when absent
+"""
+import json
+import re
+from typing import Any, Dict, List, Tuple
+
+
+# ----------------------------------------------------------------------
+# Artifact schemas
+# ----------------------------------------------------------------------
+REQUIREMENTS_SCHEMA = {
+    "project_name": str,
+    "domain_entities": [{"name": str, "purpose": str}],
+    "system_functions": [{"name": str, "description": str}],
+}
+
+MODEL_SCHEMA = {"model": [{"name": str, "description": str}]}
+
+CONTROLLER_SCHEMA = {"controller": [{"name": str, "actions": [str]}]}
+
+VIEW_SCHEMA = {"view": [{"name": str, "description": str}]}
+
+AUDIT_REPORT_SCHEMA = {
+    "summary": str,
+    "recommendations": [{
+        "violation_type": str,
+        "file": str,
+        "problem": str,
+        "recommendation": str,
+    }],
+}
+
+COMBINED_SCHEMA = {**REQUIREMENTS_SCHEMA, **MODEL_SCHEMA, **CONTROLLER_SCHEMA, **VIEW_SCHEMA}
+
+SCHEMAS = {
+    "requirements": REQUIREMENTS_SCHEMA,
+    "model": MODEL_SCHEMA,
+    "controller": CONTROLLER_SCHEMA,
+    "view": VIEW_SCHEMA,
+    "audit_report": AUDIT_REPORT_SCHEMA,
+    "combined": COMBINED_SCHEMA,
+}
+
+_DEFAULTS = {str: "", int: 0, float: 0.0, bool: False}
+
+
+# ----------------------------------------------------------------------
+# Syntax repair
+# ----------------------------------------------------------------------
+_PY_LITERALS = {"True": "true", "False": "false", "None": "null"}
+
+
+def _strip_outside_strings(text: str) -> str:
+    """
+    Token-level fixes outside string values: removes // and /* */ comments
+    and trailing commas, maps Python literals (True/False/None) to JSON and
+    turns single-quoted strings into double-quoted ones.
+    """
+    out: List[str] = []
+    i, n = 0, len(text)
+    quote = None  # delimiter of the string being copied
+    while i < n:
+        ch = text[i]
+        if quote:
+            if ch == "\\" and i + 1 < n:
+                # \' is not a valid JSON escape
+                out.append("'" if text[i + 1] == "'" else text[i:i + 2])
+                i += 2
+                continue
+            if ch == quote:
+                out.append('"')
+                quote = None
+            elif ch == '"':
+                out.append('\\"')  # double quote inside a single-quoted string
+            else:
+                out.append(ch)
+            i += 1
+            continue
+        if ch in "\"'":
+            quote = ch
+            out.append('"')
+            i += 1
+        elif text.startswith("//", i):
+            while i < n and text[i] != "\n":
+                i += 1
+        elif text.startswith("/*", i):
+            end = text.find("*/", i + 2)
+            i = n if end == -1 else end + 2
+        elif ch == ",":
+            # Trailing comma: next significant char closes the container
+            j = i + 1
+            while j < n and text[j] in " \t\r\n":
+                j += 1
+            if j >= n or text[j] not in "}]":
+                out.append(ch)
+            i += 1
+        elif ch.isalpha():
+            j = i
+            while j < n and (text[j].isalnum() or text[j] == "_"):
+                j += 1
+            word = text[i:j]
+            out.append(_PY_LITERALS.get(word, word))
+            i = j
+        else:
+            out.append(ch)
+            i += 1
+    if quote:
+        out.append('"')
+    return "".join(out)
+
+
+def _close_open_containers(text: str) -> str:
+    """Closes an unterminated string and any unclosed brackets (truncated output)."""
+    stack: List[str] = []
+    in_string = False
+    escaped = False
+    for ch in text:
+        if in_string:
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == '"':
+                in_string = False
+            continue
+        if ch == '"':
+            in_string = True
+        elif ch in "{[":
+            stack.append("}" if ch == "{" else "]")
+        elif ch in "}]" and stack and stack[-1] == ch:
+            stack.pop()
+
+    repaired = (text + '"' if in_string else text).rstrip()
+    # A dangling key ('"key":' or a bare '"key"' inside an object) cannot be completed; drop it
+    repaired = re.sub(r'"[^"]*"\s*:\s*$', "", repaired).rstrip()
+    if stack and stack[-1] == "}":
+        repaired = re.sub(r'(?<=[{,])\s*"[^"]*"$', "", repaired).rstrip()
+    return repaired.rstrip(",") + "".join(reversed(stack))
+
+
+def repair_json_text(text: str) -> str:
+    """
+    Fixes common syntax defects of LLM JSON:
+    code fences / surrounding prose, comments, trailing commas,
+    Python literals (True/False/None), unterminated strings and brackets.
+    """
+    cleaned = text.strip()
+    cleaned = re.sub(r"^```(?:json)?\s*", "", cleaned)
+    cleaned = re.sub(r"\s*```\s*$", "", cleaned)
+
+    # Keep only the JSON value (drop "Here is the JSON:" style prose)
+    starts = [i for i in (cleaned.find("{"), cleaned.find("[")) if i != -1]
+    if starts:
+        cleaned = cleaned[min(starts):]
+        end = max(cleaned.rfind("}"), cleaned.rfind("]"))
+        # Trailing prose only (no JSON syntax after the last bracket) -> cut it
+        if end != -1 and not re.search(r'["{}\[\]:,]', cleaned[end + 1:]):
+            cleaned = cleaned[:end + 1]
+
+    cleaned = _strip_outside_strings(cleaned)
+    cleaned = _close_open_containers(cleaned)
+    # Closing may expose new trailing commas ("[1, 2," -> "[1, 2,]")
+    return _strip_outside_strings(cleaned)
+
+
+def loads_lenient(text: str) -> Tuple[Any, bool]:
+    """
+    Parses LLM JSON, repairing it locally if needed.
+
+    Returns:
+        (data, repaired) - repaired is True when the text needed fixing.
+    Raises:
+        ValueError if the text cannot be repaired.
+    """
+    cleaned = text.strip()
+    if cleaned.startswith("```json"):
+        cleaned = cleaned.replace("```json", "").replace("```", "").strip()
+    elif cleaned.startswith("```"):
+        cleaned = cleaned.replace("```", "").strip()
+    try:
+        return json.loads(cleaned), False
+    except json.JSONDecodeError as e:
+        original_error = e
+
+    try:
+        return json.loads(repair_json_text(text)), True
+    except json.JSONDecodeError:
+        raise ValueError(
+            f"LLM returned invalid JSON.\nError: {original_error}\nRaw snippet:\n{cleaned[:300]}"
+        )
+
+
+# ----------------------------------------------------------------------
+# Schema validation / defaults
+# ----------------------------------------------------------------------
+def _default_for(schema: Any) -> Any:
+    if isinstance(schema, list):
+        return []
+    if isinstance(schema, dict):
+        return {key: _default_for(sub) for key, sub in schema.items()}
+    return _DEFAULTS.get(schema)
+
+
+def _coerce(value: Any, schema: Any) -> Any:
+    """Coerces `value` to `schema`, filling nested defaults. Never raises."""
+    if isinstance(schema, list):
+        if value is None:
+            return []
+        if not isinstance(value, list):
+            value = [value]
+        item_schema = schema[0] if schema else None
+        if item_schema is None:
+            return value
+        items = []
+        for item in value:
+            if isinstance(item_schema, dict):
+                if isinstance(item, str) and "name" in item_schema:
+                    item = {"name": item}
+                if not isinstance(item, dict):
+                    continue
+                if "name" in item_schema and not str(item.get("name") or "").strip():
+                    continue  # unnamed entries are unusable downstream
+            items.append(_coerce(item, item_schema))
+        return items
+
+    if isinstance(schema, dict):
+        if not isinstance(value, dict):
+            return _default_for(schema)
+        result = dict(value)
+        for key, sub in schema.items():
+            result[key] = _coerce(value.get(key), sub) if key in value else _default_for(sub)
+        return result
+
+    if value is None:
+        return _DEFAULTS.get(schema)
+    if schema is str and not isinstance(value, str):
+        return json.dumps(value, ensure_ascii=False) if isinstance(value, (dict, list)) else str(value)
+    if schema in (int, float) and not isinstance(value, (int, float)):
+        try:
+            return schema(value)
+        except (TypeError, ValueError):
+            return _DEFAULTS[schema]
+    return value
+
+
+def validate(data: Any, schema: Dict[str, Any]) -> Tuple[Dict[str, Any], List[str]]:
+    """
+    Validates `data` against a top-level object schema.
+
+    Returns:
+        (normalized, missing) - normalized has every key with the right type
+        (defaults filled in); missing lists required top-level keys that were
+        absent and should be asked for again.
+    """
+    if isinstance(data, list):
+        # A bare list answers a single-list schema ({"model": [...]})
+        list_keys = [key for key, sub in schema.items() if isinstance(sub, list)]
+        data = {list_keys[0]: data} if len(list_keys) == 1 else {}
+    if not isinstance(data, dict):
+        data = {}
+
+    missing = [key for key in schema if key not in data or data[key] is None]
+    return _coerce(data, schema), missing
+
+
+def describe_schema(schema: Dict[str, Any], keys: List[str]) -> str:
+    """JSON skeleton of `keys`, used in follow-up prompts."""
+    def skeleton(sub: Any) -> Any:
+        if isinstance(sub, list):
+            return [skeleton(sub[0])] if sub else []
+        if isinstance(sub, dict):
+            return {k: skeleton(v) for k, v in sub.items()}
+        return f"<{getattr(sub, '__name__', 'value')}>"
+
+    return json.dumps({key: skeleton(schema[key]) for key in keys}, indent=2)
+
+
+def build_follow_up_prompt(invalid: Any, missing: List[str], schema: Dict[str, Any]) -> str:
+    """
+    Targeted follow-up asking ONLY for the missing fields. Carries just the
+    invalid answer, the validation errors and the schema; the original prompt
+    (with its SRS chunks) is not sent again.
+    """
+    errors = "\n".join(f"- missing required key: {key}" for key in missing)
+    return (
+        "Your previous JSON answer does not match the required schema.\n\n"
+        "## Invalid JSON (do NOT repeat it)\n"
+        f"{json.dumps(invalid, ensure_ascii=False)[:2000]}\n\n"
+        "## Validation errors\n"
+        f"{errors}\n\n"
+        "## Schema\n"
+        f"{describe_schema(schema, list(schema))}\n\n"
+        f"Return ONLY a JSON object with exactly these keys: {', '.join(missing)}.\n"
+        "No explanation."
+    )
@@ -0,0 +1,347 @@
+# src/core/latency_history.py
+"""
+Local history of LLM call and stage timings (SQLite, data/latency_history.sqlite).
+
+llm_calls: every successful LLM call, with its kind (agent class or prompt
+template, e.g. "RequirementsAgent", "generate-code.view", "summary.section"),
+the model, the prompt size, the token usage reported by the API and the
+latency.
+
+stage_runs: every finished stage of a command (events.stage(), plus
+`timing` events for work measured inside a stage such as embedding), with
+its duration and, where the stage counts them, the items it processed
+(embedded chunks, scanned files, generated files). Items turn durations
+into rates, so runs of different sizes stay comparable.
+
+Readers: the `--dry-run` estimator (src/cli/dry_run.py), the ETAs printed
+during extract / generate-code / run-fix (src/core/eta.py), the regression
+check at the end of every command (StageRecorder) and the `timings` command.
+
+Recording must never fail a run, so database errors are ignored.
+"""
+import sqlite3
+import statistics
+import time
+from contextlib import closing
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from src.core.config import (
+    LATENCY_DB_FILE, LATENCY_FIT_MIN_CALLS, STAGE_HISTORY_RUNS,
+    STAGE_REGRESSION_RATIO, STAGE_REGRESSION_MIN_SECONDS, STAGE_REGRESSION_MIN_RUNS,
+)
+from src.core import workspace
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS llm_calls (
+    ts            REAL NOT NULL,
+    kind          TEXT NOT NULL,
+    model         TEXT,
+    prompt_chars  INTEGER NOT NULL,
+    prompt_tokens INTEGER,
+    output_tokens INTEGER,
+    seconds       REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS llm_calls_kind_ts ON llm_calls (kind, ts);
+CREATE TABLE IF NOT EXISTS stage_runs (
+    ts      REAL NOT NULL,
+    command TEXT NOT NULL,
+    stage   TEXT NOT NULL,
+    status  TEXT NOT NULL,
+    seconds REAL NOT NULL,
+    items   INTEGER,
+    run_id  TEXT
+);
+CREATE INDEX IF NOT EXISTS stage_runs_stage_ts ON stage_runs (stage, ts);
+"""
+
+
+class LatencyHistory:
+    """One SQLite file; a short-lived connection per operation (thread/process safe)."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+
+    def _connect(self) -> sqlite3.Connection:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(self.path), timeout=5.0)
+        conn.executescript(_SCHEMA)
+        return conn
+
+    # ----------------------------------------------------------------------
+    # Writing
+    # ----------------------------------------------------------------------
+    def record_llm_call(
+        self,
+        kind: str,
+        model: Optional[str],
+        prompt_chars: int,
+        seconds: float,
+        prompt_tokens: Optional[int] = None,
+        output_tokens: Optional[int] = None,
+    ) -> None:
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "INSERT INTO llm_calls (ts, kind, model, prompt_chars, prompt_tokens, output_tokens, seconds) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (time.time(), kind, model, prompt_chars, prompt_tokens, output_tokens, seconds),
+            )
+
+    def record_stage(
+        self,
+        command: str,
+        stage: str,
+        seconds: float,
+        status: str = "ok",
+        items: Optional[int] = None,
+        run_id: Optional[str] = None,
+    ) -> None:
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "INSERT INTO stage_runs (ts, command, stage, status, seconds, items, run_id) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (time.time(), command, stage, status, seconds, items, run_id),
+            )
+
+    # ----------------------------------------------------------------------
+    # Reading (no database is created by readers)
+    # ----------------------------------------------------------------------
+    def llm_stats(self, kind: str, model: Optional[str] = None, limit: int = 200) -> Optional[Dict[str, Any]]:
+        """
+        Latency and output size of the last `limit` calls of `kind`
+        (None without history):
+            {"count", "median_s", "p90_s", "mean_output_tokens"}
+        """
+        if not self.path.exists():
+            return None
+        query = "SELECT seconds, output_tokens FROM llm_calls WHERE kind = ?"
+        params: list = [kind]
+        if model:
+            query += " AND model = ?"
+            params.append(model)
+        query += " ORDER BY ts DESC LIMIT ?"
+        params.append(limit)
+        with closing(self._connect()) as conn:
+            rows = conn.execute(query, params).fetchall()
+        if not rows:
+            return None
+
+        seconds = sorted(row[0] for row in rows)
+        output_tokens = [row[1] for row in rows if row[1] is not None]
+        return {
+            "count": len(rows),
+            "median_s": statistics.median(seconds),
+            "p90_s": seconds[min(len(seconds) - 1, int(0.9 * len(seconds)))],
+            "mean_output_tokens": statistics.mean(output_tokens) if output_tokens else None,
+        }
+
+    def predict_llm_seconds(self, kind: str, prompt_chars: Optional[int] = None,
+                            model: Optional[str] = None, limit: int = 200) -> Optional[float]:
+        """
+        Expected latency of one call of `kind`: a least-squares line over
+        prompt size once LATENCY_FIT_MIN_CALLS calls of varied size exist,
+        else the median. None without history.
+        """
+        if not self.path.exists():
+            return None
+        query = "SELECT prompt_chars, seconds FROM llm_calls WHERE kind = ?"
+        params: list = [kind]
+        if model:
+            query += " AND model = ?"
+            params.append(model)
+        query += " ORDER BY ts DESC LIMIT ?"
+        params.append(limit)
+        with closing(self._connect()) as conn:
+            rows = conn.execute(query, params).fetchall()
+        if not rows:
+            return None
+
+        median = statistics.median(row[1] for row in rows)
+        if prompt_chars is None or len(rows) < LATENCY_FIT_MIN_CALLS:
+            return median
+        mean_x = statistics.mean(row[0] for row in rows)
+        mean_y = statistics.mean(row[1] for row in rows)
+        var_x = sum((row[0] - mean_x) ** 2 for row in rows)
+        if var_x == 0:
+            return median
+        slope = sum((row[0] - mean_x) * (row[1] - mean_y) for row in rows) / var_x
+        if slope <= 0:
+            return median  # Size does not explain latency (yet): no extrapolation
+        predicted = mean_y + slope * (prompt_chars - mean_x)
+        # Stay within the observed range; a far-off prompt size gets no wild guess
+        low, high = min(row[1] for row in rows), max(row[1] for row in rows)
+        return min(max(predicted, low), high)
+
+    def stage_stats(self, stage: str, command: Optional[str] = None,
+                    limit: int = STAGE_HISTORY_RUNS, before: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """
+        Successful runs of `stage` (of `command`, or of any command), newest
+        `limit` (None without history):
+            {"count", "median_s", "p90_s", "last_s", "median_rate"}
+        median_rate is items per second, None if the stage counts no items.
+        """
+        if not self.path.exists():
+            return None
+        query = "SELECT seconds, items FROM stage_runs WHERE stage = ? AND status = 'ok'"
+        params: list = [stage]
+        if command:
+            query += " AND command = ?"
+            params.append(command)
+        if before is not None:
+            query += " AND ts < ?"
+            params.append(before)
+        query += " ORDER BY ts DESC LIMIT ?"
+        params.append(limit)
+        with closing(self._connect()) as conn:
+            rows = conn.execute(query, params).fetchall()
+        if not rows:
+            return None
+
+        seconds = sorted(row[0] for row in rows)
+        rates = [row[1] / row[0] for row in rows if row[1] and row[0] > 0]
+        return {
+            "count": len(rows),
+            "median_s": statistics.median(seconds),
+            "p90_s": seconds[min(len(seconds) - 1, int(0.9 * len(seconds)))],
+            "last_s": rows[0][0],
+            "median_rate": statistics.median(rates) if rates else None,
+        }
+
+    def llm_kinds(self) -> List[str]:
+        """Call kinds with history, most recently used first."""
+        if not self.path.exists():
+            return []
+        with closing(self._connect()) as conn:
+            rows = conn.execute("SELECT kind, MAX(ts) AS last FROM llm_calls GROUP BY kind ORDER BY last DESC")
+            return [row[0] for row in rows.fetchall()]
+
+    def stage_keys(self, command: Optional[str] = None) -> List[tuple]:
+        """(command, stage) pairs with history, most recently run first."""
+        if not self.path.exists():
+            return []
+        query = "SELECT command, stage, MAX(ts) AS last FROM stage_runs"
+        params: list = []
+        if command:
+            query += " WHERE command = ?"
+            params.append(command)
+        query += " GROUP BY command, stage ORDER BY last DESC"
+        with closing(self._connect()) as conn:
+            return [(row[0], row[1]) for row in conn.execute(query, params).fetchall()]
+
+    def chars_per_token(self, model: Optional[str] = None) -> Optional[float]:
+        """Measured prompt characters per token (None until the API reported token counts)."""
+        if not self.path.exists():
+            return None
+        query = "SELECT SUM(prompt_chars), SUM(prompt_tokens) FROM llm_calls WHERE prompt_tokens > 0"
+        params: list = []
+        if model:
+            query += " AND model = ?"
+            params.append(model)
+        with closing(self._connect()) as conn:
+            chars, tokens = conn.execute(query, params).fetchone()
+        return chars / tokens if chars and tokens else None
+
+    def calls_since(self, since: float) -> int:
+        """Number of recorded calls since the `since` timestamp."""
+        if not self.path.exists():
+            return 0
+        with closing(self._connect()) as conn:
+            return conn.execute("SELECT COUNT(*) FROM llm_calls WHERE ts >= ?", (since,)).fetchone()[0]
+
+
+def history() -> LatencyHistory:
+    """History of the active workspace (resolved at call time, see src/core/workspace.py)."""
+    return LatencyHistory(workspace.data_dir() / LATENCY_DB_FILE)
+
+
+def find_regression(store: LatencyHistory, command: str, stage: str, seconds: float,
+                    items: Optional[int] = None, before: Optional[float] = None) -> Optional[Dict[str, Any]]:
+    """
+    Compares one stage duration with the median of earlier successful runs.
+    Stages with items are compared by time per item. Returns
+    {"stage", "seconds", "baseline_s", "runs", "slowdown"} when the stage is
+    STAGE_REGRESSION_RATIO times slower (and STAGE_REGRESSION_MIN_SECONDS
+    longer), else None.
+    """
+    if seconds < STAGE_REGRESSION_MIN_SECONDS:
+        return None
+    stats = store.stage_stats(stage, command, before=before)
+    if not stats or stats["count"] < STAGE_REGRESSION_MIN_RUNS:
+        return None
+    if items and stats["median_rate"]:
+        baseline = items / stats["median_rate"]  # Expected seconds for this many items
+    else:
+        baseline = stats["median_s"]
+    if baseline <= 0 or seconds < baseline * STAGE_REGRESSION_RATIO \
+            or seconds - baseline < STAGE_REGRESSION_MIN_SECONDS:
+        return None
+    return {"stage": stage, "seconds": seconds, "baseline_s": baseline,
+            "runs": stats["count"], "slowdown": seconds / baseline}
+
+
+class StageRecorder:
+    """
+    Event listener for one command (see EventStream.add_listener): collects
+    its stage_end and timing events, then finish() flags regressions against
+    the history and records the stages.
+    """
+
+    def __init__(self, command: str, run_id: Optional[str] = None):
+        self.command = command
+        self.run_id = run_id
+        self.started = time.time()
+        self.stages: List[Dict[str, Any]] = []
+
+    def __call__(self, event: Dict[str, Any]) -> None:
+        if event["event"] in ("stage_end", "timing"):
+            self.stages.append({
+                "stage": event["stage"],
+                "status": event.get("status", "ok"),
+                "seconds": event["duration_s"],
+                "items": event.get("items"),
+            })
+
+    def finish(self) -> List[Dict[str, Any]]:
+        """Prints a warning per regressed stage; returns the regressions."""
+        if not self.stages:
+            return []
+        store = history()
+        regressions = []
+        try:
+            for entry in self.stages:
+                if entry["status"] != "ok":
+                    continue
+                # Only runs before this command started are the baseline
+                regression = find_regression(store, self.command, entry["stage"], entry["seconds"],
+                                             entry["items"], before=self.started)
+                if regression:
+                    regressions.append(regression)
+            for entry in self.stages:
+                store.record_stage(self.command, entry["stage"], entry["seconds"], entry["status"],
+                                   entry["items"], self.run_id)
+        except (sqlite3.Error, OSError):
+            return regressions
+
+        for r in regressions:
+            print(f"[WARN] Stage regression: {self.command}/{r['stage']} took {r['seconds']:.1f}s, "
+                  f"{r['slowdown']:.1f}x the median of the last {r['runs']} run(s) "
+                  f"({r['baseline_s']:.1f}s). See 'timings' for the trend.", flush=True)
+        return regressions
+
+
+def record_llm_call(kind: str, model: Optional[str], prompt_chars: int, seconds: float, usage=None) -> None:
+    """
+    Records one finished LLM call. `usage` is the response's usage_metadata
+    (prompt_token_count / candidates_token_count), if the SDK returned one.
+    """
+    try:
+        history().record_llm_call(
+            kind,
+            model,
+            prompt_chars,
+            seconds,
+            prompt_tokens=getattr(usage, "prompt_token_count", None),
+            output_tokens=getattr(usage, "candidates_token_count", None),
+        )
+    except (sqlite3.Error, OSError):
+        pass
@@ -9,23 +9,15 @@ from typing import Optional # Tip hint'leri tutuldu.
 
 # Projenizin konfigürasyonunu yükle.
 from src.core.config import LLM_MODEL_NAME 
+# Exceptions live in a light module; re-exported here for existing imports
+from src.core.errors import QuotaExceededError, LLMConnectionError
+from src.core.profiler import span
+from src.core.latency_history import record_llm_call
+from src.core.rate_limiter import llm_rate_limiter
 
 load_dotenv()
 
 
-# ============================================================
-# Custom Exception Classes (Graceful Error Handling)
-# ============================================================
-class QuotaExceededError(Exception):
-    """Günlük API kota limiti dolduğunda fırlatılır."""
-    pass
-
-
-class LLMConnectionError(Exception):
-    """Genel LLM bağlantı hatası."""
-    pass
-
-
 class LLMClient:
     """
     Handles minimal Gemini API calls for Agent operations.
@@ -70,12 +62,22 @@ class LLMClient:
     # ------------------------------------------------------------------
     # ANA METOT: Agent'ların çağırdığı sade metot (tek çağrı)
     # ------------------------------------------------------------------
-    def generate_content(self, prompt: str, max_retries: int = 0, stream: bool = False) -> str:
+    def generate_content(
+        self,
+        prompt: str,
+        max_retries: int = 0,
+        stream: bool = False,
+        kind: str = "generic",
+        paced: bool = True,
+    ) -> str:
         """
         Verilen prompt ile modelden içerik üretir. 
         429 quota hatalarında gracefully fail eder (sürekli retry yapmaz).
         max_retries=0: Kota dolduğunda hemen durdur (varsayılan).
         stream=True: Streaming yanıt (progress için, ama toplam süre aynı)
+        kind: prompt kind recorded in the latency history (--dry-run estimates, ETAs)
+        paced: the call start waits for the process-wide llm_rate_limiter;
+               False only when the caller has just acquired it itself
         """
         
         if self.model is None:
@@ -83,6 +85,16 @@ class LLMClient:
         
         import sys
         
+        if paced:
+            llm_rate_limiter.acquire()
+        started = time.perf_counter()
+        with span("llm.call", model=self.model_name, prompt_chars=len(prompt), stream=stream):
+            text, usage = self._generate(prompt, stream)
+        record_llm_call(kind, self.model_name, len(prompt), time.perf_counter() - started, usage)
+        return text
+
+    def _generate(self, prompt: str, stream: bool):
+        """Returns (text, usage_metadata or None)."""
         try:
             if stream:
                 # Streaming mode: Progress göster ama toplam süre aynı
@@ -94,11 +106,11 @@ class LLMClient:
                         chunks.append(chunk.text)
                         print(".", end="", flush=True)  # Progress indicator
                 print(" ✓", flush=True)
-                return "".join(chunks)
+                return "".join(chunks), getattr(response, "usage_metadata", None)
             else:
                 # Normal mode: Tek seferde al (daha hızlı)
                 response = self.model.generate_content(prompt)
-                return response.text
+                return response.text, getattr(response, "usage_metadata", None)
             
         except google_exceptions.ResourceExhausted as e:
             # 429 quota/rate limit hatası
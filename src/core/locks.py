@@ -0,0 +1,157 @@
+# src/core/locks.py
+"""
+Advisory file locks between processes that share a workspace.
+
+    with resource_lock("generated_src"):                 # exclusive: one writer
+        ...
+    with resource_lock("generated_src", shared=True):    # shared: many readers
+        ...
+
+Lock files live in data/.locks/<resource>.lock of the active workspace and
+are never deleted (deleting a lock file while another process waits on it
+would hand out two locks). The operating system drops a lock when its
+process exits, so a crashed run never leaves a stale lock behind.
+
+The holder of an exclusive lock writes its pid, command and start time into
+the lock file; a process waiting longer than a second prints it once, then polls until the lock
+is free or LOCK_TIMEOUT_SECONDS have passed (LockTimeoutError).
+
+Readers of immutable files (artifact versions in data/.versions/, see
+src/core/artifact_store.py) and of atomically replaced files need no lock.
+"""
+import json
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Optional
+
+from src.core.config import LOCK_TIMEOUT_SECONDS, LOCKS_DIR
+from src.core.errors import LockTimeoutError
+from src.core import workspace
+
+if os.name == "nt":
+    import msvcrt
+else:
+    import fcntl
+
+_POLL_SECONDS = 0.05
+_ANNOUNCE_AFTER_SECONDS = 1.0  # Short waits (manifest / artifact writes) stay silent
+
+
+class FileLock:
+    """
+    One advisory lock on `path` (created if missing). Re-entrant use of the
+    same FileLock object is not supported; nest different resources instead.
+    On Windows every lock is exclusive.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        shared: bool = False,
+        timeout: float = LOCK_TIMEOUT_SECONDS,
+        label: Optional[str] = None,
+    ):
+        self.path = Path(path)
+        self.shared = shared
+        self.timeout = timeout
+        self.label = label or self.path.stem
+        self._file = None
+
+    # ----------------------------------------------------------------------
+    # Acquire / release
+    # ----------------------------------------------------------------------
+    def acquire(self) -> "FileLock":
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, "a+", encoding="utf-8")
+        started = time.monotonic()
+        deadline = started + self.timeout
+        announced = False
+        while not self._try_lock():
+            if not announced and time.monotonic() - started >= _ANNOUNCE_AFTER_SECONDS:
+                holder = self.holder()
+                print(f"[INFO] Waiting for {self.label} lock"
+                      + (f" (held by pid {holder.get('pid')}: {holder.get('command')})" if holder else "")
+                      + "...", flush=True)
+                announced = True
+            if time.monotonic() >= deadline:
+                self._file.close()
+                self._file = None
+                raise LockTimeoutError(
+                    f"Timed out after {self.timeout:.0f}s waiting for the {self.label} lock ({self.path})."
+                )
+            time.sleep(_POLL_SECONDS)
+
+        if not self.shared:
+            self._write_holder()
+        return self
+
+    def release(self) -> None:
+        if self._file is None:
+            return
+        try:
+            if os.name == "nt":
+                self._file.seek(0)
+                msvcrt.locking(self._file.fileno(), msvcrt.LK_UNLCK, 1)
+            else:
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+        except OSError:
+            pass
+        finally:
+            self._file.close()
+            self._file = None
+
+    def _try_lock(self) -> bool:
+        try:
+            if os.name == "nt":
+                self._file.seek(0)
+                msvcrt.locking(self._file.fileno(), msvcrt.LK_NBLCK, 1)
+            else:
+                mode = fcntl.LOCK_SH if self.shared else fcntl.LOCK_EX
+                fcntl.flock(self._file.fileno(), mode | fcntl.LOCK_NB)
+            return True
+        except OSError:
+            return False
+
+    # ----------------------------------------------------------------------
+    # Holder info (diagnostics only)
+    # ----------------------------------------------------------------------
+    def _write_holder(self) -> None:
+        info = {"pid": os.getpid(), "command": " ".join(sys.argv[1:]) or sys.argv[0], "since": time.time()}
+        try:
+            self._file.seek(0)
+            self._file.truncate()
+            self._file.write(json.dumps(info))
+            self._file.flush()
+        except OSError:
+            pass
+
+    def holder(self) -> Optional[dict]:
+        """Last exclusive holder recorded in the lock file (may be stale once released)."""
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.loads(f.read() or "null")
+        except (OSError, ValueError):
+            return None
+
+    def __enter__(self) -> "FileLock":
+        return self.acquire()
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.release()
+
+
+def resource_lock(
+    resource: str,
+    shared: bool = False,
+    data_dir: Optional[Path] = None,
+    timeout: float = LOCK_TIMEOUT_SECONDS,
+) -> FileLock:
+    """Lock on a named resource (data/.locks/<resource>.lock of `data_dir` or the active workspace)."""
+    return FileLock(
+        Path(data_dir or workspace.data_dir()) / LOCKS_DIR / f"{resource}.lock",
+        shared=shared,
+        timeout=timeout,
+        label=resource,
+    )
@@ -0,0 +1,126 @@
+# src/core/manifest.py
+import hashlib
+import json
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional
+
+from src.core.artifact_store import atomic_write_text
+from src.core.locks import FileLock
+
+
+def hash_bytes(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def hash_text(text: str) -> str:
+    return hash_bytes(text.encode("utf-8"))
+
+
+def hash_file(path: Path) -> Optional[str]:
+    """Content hash of a file, or None if it does not exist."""
+    path = Path(path)
+    if not path.exists():
+        return None
+    return hash_bytes(path.read_bytes())
+
+
+def hash_json(data: Any) -> str:
+    """Stable hash of a JSON-serializable value (key order independent)."""
+    return hash_text(json.dumps(data, sort_keys=True, ensure_ascii=False, default=str))
+
+
+class BuildManifest:
+    """
+    Build-system style manifest: for every stage it records the fingerprint
+    of the stage inputs and the hashes of the files the stage produced.
+
+    A stage is fresh (can be skipped) when its input fingerprint is unchanged
+    and every recorded output still exists with the same content.
+    Thread-safe; the manifest is saved after every record() so an interrupted
+    run keeps the stages it finished. Saving re-reads the file under a file
+    lock and merges, so processes sharing one manifest keep each other's stages.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self.stages: Dict[str, Dict[str, Any]] = self._load()
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        if not self.path.exists():
+            return {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f).get("stages", {})
+        except (OSError, json.JSONDecodeError):
+            return {}
+
+    def save(self) -> None:
+        with self._lock:
+            self._save_locked()
+
+    def _save_locked(self, changed: Optional[Dict[str, Optional[Dict[str, Any]]]] = None) -> None:
+        """
+        Writes the manifest. `changed` maps the stages this call updates to
+        their new entry (None = removed); every other stage is taken from the
+        file as another process may have recorded it in the meantime.
+        """
+        with FileLock(self.path.with_name(self.path.name + ".lock"), label=f"manifest {self.path.name}"):
+            if changed is not None:
+                stages = self._load()
+                for stage, entry in changed.items():
+                    if entry is None:
+                        stages.pop(stage, None)
+                    else:
+                        stages[stage] = entry
+                self.stages = stages
+            atomic_write_text(
+                self.path,
+                json.dumps({"stages": self.stages}, indent=4, ensure_ascii=False),
+                durable=False,
+            )
+
+    @staticmethod
+    def fingerprint(inputs: Dict[str, Any]) -> str:
+        """Fingerprint of a stage's inputs (hashes, model name, k, ...)."""
+        return hash_json(inputs)
+
+    def is_fresh(self, stage: str, fingerprint: str, check_output_hashes: bool = True) -> bool:
+        """
+        check_output_hashes=False only requires the outputs to exist, for
+        outputs that are edited in place afterwards (e.g. by run-fix).
+        """
+        with self._lock:
+            entry = self.stages.get(stage)
+        if not entry or entry.get("fingerprint") != fingerprint:
+            return False
+        outputs = entry.get("outputs", {})
+        if not outputs:
+            return False
+        if not check_output_hashes:
+            return all(Path(path).exists() for path in outputs)
+        return all(hash_file(Path(path)) == digest for path, digest in outputs.items())
+
+    def record(
+        self,
+        stage: str,
+        fingerprint: str,
+        inputs: Dict[str, Any],
+        outputs: Iterable[Path],
+    ) -> None:
+        entry = {
+            "fingerprint": fingerprint,
+            "inputs": inputs,
+            "outputs": {str(Path(p)): hash_file(Path(p)) for p in outputs},
+            "updated_at": time.time(),
+        }
+        with self._lock:
+            self.stages[stage] = entry
+            self._save_locked({stage: entry})
+
+    def invalidate(self, stage: str) -> None:
+        with self._lock:
+            if self.stages.pop(stage, None) is not None:
+                self._save_locked({stage: None})
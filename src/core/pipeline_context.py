@@ -0,0 +1,140 @@
+# src/core/pipeline_context.py
+import copy
+import json
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from src.core.artifact_store import ArtifactStore
+
+
+def write_json(data_dir: Path, data: Any, filename: str) -> Path:
+    """Default artifact writer: atomic, versioned JSON in data_dir."""
+    return ArtifactStore(data_dir).write(filename, data)["path"]
+
+
+class ArtifactSink:
+    """
+    Persists artifacts on one background thread, in submission order.
+    Writing JSON/Markdown is taken off the critical path of the pipeline.
+    """
+
+    def __init__(self, writer: Callable[[Path, Any, str], Path]):
+        self.writer = writer
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="artifact-sink")
+        self._pending: List[Future] = []
+        self._lock = threading.Lock()
+
+    def submit(self, data_dir: Path, filename: str, data: Any) -> Future:
+        return self.defer(self.writer, data_dir, data, filename)
+
+    def defer(self, fn: Callable[..., Any], *args: Any) -> Future:
+        """Queues `fn` behind every write submitted so far."""
+        future = self._executor.submit(fn, *args)
+        with self._lock:
+            self._pending.append(future)
+        return future
+
+    def flush(self) -> None:
+        """Blocks until every submitted artifact is on disk; re-raises write errors."""
+        with self._lock:
+            pending, self._pending = self._pending, []
+        for future in pending:
+            future.result()
+
+    def close(self) -> None:
+        self.flush()
+        self._executor.shutdown(wait=True)
+
+
+class PipelineContext:
+    """
+    Carries artifacts (requirements/model/controller/view JSON, architecture
+    map, ...) between pipeline stages in memory.
+
+    Agents read upstream results with get() instead of re-reading the files
+    the previous agent has just written. put() keeps the artifact in memory
+    and hands a snapshot to the ArtifactSink, which writes it to `data_dir`
+    in the background. Each context has its own data_dir, so several
+    pipelines can run in one process without clobbering each other's files.
+
+    A later put() of the same name supersedes a snapshot still queued: the
+    stale snapshot is dropped instead of landing after (and overwriting) a
+    newer version. With persist=False the caller owns the file: once it has
+    called flush() or close(), nothing queued earlier can overwrite what it
+    writes synchronously (snapshots already being written are finished first).
+    """
+
+    def __init__(
+        self,
+        data_dir: Path,
+        writer: Callable[[Path, Any, str], Path] = write_json,
+        persist: bool = True,
+    ):
+        self.data_dir = Path(data_dir)
+        self.persist = persist
+        self.sink = ArtifactSink(writer) if persist else None
+        self._artifacts: Dict[str, Any] = {}
+        self._versions: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def put(self, name: str, data: Any, persist: bool = True) -> None:
+        """Stores an artifact; persists a snapshot asynchronously unless persist=False."""
+        with self._lock:
+            self._artifacts[name] = data
+            version = self._versions[name] = self._versions.get(name, 0) + 1
+        if persist and self.sink is not None:
+            self.sink.defer(self._write_snapshot, name, version, copy.deepcopy(data))
+
+    def _write_snapshot(self, name: str, version: int, data: Any) -> Optional[Path]:
+        """Sink job: writes `data` unless a later put() of `name` superseded it."""
+        with self._lock:
+            if self._versions.get(name) != version:
+                return None
+        return self.sink.writer(self.data_dir, data, name)
+
+    def when_persisted(self, fn: Callable[..., Any], *args: Any) -> None:
+        """
+        Runs `fn` once every artifact put so far is on disk (e.g. recording
+        output hashes in a build manifest). Runs immediately without a sink.
+        """
+        if self.sink is not None:
+            self.sink.defer(fn, *args)
+        else:
+            fn(*args)
+
+    def get(self, name: str) -> Optional[Any]:
+        with self._lock:
+            return self._artifacts.get(name)
+
+    def has(self, name: str) -> bool:
+        with self._lock:
+            return name in self._artifacts
+
+    def load(self, name: str) -> Any:
+        """
+        Returns the in-memory artifact, falling back to `data_dir/name` on disk
+        (e.g. when the producing stage was skipped or ran in another process).
+        """
+        data = self.get(name)
+        if data is not None:
+            return data
+        path = self.data_dir / name
+        if not path.exists():
+            raise FileNotFoundError(
+                f"Required analysis file not found: {name}. "
+                "Ensure preceding agents have run successfully."
+            )
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        self.put(name, data, persist=False)
+        return data
+
+    def flush(self) -> None:
+        if self.sink is not None:
+            self.sink.flush()
+
+    def close(self) -> None:
+        if self.sink is not None:
+            self.sink.close()
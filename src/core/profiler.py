@@ -0,0 +1,212 @@
+# src/core/profiler.py
+"""
+Lightweight span-based phase profiler.
+
+    from src.core.profiler import span
+
+    with span("embedding", texts=len(chunks)):
+        vectors = embed(chunks)
+
+Spans are no-ops until the profiler is enabled (global `--profile` CLI flag),
+so instrumentation can stay in hot paths. When enabled, every finished span is
+recorded with its thread, and the run can be exported as a Chrome trace
+(chrome://tracing, https://ui.perfetto.dev) plus a per-phase summary.
+
+Phase names used across the code base:
+    pdf.load, chunking, embedding, vector.add, vector.query,
+    prompt.build, llm.call, json.parse, file.write, rules.scan
+"""
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+
+class Profiler:
+    """
+    Thread-safe span recorder. Timestamps are perf_counter based and relative
+    to start(), in microseconds (the Chrome trace unit).
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self._lock = threading.Lock()
+        self._events: List[Dict[str, Any]] = []
+        self._origin = time.perf_counter()
+        self._wall_start = 0.0
+        self._wall_end: Optional[float] = None
+        self._cprofile = None
+        self._tracemalloc = False
+
+    # ----------------------------------------------------------------------
+    # Lifecycle
+    # ----------------------------------------------------------------------
+    def start(self, cprofile: bool = False, tracemalloc: bool = False) -> None:
+        with self._lock:
+            self._events = []
+        self._origin = time.perf_counter()
+        self._wall_start = time.time()
+        self._wall_end = None
+        self.enabled = True
+
+        if tracemalloc:
+            import tracemalloc as _tracemalloc
+            _tracemalloc.start()
+            self._tracemalloc = True
+        if cprofile:
+            import cProfile
+            self._cprofile = cProfile.Profile()
+            self._cprofile.enable()
+
+    def stop(self) -> None:
+        if self._cprofile is not None:
+            self._cprofile.disable()
+        self._wall_end = self._now_us()
+        self.enabled = False
+
+    def _now_us(self) -> float:
+        return (time.perf_counter() - self._origin) * 1e6
+
+    # ----------------------------------------------------------------------
+    # Spans
+    # ----------------------------------------------------------------------
+    @contextmanager
+    def span(self, name: str, **args: Any) -> Iterator[None]:
+        if not self.enabled:
+            yield
+            return
+        start = self._now_us()
+        try:
+            yield
+        finally:
+            self.record(name, start, self._now_us() - start, args)
+
+    def record(self, name: str, start_us: float, duration_us: float, args: Optional[Dict[str, Any]] = None) -> None:
+        if not self.enabled:
+            return
+        thread = threading.current_thread()
+        event = {
+            "name": name,
+            "cat": name.split(".", 1)[0],
+            "ph": "X",
+            "ts": round(start_us, 1),
+            "dur": round(duration_us, 1),
+            "pid": os.getpid(),
+            "tid": thread.ident,
+            "args": {key: value for key, value in (args or {}).items() if value is not None},
+        }
+        with self._lock:
+            self._events.append(event)
+
+    @property
+    def events(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return list(self._events)
+
+    # ----------------------------------------------------------------------
+    # Reports
+    # ----------------------------------------------------------------------
+    def summary(self) -> Dict[str, Any]:
+        """
+        Per-phase count / total / mean / max in milliseconds. Totals of phases
+        running on several threads can exceed the wall time.
+        """
+        wall_us = self._wall_end if self._wall_end is not None else self._now_us()
+        phases: Dict[str, Dict[str, float]] = {}
+        for event in self.events:
+            stats = phases.setdefault(event["name"], {"count": 0, "total_ms": 0.0, "max_ms": 0.0})
+            duration_ms = event["dur"] / 1000
+            stats["count"] += 1
+            stats["total_ms"] += duration_ms
+            stats["max_ms"] = max(stats["max_ms"], duration_ms)
+
+        for stats in phases.values():
+            stats["mean_ms"] = stats["total_ms"] / stats["count"]
+            stats["wall_pct"] = 100 * stats["total_ms"] * 1000 / wall_us if wall_us else 0.0
+            for key in ("total_ms", "max_ms", "mean_ms", "wall_pct"):
+                stats[key] = round(stats[key], 2)
+
+        ordered = dict(sorted(phases.items(), key=lambda item: item[1]["total_ms"], reverse=True))
+        return {"wall_ms": round(wall_us / 1000, 2), "phases": ordered}
+
+    def write_chrome_trace(self, path: Path, metadata: Optional[Dict[str, Any]] = None) -> Path:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        pid = os.getpid()
+        thread_names = {t.ident: t.name for t in threading.enumerate()}
+        events = self.events
+        meta_events = [
+            {"name": "thread_name", "ph": "M", "pid": pid, "tid": tid,
+             "args": {"name": thread_names.get(tid, f"thread-{tid}")}}
+            for tid in sorted({e["tid"] for e in events if e["tid"] is not None})
+        ]
+        trace = {
+            "traceEvents": meta_events + events,
+            "displayTimeUnit": "ms",
+            "otherData": {
+                "started_at": self._wall_start,
+                **(metadata or {}),
+                "summary": self.summary(),
+            },
+        }
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(trace, f, ensure_ascii=False, default=str)
+        return path
+
+    def write_cprofile(self, path: Path) -> Optional[Path]:
+        if self._cprofile is None:
+            return None
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._cprofile.dump_stats(str(path))
+        return path
+
+    def write_tracemalloc(self, path: Path, limit: int = 30) -> Optional[Path]:
+        """Top allocation sites (by line) plus current/peak traced memory."""
+        if not self._tracemalloc:
+            return None
+        import tracemalloc as _tracemalloc
+
+        snapshot = _tracemalloc.take_snapshot()
+        current, peak = _tracemalloc.get_traced_memory()
+        _tracemalloc.stop()
+        self._tracemalloc = False
+
+        lines = [
+            f"current: {current / 1024 / 1024:.1f} MiB",
+            f"peak:    {peak / 1024 / 1024:.1f} MiB",
+            "",
+            f"Top {limit} allocation sites:",
+        ]
+        lines += [str(stat) for stat in snapshot.statistics("lineno")[:limit]]
+
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+        return path
+
+    def print_summary(self) -> None:
+        report = self.summary()
+        print(f"\n[PROFILE] Wall time: {report['wall_ms'] / 1000:.2f}s", flush=True)
+        if not report["phases"]:
+            print("[PROFILE] No instrumented phases ran.", flush=True)
+            return
+        print(f"  {'phase':<26} {'count':>6} {'total':>10} {'mean':>10} {'max':>10} {'% wall':>7}", flush=True)
+        for name, stats in report["phases"].items():
+            print(
+                f"  {name:<26} {stats['count']:>6} {stats['total_ms']:>8.1f}ms "
+                f"{stats['mean_ms']:>8.1f}ms {stats['max_ms']:>8.1f}ms {stats['wall_pct']:>6.1f}%",
+                flush=True,
+            )
+
+
+# Shared by every module in the process
+profiler = Profiler()
+
+
+def span(name: str, **args: Any):
+    """Context manager timing one phase (no-op while profiling is off)."""
+    return profiler.span(name, **args)
@@ -0,0 +1,52 @@
+# src/core/rate_limiter.py
+import threading
+import time
+
+from src.core.config import LLM_MIN_CALL_INTERVAL
+
+
+class RateLimiter:
+    """
+    Thread-safe pacing of LLM calls: consecutive acquire() calls return at
+    least `min_interval` seconds apart. Unlike a fixed sleep before every
+    call, the first call starts immediately and calls already in flight are
+    not waited for, so concurrent workers overlap their response times while
+    the request rate stays within the quota.
+    """
+
+    def __init__(self, min_interval: float = LLM_MIN_CALL_INTERVAL):
+        self.min_interval = min_interval
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+        self._shared = None
+
+    def share(self, next_slot, lock) -> None:
+        """
+        Paces this limiter together with other processes: `next_slot` is a
+        multiprocessing Value('d') and `lock` a multiprocessing Lock created
+        by the parent (see src/cli/batch.py). Slots are then wall-clock times.
+        """
+        self._shared = (next_slot, lock)
+
+    def acquire(self) -> float:
+        """Blocks until the caller's slot; returns the seconds waited."""
+        if self._shared is not None:
+            next_slot, lock = self._shared
+            with lock:
+                now = time.time()
+                slot = max(now, next_slot.value)
+                next_slot.value = slot + self.min_interval
+        else:
+            with self._lock:
+                now = time.monotonic()
+                slot = max(now, self._next_slot)
+                self._next_slot = slot + self.min_interval
+        wait = slot - now
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+
+# Shared by every LLM call in the process (acquired in LLMClient.generate_content;
+# batch workers share its slot across processes, see src/cli/batch.py)
+llm_rate_limiter = RateLimiter()
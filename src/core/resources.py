@@ -0,0 +1,100 @@
+# src/core/resources.py
+"""
+Process-wide registry of expensive shared resources.
+
+The SentenceTransformer embedder, Chroma clients and the LLM client are
+created lazily on first use and at most once per configuration per process,
+no matter how many agents or RAG pipelines ask for them. Creation is
+thread-safe: concurrent callers of the same resource wait for a single
+construction, different resources are built in parallel.
+"""
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from src.core.config import EMBEDDING_MODEL_NAME, LLM_MODEL_NAME
+
+
+class ResourceRegistry:
+    """Lazy, thread-safe get-or-create cache keyed by (kind, configuration)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._resources: Dict[Tuple[str, Hashable], Any] = {}
+        self._key_locks: Dict[Tuple[str, Hashable], threading.Lock] = {}
+
+    def get(self, kind: str, config: Hashable, factory: Callable[[], Any]) -> Any:
+        key = (kind, config)
+        resource = self._resources.get(key)
+        if resource is not None:
+            return resource
+
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        # Per-key lock: a slow embedder load does not block the LLM client
+        with key_lock:
+            resource = self._resources.get(key)
+            if resource is None:
+                resource = factory()
+                self._resources[key] = resource
+        return resource
+
+    def loaded(self, kind: Optional[str] = None) -> list:
+        """Configurations created so far (optionally of one kind)."""
+        return [key for key in list(self._resources) if kind is None or key[0] == kind]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._resources.clear()
+            self._key_locks.clear()
+
+
+registry = ResourceRegistry()
+
+
+def get_llm_client(model_name: str = LLM_MODEL_NAME):
+    """Shared LLMClient for `model_name`."""
+    def create():
+        from src.core.llm_client import LLMClient
+        return LLMClient(model_name=model_name)
+
+    return registry.get("llm_client", model_name, create)
+
+
+def get_embedder(model_name: str = EMBEDDING_MODEL_NAME):
+    """Shared SentenceTransformer Embedder for `model_name`."""
+    def create():
+        from src.rag.rag_pipeline import Embedder
+        print(f"[Resources] Loading embedding model: {model_name}")
+        return Embedder(model_name=model_name)
+
+    return registry.get("embedder", model_name, create)
+
+
+class LazyEmbeddingFunction:
+    """
+    Chroma embedding function that loads the shared embedder on the first
+    call, so creating collections / pipelines does not load the model.
+    """
+
+    def __init__(self, model_name: str = EMBEDDING_MODEL_NAME):
+        self.model_name = model_name
+
+    def __call__(self, input):
+        return get_embedder(self.model_name).embedding_function(input)
+
+
+def get_embedding_function(model_name: str = EMBEDDING_MODEL_NAME) -> LazyEmbeddingFunction:
+    """Shared lazy embedding function for `model_name`."""
+    return registry.get("embedding_function", model_name, lambda: LazyEmbeddingFunction(model_name))
+
+
+def get_chroma_client(persist_directory: Optional[Path] = None):
+    """Shared Chroma client per persistent directory (None = the in-memory client)."""
+    config = str(Path(persist_directory).resolve()) if persist_directory is not None else None
+
+    def create():
+        from src.rag.rag_pipeline import create_chroma_client
+        return create_chroma_client(Path(config) if config else None)
+
+    return registry.get("chroma_client", config, create)
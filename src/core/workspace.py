@@ -0,0 +1,51 @@
+# src/core/workspace.py
+"""
+Workspace layout: where a project's artifacts live.
+
+The code root (this repository: src/, .github/prompts/) and the workspace
+root (data/, scaffolds/, generated_src/, data/chroma_db) are the same
+directory by default. Setting MVC_WORKSPACE_ROOT (or the global `--workspace`
+CLI flag) moves every artifact of a run under another directory, so several
+projects can run side by side without overwriting each other (see the
+`batch` command).
+
+The root is read at call time, not at import time, so a worker process can
+select its workspace before running a command.
+"""
+import os
+from pathlib import Path
+
+WORKSPACE_ENV_VAR = "MVC_WORKSPACE_ROOT"
+
+# src/core/workspace.py -> repository root (prompts, templates)
+CODE_ROOT = Path(__file__).resolve().parents[2]
+
+
+def set_workspace_root(path) -> Path:
+    """Selects the workspace for this process (inherited by child processes)."""
+    root = Path(str(path)).resolve()
+    root.mkdir(parents=True, exist_ok=True)
+    os.environ[WORKSPACE_ENV_VAR] = str(root)
+    return root
+
+
+def workspace_root() -> Path:
+    configured = os.environ.get(WORKSPACE_ENV_VAR)
+    return Path(configured).resolve() if configured else CODE_ROOT
+
+
+def data_dir() -> Path:
+    return workspace_root() / "data"
+
+
+def scaffold_root() -> Path:
+    return workspace_root() / "scaffolds" / "mvc_skeleton"
+
+
+def generated_root() -> Path:
+    return workspace_root() / "generated_src"
+
+
+def prompts_dir() -> Path:
+    """Prompt templates always come from the code root."""
+    return CODE_ROOT / ".github" / "prompts"
@@ -0,0 +1,218 @@
+# src/rag/collection_registry.py
+import json
+import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from src.core.config import (
+    COLLECTION_NAME,
+    COLLECTION_IDLE_SECONDS,
+    DEFAULT_TOP_K,
+    FANOUT_MAX_WORKERS,
+    MAX_LOADED_COLLECTIONS,
+)
+from src.rag.rag_pipeline import VectorStore
+from src.core.resources import get_chroma_client
+from src.core.artifact_store import atomic_write_text
+from src.core.locks import FileLock
+
+
+class CollectionRegistry:
+    """
+    Per-project collections ("shards") inside one persistent Chroma store.
+
+    - Every project gets its own collection, so corpora never mix.
+    - Known projects are recorded in <persist_directory>/collections.json.
+    - Collection handles are kept in an LRU; handles beyond
+      MAX_LOADED_COLLECTIONS or idle for COLLECTION_IDLE_SECONDS are dropped
+      and reopened on next use. Eviction only bounds the handles: the shared
+      Chroma client (chromadb 0.4.15) has no API to unload one collection, so
+      segments it has loaded stay in its memory until the process exits.
+    - Only indexing registers projects (get(create=True)); read paths look up
+      registered projects and never create empty collections.
+    - fan_out_search() queries several shards concurrently and merges top-k.
+    """
+
+    REGISTRY_FILENAME = "collections.json"
+    REGISTRY_LOCK_FILENAME = ".collections.lock"
+
+    def __init__(
+        self,
+        persist_directory: Path,
+        embedding_function,
+        max_loaded: int = MAX_LOADED_COLLECTIONS,
+        idle_seconds: float = COLLECTION_IDLE_SECONDS,
+    ):
+        self.persist_directory = Path(persist_directory)
+        self.persist_directory.mkdir(parents=True, exist_ok=True)
+        self.embedding_function = embedding_function
+        self.max_loaded = max_loaded
+        self.idle_seconds = idle_seconds
+
+        self.client = get_chroma_client(self.persist_directory)
+        self.registry_path = self.persist_directory / self.REGISTRY_FILENAME
+
+        self._lock = threading.RLock()
+        self._loaded: "OrderedDict[str, VectorStore]" = OrderedDict()
+        self._last_used: Dict[str, float] = {}
+        self._entries: Dict[str, Dict[str, Any]] = self._read_registry()
+
+    # ------------------------------------------------------------------
+    # Naming
+    # ------------------------------------------------------------------
+    @staticmethod
+    def collection_name(project: str) -> str:
+        """
+        Maps a project name to a valid Chroma collection name
+        (3-63 chars, [a-zA-Z0-9._-], alphanumeric at both ends).
+        """
+        slug = re.sub(r"[^a-z0-9_-]+", "-", project.lower()).strip("-_") or "default"
+        return f"{COLLECTION_NAME}__{slug}"[:63].rstrip("-_")
+
+    # ------------------------------------------------------------------
+    # Registry file
+    # ------------------------------------------------------------------
+    def _read_registry(self) -> Dict[str, Dict[str, Any]]:
+        if not self.registry_path.exists():
+            return {}
+        try:
+            with open(self.registry_path, "r", encoding="utf-8") as f:
+                return json.load(f).get("projects", {})
+        except (OSError, json.JSONDecodeError):
+            return {}
+
+    def _write_registry(self) -> None:
+        """
+        Merges this process's entries into the file (other processes may share
+        the store). Must be called without holding self._lock: the file lock is
+        taken first and self._lock only for the merge.
+        """
+        with FileLock(self.persist_directory / self.REGISTRY_LOCK_FILENAME, label="collection registry"):
+            entries = self._read_registry()
+            with self._lock:
+                for project, entry in self._entries.items():
+                    entries.setdefault(project, {}).update(entry)
+                self._entries = entries
+                text = json.dumps({"projects": entries}, indent=4, ensure_ascii=False)
+            atomic_write_text(self.registry_path, text, durable=False)
+
+    def projects(self) -> List[str]:
+        with self._lock:
+            return sorted(self._entries)
+
+    # ------------------------------------------------------------------
+    # Loading / eviction
+    # ------------------------------------------------------------------
+    def get(self, project: str, create: bool = True) -> VectorStore:
+        """
+        Returns the VectorStore of a project, loading it if needed.
+
+        create=True (indexing) registers unknown projects and creates their
+        collection; create=False (search) raises KeyError for them instead.
+        The registry file is only written when a project is registered or a
+        handle is evicted (last_used_at is persisted then), never on a plain load.
+        """
+        with self._lock:
+            now = time.time()
+            registered = False
+            store = self._loaded.get(project)
+            if store is None:
+                if not create and project not in self._entries:
+                    raise KeyError(f"Unknown project: {project}")
+                store = VectorStore(
+                    self.collection_name(project),
+                    self.embedding_function,
+                    client=self.client,
+                )
+                self._loaded[project] = store
+                if project not in self._entries:
+                    self._entries[project] = {
+                        "collection": store.collection_name,
+                        "created_at": now,
+                        "last_used_at": now,
+                    }
+                    registered = True
+            self._loaded.move_to_end(project)
+            self._last_used[project] = now
+            evicted = self._evict(now)
+        if registered or evicted:
+            self._write_registry()
+        return store
+
+    def _evict(self, now: float) -> bool:
+        """
+        Drops idle collection handles and keeps at most `max_loaded` (see class
+        docstring). Records their last_used_at; returns True if the registry
+        file needs writing.
+        """
+        evicted = [
+            name for name, used in self._last_used.items()
+            if name in self._loaded and now - used > self.idle_seconds
+        ]
+        while len(self._loaded) - len(evicted) > self.max_loaded:
+            oldest = next(name for name in self._loaded if name not in evicted)
+            evicted.append(oldest)
+
+        for name in evicted:
+            self._loaded.pop(name, None)
+            self._entries.setdefault(name, {})["last_used_at"] = self._last_used.pop(name, now)
+        if evicted:
+            print(f"[CollectionRegistry] Released {len(evicted)} idle collection handle(s).")
+        return bool(evicted)
+
+    def evict_idle(self) -> None:
+        with self._lock:
+            evicted = self._evict(time.time())
+        if evicted:
+            self._write_registry()
+
+    def loaded_projects(self) -> List[str]:
+        with self._lock:
+            return list(self._loaded)
+
+    # ------------------------------------------------------------------
+    # Fan-out search
+    # ------------------------------------------------------------------
+    def fan_out_search(
+        self,
+        query: str,
+        projects: Optional[List[str]] = None,
+        k: int = DEFAULT_TOP_K,
+        max_workers: int = FANOUT_MAX_WORKERS,
+    ) -> List[Dict[str, Any]]:
+        """
+        Queries several project shards concurrently and merges the results.
+
+        The query is embedded once and the vector is sent to every shard.
+        Unregistered names in `projects` are skipped (nothing is created).
+        Returns the global top-k as dicts with project, id, document, distance
+        (smaller distance = more similar).
+        """
+        known = self.projects()
+        targets = [p for p in projects if p in known] if projects is not None else known
+        if not targets:
+            return []
+
+        query_embedding = self.embedding_function([query])[0]
+
+        def search_shard(project: str) -> List[Dict[str, Any]]:
+            result = self.get(project, create=False).query_embeddings([query_embedding], k=k)
+            ids = (result.get("ids") or [[]])[0]
+            documents = (result.get("documents") or [[]])[0]
+            distances = (result.get("distances") or [[]])[0] or [0.0] * len(ids)
+            return [
+                {"project": project, "id": cid, "document": doc, "distance": dist}
+                for cid, doc, dist in zip(ids, documents, distances)
+            ]
+
+        workers = max(1, min(max_workers, len(targets)))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            shard_results = list(executor.map(search_shard, targets))
+
+        merged = [hit for hits in shard_results for hit in hits]
+        merged.sort(key=lambda hit: hit["distance"])
+        return merged[:k]
@@ -0,0 +1,159 @@
+# src/rag/dedup.py
+import math
+import re
+from typing import Any, Dict, List, Tuple
+
+from src.core.architecture_merge import (
+    CONTROLLER_SUFFIXES, VIEW_SUFFIXES, merge_into, normalize_name, singularize,
+)
+from src.core.config import DEDUP_SIMILARITY_THRESHOLD
+from src.core.resources import get_embedding_function
+
+
+class ArchitectureDeduplicator:
+    """
+    Merges near-duplicate models, controllers and views of an architecture
+    map ("Product" / "Products", "Cart Controller" / "ShoppingCartController").
+
+    Two items of the same layer are linked when
+    - their normalised names match (case, separators, layer suffix, plural), or
+    - the cosine similarity of their "name: description/actions" embeddings
+      is at least `threshold`.
+    Clusters use complete linkage: an item joins a cluster only if it is
+    linked to every member, so a chain like Order~OrderItem~Item does not
+    merge Order with Item. Each cluster keeps the first item's name;
+    descriptions keep the most detailed text and controller actions are
+    unioned.
+
+    All texts are embedded in one batch with the shared embedder (the same
+    model used for retrieval); no LLM call is made.
+    """
+
+    CATEGORY_SUFFIXES = {
+        "model": (),
+        "controller": CONTROLLER_SUFFIXES,
+        "view": VIEW_SUFFIXES,
+    }
+
+    def __init__(self, embedding_function=None, threshold: float = DEDUP_SIMILARITY_THRESHOLD):
+        self.embedding_function = embedding_function or get_embedding_function()
+        self.threshold = threshold
+
+    # ----------------------------------------------------------------------
+    # Main Entry Point
+    # ----------------------------------------------------------------------
+    def deduplicate(self, architecture: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """
+        Returns:
+            (deduplicated architecture map, report)
+            report = {"threshold": ..., "counts": {layer: [before, after]},
+                      "clusters": {layer: [{"kept": name, "merged": [names]}]}}
+        """
+        items = {
+            category: [
+                item for item in architecture.get(category, []) or []
+                if isinstance(item, dict) and str(item.get("name") or "").strip()
+            ]
+            for category in self.CATEGORY_SUFFIXES
+        }
+
+        # One embedding pass for every layer (skipped if nothing can be merged)
+        texts = [
+            self._item_text(category, item)
+            for category, entries in items.items() if len(entries) > 1
+            for item in entries
+        ]
+        vectors = [self._normalize(v) for v in self.embedding_function(texts)] if texts else []
+
+        result = dict(architecture)
+        report: Dict[str, Any] = {"threshold": self.threshold, "counts": {}, "clusters": {}}
+        offset = 0
+        for category, entries in items.items():
+            if len(entries) > 1:
+                category_vectors = vectors[offset:offset + len(entries)]
+                offset += len(entries)
+            else:
+                category_vectors = []
+            clusters = self._cluster(category, entries, category_vectors)
+            result[category] = [self._merge_cluster(entries, members) for members in clusters]
+
+            report["counts"][category] = [len(entries), len(result[category])]
+            report["clusters"][category] = [
+                {
+                    "kept": entries[members[0]]["name"],
+                    "merged": [entries[i]["name"] for i in members[1:]],
+                }
+                for members in clusters if len(members) > 1
+            ]
+
+        merged_total = sum(before - after for before, after in report["counts"].values())
+        print(f"[Dedup] Merged {merged_total} near-duplicate item(s) "
+              f"(threshold {self.threshold}).")
+        return result, report
+
+    # ----------------------------------------------------------------------
+    # Clustering
+    # ----------------------------------------------------------------------
+    def _cluster(
+        self,
+        category: str,
+        entries: List[Dict[str, Any]],
+        vectors: List[List[float]],
+    ) -> List[List[int]]:
+        """Complete-linkage clusters of linked items, in document order (first member kept)."""
+        keys = [self._name_key(category, item["name"]) for item in entries]
+
+        def linked(i: int, j: int) -> bool:
+            if keys[i] == keys[j]:
+                return True
+            return bool(vectors) and self._dot(vectors[i], vectors[j]) >= self.threshold
+
+        clusters: List[List[int]] = []
+        for i in range(len(entries)):
+            # Earliest cluster whose members are all linked to i
+            target = next((members for members in clusters if all(linked(i, j) for j in members)), None)
+            if target is None:
+                clusters.append([i])
+            else:
+                target.append(i)
+        return clusters
+
+    @staticmethod
+    def _merge_cluster(entries: List[Dict[str, Any]], members: List[int]) -> Dict[str, Any]:
+        first = entries[members[0]]
+        merged = {field: list(value) if isinstance(value, list) else value for field, value in first.items()}
+        for i in members[1:]:
+            merge_into(merged, entries[i])
+        return merged
+
+    # ----------------------------------------------------------------------
+    # Helpers
+    # ----------------------------------------------------------------------
+    def _name_key(self, category: str, name: str) -> str:
+        """'Products' -> 'product', 'Cart Controller' -> 'cart', 'Addresses' -> 'address'."""
+        return singularize(normalize_name(name, self.CATEGORY_SUFFIXES[category]))
+
+    def _item_text(self, category: str, item: Dict[str, Any]) -> str:
+        """Text that is embedded for an item: readable name (without layer suffix) + details."""
+        name = re.sub(r"(?<=[a-z0-9])(?=[A-Z])", " ", str(item["name"]))
+        name = re.sub(r"[_\-/]+", " ", name).strip()
+        for suffix in self.CATEGORY_SUFFIXES[category]:
+            if name.lower().endswith(" " + suffix):
+                name = name[: -len(suffix)].strip()
+                break
+
+        details = str(item.get("description") or "").strip()
+        actions = [str(a) for a in item.get("actions") or []]
+        if actions:
+            details = (details + " " if details else "") + "Actions: " + ", ".join(actions)
+        return f"{name}: {details}" if details else name
+
+    @staticmethod
+    def _normalize(vector) -> List[float]:
+        values = [float(v) for v in vector]
+        norm = math.sqrt(sum(v * v for v in values)) or 1.0
+        return [v / norm for v in values]
+
+    @staticmethod
+    def _dot(a: List[float], b: List[float]) -> float:
+        return sum(x * y for x, y in zip(a, b))
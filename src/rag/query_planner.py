@@ -0,0 +1,79 @@
+# src/rag/query_planner.py
+from typing import Dict, List, Sequence, Tuple
+
+from src.core.config import MAX_SUBQUERIES, RRF_K
+
+
+class QueryPlanner:
+    """
+    Splits one long "for all of these names" query into focused sub-queries,
+    one per entity / action, plus the original focus sentence.
+
+    Long enumerations embed poorly: a single vector for "[A, B, C, ... Z]"
+    lands near none of them. Short per-item queries retrieve the chunks that
+    actually describe each item.
+    """
+
+    def __init__(self, max_subqueries: int = MAX_SUBQUERIES):
+        self.max_subqueries = max_subqueries
+
+    def plan(self, focus: str, groups: Sequence[Tuple[str, Sequence[str]]]) -> List[str]:
+        """
+        Args:
+            focus: General sentence describing what the agent looks for.
+            groups: (template, items) pairs; template contains '{item}'.
+
+        Returns:
+            Deduplicated sub-queries, the focus query first. Items from the
+            groups are interleaved so truncation keeps every group represented.
+        """
+        queries: List[str] = [focus]
+        expanded = [[template.replace("{item}", item) for item in items if item] for template, items in groups]
+
+        index = 0
+        while any(index < len(group) for group in expanded):
+            for group in expanded:
+                if index < len(group):
+                    queries.append(group[index])
+            index += 1
+
+        unique = list(dict.fromkeys(q.strip() for q in queries if q and q.strip()))
+        return unique[: self.max_subqueries]
+
+
+def reciprocal_rank_fusion(
+    ranked_lists: Sequence[Sequence[Tuple[str, str]]],
+    budget: int,
+    rrf_k: int = RRF_K,
+) -> List[str]:
+    """
+    Fuses several ranked (chunk_id, text) lists with reciprocal rank fusion
+    and returns at most `budget` distinct chunk texts, best first.
+
+    Chunks are deduplicated by id and by text (overlapping namespaces may
+    store the same text twice). Ties keep first-seen order.
+    """
+    scores: Dict[str, float] = {}
+    texts: Dict[str, str] = {}
+    first_seen: Dict[str, int] = {}
+
+    for ranked in ranked_lists:
+        for rank, (chunk_id, text) in enumerate(ranked):
+            if chunk_id not in first_seen:
+                first_seen[chunk_id] = len(first_seen)
+                texts[chunk_id] = text
+            scores[chunk_id] = scores.get(chunk_id, 0.0) + 1.0 / (rrf_k + rank + 1)
+
+    ordered = sorted(scores, key=lambda cid: (-scores[cid], first_seen[cid]))
+
+    selected: List[str] = []
+    seen_texts = set()
+    for chunk_id in ordered:
+        text = texts[chunk_id]
+        if text in seen_texts:
+            continue
+        seen_texts.add(text)
+        selected.append(text)
+        if len(selected) >= budget:
+            break
+    return selected
@@ -1,9 +1,8 @@
 # src/rag/rag_pipeline.py
 # Disable telemetry to prevent crashes - AGGRESSIVE APPROACH
 import os
-import sys
-import contextlib
-from io import StringIO
+import logging
+import threading
 
 # Disable telemetry environment variables (multiple ways)
 os.environ['ANONYMIZED_TELEMETRY'] = 'False'
@@ -11,24 +10,34 @@ os.environ['CHROMA_TELEMETRY_DISABLED'] = 'True'
 os.environ['CHROMA_TELEMETRY_ENABLED'] = 'False'
 os.environ['DO_NOT_TRACK'] = '1'
 
-# Suppress stderr for telemetry errors (temporary redirect)
-class TelemetrySuppressor:
-    """Context manager to suppress telemetry errors from stderr"""
-    def __init__(self):
-        self.original_stderr = sys.stderr
-        self.suppressed_stderr = StringIO()
-    
-    def __enter__(self):
-        sys.stderr = self.suppressed_stderr
-        return self
-    
-    def __exit__(self, *args):
-        sys.stderr = self.original_stderr
-        # Check if error was telemetry-related
-        error_text = self.suppressed_stderr.getvalue()
-        if error_text and ('telemetry' not in error_text.lower() and 'capture' not in error_text.lower()):
-            # If it's not a telemetry error, print it
-            self.original_stderr.write(error_text)
+# Telemetry noise is dropped at the logging layer instead of by swapping
+# sys.stderr. Redirecting the process-global stream is not safe once several
+# threads query the store at the same time (output gets lost or attributed to
+# the wrong call), while a logging filter is evaluated per record. Logger
+# filters are not inherited by child loggers, so each emitting logger is listed.
+class TelemetryLogFilter(logging.Filter):
+    """Drops log records emitted by Chroma / PostHog telemetry."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        message = record.getMessage().lower()
+        return "telemetry" not in message and "capture" not in message
+
+
+_TELEMETRY_LOG_FILTER = TelemetryLogFilter()
+for _logger_name in (
+    "chromadb",
+    "chromadb.telemetry",
+    "chromadb.telemetry.posthog",
+    "chromadb.telemetry.product.posthog",
+    "posthog",
+):
+    logging.getLogger(_logger_name).addFilter(_TELEMETRY_LOG_FILTER)
+
+
+def _is_telemetry_error(error: Exception) -> bool:
+    text = str(error).lower()
+    return "telemetry" in text or "capture" in text
+
 
 # Monkey-patch telemetry to suppress errors
 try:
@@ -50,6 +59,9 @@ try:
 except:
     pass
 
+import hashlib
+import re
+import time
 from pathlib import Path
 
 import pdfplumber
@@ -72,7 +84,15 @@ from src.core.config import (
     DEFAULT_CHUNK_SIZE,
     DEFAULT_CHUNK_OVERLAP,
     DEFAULT_TOP_K,
+    SUMMARY_SECTION_MAX_CHARS,
+    SUMMARY_MIN_CHUNKS,
+    LLM_MODEL_NAME,
 )
+from src.rag.summary_tree import SummaryTree
+from src.core.resources import get_chroma_client, get_embedder, get_embedding_function
+from src.core.profiler import span
+from src.core.locks import FileLock
+from src.core.events import events
 
 
 # -----------------------------
@@ -92,7 +112,7 @@ class PDFLoader:
         self.metadata["document_name"] = getattr(file, "name", "uploaded.pdf")
         extracted_pages = []
 
-        with pdfplumber.open(file) as pdf:
+        with span("pdf.load", document=self.metadata["document_name"]), pdfplumber.open(file) as pdf:
             for page in pdf.pages:
                 text = page.extract_text() # extract text from the page
                 if text and text.strip():
@@ -127,10 +147,63 @@ class Chunker:
             chunks: list of chunk strings
         """
         combined_text = "\n\n".join(pages)
-        chunks = self.splitter.split_text(combined_text)
+        with span("chunking", chars=len(combined_text)):
+            chunks = self.splitter.split_text(combined_text)
         return chunks
 
 
+# -----------------------------
+# Section Chunker
+# -----------------------------
+class SectionChunker:
+    """
+    Splits an SRS into sections at heading lines (numbered headings,
+    Markdown headings, ALL-CAPS titles) and packs consecutive small sections
+    together up to `max_chars`. Oversized sections are split with the
+    character-based Chunker.
+    """
+
+    HEADING_PATTERN = re.compile(
+        r"^\s*(?:#{1,6}\s+\S|\d+(?:\.\d+)*\.?\s+[A-Z]|[A-Z][A-Z0-9 &/\-]{3,}$)"
+    )
+
+    def __init__(self, max_chars: int = SUMMARY_SECTION_MAX_CHARS):
+        self.max_chars = max_chars
+        self.fallback = Chunker(chunk_size=max_chars, overlap=0)
+
+    def split(self, text: str):
+        """
+        Returns:
+            sections: list of section strings, in document order
+        """
+        raw_sections = []
+        current = []
+        for line in text.splitlines():
+            if self.HEADING_PATTERN.match(line) and any(l.strip() for l in current):
+                raw_sections.append("\n".join(current).strip())
+                current = []
+            current.append(line)
+        if any(l.strip() for l in current):
+            raw_sections.append("\n".join(current).strip())
+
+        sections = []
+        buffer = ""
+        for section in raw_sections:
+            if len(section) > self.max_chars:
+                if buffer:
+                    sections.append(buffer)
+                    buffer = ""
+                sections.extend(self.fallback.prepare_chunks([section]))
+            elif buffer and len(buffer) + len(section) + 2 > self.max_chars:
+                sections.append(buffer)
+                buffer = section
+            else:
+                buffer = f"{buffer}\n\n{section}" if buffer else section
+        if buffer:
+            sections.append(buffer)
+        return sections
+
+
 # -----------------------------
 # Embedder (SentenceTransformer)
 # -----------------------------
@@ -146,39 +219,61 @@ class Embedder:
 
     # Embeds a list of texts
     def embed(self, texts):
-        return self.embedding_function(texts)
+        with span("embedding", texts=len(texts)):
+            return self.embedding_function(texts)
     
     # Embeds a single query
     def embed_query(self, query):
-        return self.embedding_function([query])[0]
+        with span("embedding", texts=1):
+            return self.embedding_function([query])[0]
 
 
 # -----------------------------
 # VectorStore (ChromaDB)
 # -----------------------------
+def create_chroma_client(persist_directory: Path | None = None):
+    """Creates a Chroma client with telemetry disabled (persistent if a directory is given)."""
+    try:
+        if HAS_SETTINGS:
+            # Try to create client with settings that disable telemetry
+            settings = Settings(
+                anonymized_telemetry=False,
+                allow_reset=True,
+            )
+            if persist_directory is not None:
+                return chromadb.PersistentClient(path=str(persist_directory), settings=settings)
+            return Client(settings=settings)
+        elif persist_directory is not None:
+            return chromadb.PersistentClient(path=str(persist_directory))
+        else:
+            # Fallback: create client normally
+            return Client()
+    except Exception as e:
+        # If settings fail, create client normally
+        # Telemetry errors will be caught in try-except blocks
+        if persist_directory is not None:
+            return chromadb.PersistentClient(path=str(persist_directory))
+        return Client()
+
+
 class VectorStore:
-    def __init__(self, collection_name: str, embedding_function):
-        # Create client with telemetry disabled
-        try:
-            if HAS_SETTINGS:
-                # Try to create client with settings that disable telemetry
-                settings = Settings(
-                    anonymized_telemetry=False,
-                    allow_reset=True,
-                )
-                self.client = Client(settings=settings)
-            else:
-                # Fallback: create client normally
-                self.client = Client()
-        except Exception as e:
-            # If settings fail, create client normally
-            # Telemetry errors will be caught in try-except blocks
-            self.client = Client()
+    def __init__(
+        self,
+        collection_name: str,
+        embedding_function,
+        persist_directory: Path | None = None,
+        client=None,
+    ):
+        # One client per store and process (shards share it, see CollectionRegistry)
+        self.client = client if client is not None else get_chroma_client(persist_directory)
+        self.collection_name = collection_name
         
+        self.embedding_function = embedding_function
         self.collection = self.client.get_or_create_collection(
             name=collection_name,
             embedding_function=embedding_function,
         )
+        self._write_lock = threading.Lock()
 
     def add_chunks(self, chunks, document_name, start_id=0):
         ids = [str(i + start_id) for i in range(len(chunks))]
@@ -187,46 +282,122 @@ class VectorStore:
             for i in range(len(chunks))
         ]
 
-        # Use telemetry suppressor to hide stderr errors
-        with TelemetrySuppressor():
+        # Writes are serialized; reads below do not take this lock.
+        with self._write_lock, span("vector.add", chunks=len(chunks)):
             try:
                 self.collection.add(ids=ids, documents=chunks, metadatas=metadatas)
             except Exception as e:
                 # Ignore telemetry errors, continue with operation
-                if "telemetry" in str(e).lower() or "capture" in str(e).lower():
-                    # Try again - telemetry already suppressed
-                    try:
-                        self.collection.add(ids=ids, documents=chunks, metadatas=metadatas)
-                    except:
-                        pass  # Continue anyway
-                else:
-                    raise  # Re-raise if it's not a telemetry error
+                if not _is_telemetry_error(e):
+                    raise
+                try:
+                    self.collection.add(ids=ids, documents=chunks, metadatas=metadatas)
+                except Exception:
+                    pass  # Continue anyway
         return len(ids)
 
-    def query(self, text, k: int = DEFAULT_TOP_K):
-        # Use telemetry suppressor to hide stderr errors
-        with TelemetrySuppressor():
-            try:
-                return self.collection.query(
-                    query_texts=[text],
-                    n_results=k,
-                    include=["documents"],
+    def namespace_hash(self, namespace: str):
+        """Returns the content hash stored for a namespace, or None if it is not indexed."""
+        try:
+            result = self.collection.get(
+                where={"namespace": namespace},
+                limit=1,
+                include=["metadatas"],
+            )
+        except Exception as e:
+            if not _is_telemetry_error(e):
+                raise
+            return None
+        metadatas = result.get("metadatas") or []
+        if not metadatas:
+            return None
+        return metadatas[0].get("content_hash")
+
+    def replace_namespace(self, chunks, document_name: str, namespace: str, content_hash: str):
+        """
+        Replaces every chunk of `namespace` with `chunks`.
+
+        Embeddings are computed outside the write lock so several documents
+        can be embedded concurrently; only the Chroma write is serialized.
+        Returns timing info for throughput reporting.
+        """
+        embed_start = time.perf_counter()
+        with span("embedding", texts=len(chunks), namespace=namespace):
+            embeddings = self.embedding_function(chunks) if chunks else []
+        embed_seconds = time.perf_counter() - embed_start
+
+        ids = [f"{namespace}:{i}" for i in range(len(chunks))]
+        metadatas = [
+            {
+                "document": document_name,
+                "namespace": namespace,
+                "content_hash": content_hash,
+                "chunk_index": i,
+            }
+            for i in range(len(chunks))
+        ]
+
+        write_start = time.perf_counter()
+        with self._write_lock, span("vector.add", chunks=len(chunks), namespace=namespace):
+            self.collection.delete(where={"namespace": namespace})
+            if chunks:
+                self.collection.add(
+                    ids=ids,
+                    documents=chunks,
+                    embeddings=embeddings,
+                    metadatas=metadatas,
                 )
-            except Exception as e:
-                # Ignore telemetry errors, continue with operation
-                if "telemetry" in str(e).lower() or "capture" in str(e).lower():
-                    # Try again - telemetry already suppressed
-                    try:
-                        return self.collection.query(
-                            query_texts=[text],
-                            n_results=k,
-                            include=["documents"],
-                        )
-                    except:
-                        # Return empty result if telemetry keeps failing
-                        return {"documents": [[]]}
-                else:
-                    raise  # Re-raise if it's not a telemetry error
+        write_seconds = time.perf_counter() - write_start
+
+        return {
+            "chunks_added": len(ids),
+            "embed_seconds": embed_seconds,
+            "write_seconds": write_seconds,
+        }
+
+    def query(self, text, k: int = DEFAULT_TOP_K, namespace: str | None = None):
+        return self.query_many([text], k, namespace=namespace)
+
+    def query_many(self, texts, k: int = DEFAULT_TOP_K, namespace: str | None = None):
+        """
+        Runs several queries as one batched Chroma call (a single embedding
+        pass). Safe to call concurrently from a thread pool.
+        Result lists are index-aligned with `texts`.
+        """
+        return self._run_query({"query_texts": list(texts)}, len(texts), k, namespace)
+
+    def query_embeddings(self, embeddings, k: int = DEFAULT_TOP_K, namespace: str | None = None):
+        """Like query_many() but with precomputed query embeddings (used by fan-out search)."""
+        return self._run_query({"query_embeddings": list(embeddings)}, len(embeddings), k, namespace)
+
+    def _run_query(self, query_input: dict, query_count: int, k: int, namespace: str | None):
+        query_kwargs = {
+            **query_input,
+            "n_results": k,
+            "include": ["documents", "distances"],
+        }
+        if namespace:
+            query_kwargs["where"] = {"namespace": namespace}
+
+        with span("vector.query", queries=query_count, k=k):
+            return self._query_collection(query_kwargs, query_count)
+
+    def _query_collection(self, query_kwargs: dict, query_count: int):
+        try:
+            return self.collection.query(**query_kwargs)
+        except Exception as e:
+            # Ignore telemetry errors, continue with operation
+            if not _is_telemetry_error(e):
+                raise
+            try:
+                return self.collection.query(**query_kwargs)
+            except Exception:
+                # Return empty result if telemetry keeps failing
+                return {
+                    "ids": [[] for _ in range(query_count)],
+                    "documents": [[] for _ in range(query_count)],
+                    "distances": [[] for _ in range(query_count)],
+                }
 
     def count(self):
         return self.collection.count()
@@ -242,32 +413,78 @@ class RAGPipeline:
     - chunks pages
     - embeds + indexes chunks
     - searches
+
+    With `persist_directory` set, chunks are stored in a persistent Chroma
+    collection under a per-document namespace, so an SRS indexed once (e.g.
+    by the `index` command) is reused by later runs without re-embedding.
+    With `project` set, the pipeline works on that project's own collection.
     """
 
+    INDEX_LOCK_FILENAME = ".index.lock"
+
     def __init__(
         self,
         llm_client=None, # LLMClient'ı kabul et
         collection_name: str = COLLECTION_NAME,
         chunk_size: int = DEFAULT_CHUNK_SIZE,
         overlap: int = DEFAULT_CHUNK_OVERLAP,
+        persist_directory: Path | None = None,
+        project: str | None = None,
     ):
         self.llm_client = llm_client
+        self.project = project
         self.chunk_size = chunk_size
         self.overlap = overlap
+        self.persist_directory = Path(persist_directory) if persist_directory else None
 
         self.loader = PDFLoader()
         self.chunker = Chunker(chunk_size=self.chunk_size, overlap=self.overlap)
-        self.embedder = Embedder()
-        self.vstore = VectorStore(collection_name, self.embedder.embedding_function)
-
-        self.offset = 0
-
-    def index_srs(self, file_path: Path, chunk_size: int | None = None, overlap: int | None = None):
+        # Shared per process; the model itself is loaded on the first embedding call
+        self.embedding_function = get_embedding_function()
+        if self.persist_directory is not None:
+            self.persist_directory.mkdir(parents=True, exist_ok=True)
+        self.registry = None
+        if project and self.persist_directory is not None:
+            # Per-project shard of the persistent store
+            from src.rag.collection_registry import CollectionRegistry
+            self.registry = CollectionRegistry(self.persist_directory, self.embedding_function)
+            self.vstore = self.registry.get(project)
+        else:
+            if project:
+                from src.rag.collection_registry import CollectionRegistry
+                collection_name = CollectionRegistry.collection_name(project)
+            self.vstore = VectorStore(
+                collection_name,
+                self.embedding_function,
+                persist_directory=self.persist_directory,
+            )
+
+        # The in-memory client is shared per process: continue after existing ids
+        self.offset = self.vstore.count() if self.persist_directory is None else 0
+        self._offset_lock = threading.Lock()
+        # Namespace searched by default (last SRS indexed through index_srs)
+        self.namespace: str | None = None
+        # Hierarchical summaries of the current SRS (see build_summary_tree)
+        self.summary_tree: SummaryTree | None = None
+
+    @property
+    def embedder(self) -> "Embedder":
+        """Shared SentenceTransformer embedder (loaded on first access)."""
+        return get_embedder()
+
+    @staticmethod
+    def namespace_for(file_path: Path) -> str:
+        """Derives a stable per-document namespace from the file name."""
+        slug = re.sub(r"[^a-z0-9]+", "-", Path(str(file_path)).stem.lower()).strip("-")
+        return slug or "document"
+
+    def load_document(self, file_path: Path):
         """
-        SRS belgesini (TXT veya PDF) RAG pipeline'ına indexler.
-        Bu metod, Orchestrator'ın çağırdığı tek indexleme metodudur.
+        Loads a TXT or PDF file.
+
+        Returns:
+            (pages, meta) where meta has 'document_name' and 'page_count'
         """
-        
         # Normalize path to handle Windows backslashes
         file_path = Path(str(file_path)).resolve()
         
@@ -275,9 +492,12 @@ class RAGPipeline:
             # PDF işleme mantığı
             print(f"[RAG] Loading content from PDF: {file_path.name}")
             # PDFLoader file-like objeyi beklediği için 'rb' ile açıyoruz
+            # Her çağrı kendi loader'ını kullanır (paralel indexleme için state paylaşılmaz)
+            loader = PDFLoader()
             with file_path.open("rb") as f: 
-                 pages = self.loader.load_pdf(f) 
-                 meta = self.loader.metadata
+                 pages = loader.load_pdf(f) 
+                 meta = loader.metadata
+            self.loader = loader
         elif file_path.suffix.lower() == '.txt':
             # TXT işleme mantığı (SRS Creation'dan gelen akış)
             print(f"[RAG] Loading content from TXT: {file_path.name}")
@@ -288,20 +508,46 @@ class RAGPipeline:
             # Desteklenmeyen format hatası
             raise ValueError(f"Unsupported document format for SRS indexing: {file_path.suffix}. Only .txt and .pdf are supported.")
 
+        return pages, meta
+
+    def index_srs(
+        self,
+        file_path: Path,
+        chunk_size: int | None = None,
+        overlap: int | None = None,
+        namespace: str | None = None,
+    ):
+        """
+        SRS belgesini (TXT veya PDF) RAG pipeline'ına indexler.
+        Bu metod, Orchestrator'ın çağırdığı tek indexleme metodudur.
+
+        On a persistent pipeline the document goes into its own namespace
+        (derived from the file name unless given) and is skipped when the
+        stored content hash matches the file on disk.
+        """
+        file_path = Path(str(file_path)).resolve()
+
+        if self.persist_directory is not None:
+            return self._index_namespaced(file_path, namespace or self.namespace_for(file_path))
+
+        pages, meta = self.load_document(file_path)
         doc_name = meta["document_name"]
         
         # Chunking
         chunks = self.chunker.prepare_chunks(pages)
 
+        # Reserve an id range first so concurrent index_srs calls never collide
+        with self._offset_lock:
+            start_id = self.offset
+            self.offset += len(chunks)
+
         # Indexleme
         count_new = self.vstore.add_chunks(
             chunks,
             document_name=doc_name,
-            start_id=self.offset,
+            start_id=start_id,
         )
 
-        self.offset += count_new
-
         return {
             "document_name": doc_name,
             "page_count": meta["page_count"],
@@ -309,9 +555,115 @@ class RAGPipeline:
             "total_chunks_in_db": self.vstore.count(),
         }
 
+    def _index_namespaced(self, file_path: Path, namespace: str):
+        """Indexes one document into its namespace of the persistent store."""
+        # Runs of other processes may share the store: one indexer at a time,
+        # so a document is embedded once and namespaces are never half-replaced
+        with FileLock(self.persist_directory / self.INDEX_LOCK_FILENAME, label="vector index"):
+            return self._index_namespaced_locked(file_path, namespace)
+
+    def _index_namespaced_locked(self, file_path: Path, namespace: str):
+        content_hash = hashlib.sha256(file_path.read_bytes()).hexdigest()
+        self.namespace = namespace
+
+        if self.vstore.namespace_hash(namespace) == content_hash:
+            print(f"[RAG] '{file_path.name}' already indexed (namespace: {namespace}), skipping.")
+            return {
+                "document_name": file_path.name,
+                "namespace": namespace,
+                "page_count": 0,
+                "chunks_added": 0,
+                "skipped": True,
+                "load_seconds": 0.0,
+                "chunk_seconds": 0.0,
+                "embed_seconds": 0.0,
+                "write_seconds": 0.0,
+            }
+
+        load_start = time.perf_counter()
+        pages, meta = self.load_document(file_path)
+        load_seconds = time.perf_counter() - load_start
+
+        chunk_start = time.perf_counter()
+        chunks = self.chunker.prepare_chunks(pages)
+        chunk_seconds = time.perf_counter() - chunk_start
+
+        stats = self.vstore.replace_namespace(
+            chunks,
+            document_name=file_path.name,
+            namespace=namespace,
+            content_hash=content_hash,
+        )
+        # Embedding throughput goes to the stage timing history
+        events.timing("embed", stats["embed_seconds"], items=stats["chunks_added"])
+
+        return {
+            "document_name": file_path.name,
+            "namespace": namespace,
+            "page_count": meta["page_count"],
+            "skipped": False,
+            "load_seconds": load_seconds,
+            "chunk_seconds": chunk_seconds,
+            **stats,
+        }
+
+    def load_sections(self, file_path: Path, max_chars: int = SUMMARY_SECTION_MAX_CHARS):
+        """Loads a document and splits it into heading-aligned sections of at most `max_chars`."""
+        pages, _ = self.load_document(file_path)
+        return SectionChunker(max_chars=max_chars).split("\n\n".join(pages))
+
+    def build_summary_tree(self, file_path: Path, cache_dir: Path):
+        """
+        Builds (or loads from `cache_dir`) the hierarchical summary tree of an
+        SRS: chunk summaries -> section summaries -> document summary.
+
+        Documents small enough to be covered by a single top-k query get no
+        tree (returns None) so they cost no extra LLM calls.
+        """
+        file_path = Path(str(file_path)).resolve()
+        content_hash = hashlib.sha256(file_path.read_bytes()).hexdigest()
+        model_name = getattr(self.llm_client, "model_name", LLM_MODEL_NAME)
+
+        cache_path = (
+            Path(cache_dir)
+            / f"{self.namespace_for(file_path)}-{SummaryTree.cache_key(content_hash, model_name)}.json"
+        )
+        cached = SummaryTree.load_cached(cache_path)
+        if cached is not None:
+            print(f"[RAG] Using cached summary tree: {cache_path.name}")
+            self.summary_tree = cached
+            return cached
+
+        pages, _ = self.load_document(file_path)
+        sections = [
+            self.chunker.prepare_chunks([section])
+            for section in SectionChunker().split("\n\n".join(pages))
+        ]
+        if sum(len(chunks) for chunks in sections) < SUMMARY_MIN_CHUNKS:
+            self.summary_tree = None
+            return None
+
+        if self.llm_client is None:
+            raise ValueError("Building a summary tree requires an LLM client.")
+
+        print(f"[RAG] Building summary tree for {file_path.name} ({len(sections)} section(s))...")
+        tree = SummaryTree.build(
+            sections,
+            self.llm_client,
+            content_hash=content_hash,
+            model_name=model_name,
+        )
+        tree.save(cache_path)
+        self.summary_tree = tree
+        return tree
+
     # index_pdf metodunu artık çağırmayacağımız için temizlik amacıyla kaldırıyoruz veya pasif bırakıyoruz.
     # index_pdf metodu KALDIRILMIŞTIR/KULLANILMAYACAKTIR.
     # Eğer başka bir kod parçası index_pdf'i çağırıyorsa, onu index_srs'e yönlendirebilirsiniz.
     
     def search(self, query: str, k: int = DEFAULT_TOP_K):
-        return self.vstore.query(query, k)
\ No newline at end of file
+        return self.vstore.query(query, k, namespace=self.namespace)
+
+    def search_many(self, queries, k: int = DEFAULT_TOP_K):
+        """Batched variant of search(): one embedding pass for all queries."""
+        return self.vstore.query_many(queries, k, namespace=self.namespace)
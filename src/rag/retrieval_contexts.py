@@ -0,0 +1,146 @@
+# src/rag/retrieval_contexts.py
+"""
+Per-class retrieval contexts, materialized once at extraction time.
+
+generate-code needs, for every view and controller, the SRS chunks relevant
+to that class. Instead of loading the embedding model and querying the
+vector store in every generate-code run, the extraction pipeline runs all
+these retrievals in one batch and stores the chunk ids and texts in
+data/retrieval_contexts.json:
+
+{
+  "srs_hash": "...",                                     # SRS that was indexed and searched
+  "architecture_hash": "...",                            # hash_json of the architecture map
+  "k": 5,
+  "chunks": {"<chunk id>": "<chunk text>", ...},          # stored once
+  "contexts": {
+    "view": {"HomeScreenView": {"name": "...", "query": "...", "chunk_ids": [...]}},
+    "controller": {...}
+  }
+}
+"""
+import json
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from src.core.config import GENERATION_TOP_K
+from src.core.manifest import hash_json
+from src.agents.scaffolder.mvc_scaffolder import MVCScaffolder
+
+# Categories that use retrieval in generate-code (models use the SRS head)
+RETRIEVAL_CATEGORIES = ("view", "controller")
+
+
+# ----------------------------------------------------------------------
+# Shared query builders (extraction stage + generate-code fallback)
+# ----------------------------------------------------------------------
+def build_view_query(class_name: str, arch_item: Optional[Dict[str, Any]] = None) -> str:
+    view_name = class_name.replace('View', '').replace('Screen', '').strip()
+    query = f"user interface screen {view_name} display elements layout components"
+    if arch_item and arch_item.get("description"):
+        query += f" {arch_item.get('description')}"
+    return query
+
+
+def build_controller_query(class_name: str, arch_item: Optional[Dict[str, Any]] = None) -> str:
+    controller_name = class_name.replace('Controller', '').strip()
+    query = f"business logic {controller_name} actions operations workflow"
+    if arch_item and arch_item.get("actions"):
+        actions_str = " ".join(str(a) for a in arch_item.get("actions", [])[:3])
+        query += f" {actions_str}"
+    return query
+
+
+QUERY_BUILDERS = {
+    "view": build_view_query,
+    "controller": build_controller_query,
+}
+
+
+# ----------------------------------------------------------------------
+# Building
+# ----------------------------------------------------------------------
+def build_retrieval_contexts(
+    rag_pipeline,
+    architecture: Dict[str, Any],
+    srs_hash: str = "",
+    k: int = GENERATION_TOP_K,
+) -> Dict[str, Any]:
+    """
+    Runs the retrieval of every view / controller as ONE batched query
+    (single embedding pass) and returns the compact context document.
+    """
+    targets = []
+    for category in RETRIEVAL_CATEGORIES:
+        for item in architecture.get(category, []) or []:
+            name = str(item.get("name") or "").strip()
+            if not name:
+                continue
+            class_name = MVCScaffolder.class_name_for(category, name)
+            targets.append((category, class_name, name, QUERY_BUILDERS[category](class_name, item)))
+
+    document: Dict[str, Any] = {
+        "srs_hash": srs_hash,
+        "architecture_hash": hash_json(architecture),
+        "k": k,
+        "chunks": {},
+        "contexts": {category: {} for category in RETRIEVAL_CATEGORIES},
+    }
+    if not targets:
+        return document
+
+    result = rag_pipeline.search_many([query for *_, query in targets], k=k)
+    ids_per_query = result.get("ids") or []
+    docs_per_query = result.get("documents") or []
+
+    for index, (category, class_name, name, query) in enumerate(targets):
+        ids = ids_per_query[index] if index < len(ids_per_query) else []
+        docs = docs_per_query[index] if index < len(docs_per_query) else []
+        for chunk_id, text in zip(ids, docs):
+            document["chunks"].setdefault(str(chunk_id), text)
+        document["contexts"][category][class_name] = {
+            "name": name,
+            "query": query,
+            "chunk_ids": [str(chunk_id) for chunk_id in ids],
+        }
+
+    print(f"[RAG] Materialized retrieval contexts for {len(targets)} class(es), "
+          f"{len(document['chunks'])} distinct chunk(s).")
+    return document
+
+
+# ----------------------------------------------------------------------
+# Reading (generate-code)
+# ----------------------------------------------------------------------
+def load_retrieval_contexts(path: Path) -> Optional[Dict[str, Any]]:
+    path = Path(path)
+    if not path.exists():
+        return None
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
+    if not isinstance(data, dict) or "contexts" not in data:
+        return None
+    return data
+
+
+def contexts_are_current(contexts: Dict[str, Any], architecture: Dict[str, Any],
+                         srs_hash: Optional[str]) -> bool:
+    """
+    True if `contexts` were built for `architecture` from the SRS with
+    `srs_hash` (recorded in architecture_map.json by the same extraction).
+    """
+    if contexts.get("architecture_hash") != hash_json(architecture):
+        return False
+    return srs_hash is None or contexts.get("srs_hash") == srs_hash
+
+
+def context_chunks(contexts: Dict[str, Any], category: str, class_name: str) -> Optional[List[str]]:
+    """Precomputed chunk texts of a class, or None if it was not materialized."""
+    entry = (contexts.get("contexts", {}).get(category) or {}).get(class_name)
+    if entry is None:
+        return None
+    chunks = contexts.get("chunks", {})
+    return [chunks[chunk_id] for chunk_id in entry.get("chunk_ids", []) if chunk_id in chunks]
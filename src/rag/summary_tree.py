@@ -0,0 +1,203 @@
+# src/rag/summary_tree.py
+import hashlib
+import json
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from src.core.json_repair import loads_lenient
+from src.core.config import (
+    LLM_MODEL_NAME,
+    SUMMARY_FANOUT,
+    SUMMARY_CONTEXT_MAX_CHARS,
+)
+
+PROMPTS_DIR = Path(__file__).resolve().parents[2] / ".github" / "prompts"
+SECTION_PROMPT = PROMPTS_DIR / "summarize_srs_section.prompt.md"
+REDUCE_PROMPT = PROMPTS_DIR / "summarize_srs_summaries.prompt.md"
+
+# Call kinds in the latency history (src/core/latency_history.py)
+SECTION_CALL_KIND = "summary.section"
+REDUCE_CALL_KIND = "summary.reduce"
+
+
+class SummaryTree:
+    """
+    Hierarchical summary index of one SRS document.
+
+    levels[0] -> one summary per chunk
+    levels[1] -> one summary per section
+    levels[2..] -> summaries of SUMMARY_FANOUT lower summaries each,
+                   until a single document summary remains (levels[-1][0])
+
+    Whole-document agents read it through context(), which always returns
+    at most `max_chars` characters regardless of the document length.
+    """
+
+    def __init__(self, levels: List[List[str]], content_hash: str = "", model_name: str = ""):
+        self.levels = levels
+        self.content_hash = content_hash
+        self.model_name = model_name
+
+    # ------------------------------------------------------------------
+    # Context for prompts
+    # ------------------------------------------------------------------
+    @property
+    def document_summary(self) -> str:
+        if not self.levels or not self.levels[-1]:
+            return ""
+        return self.levels[-1][0]
+
+    def context(self, max_chars: int = SUMMARY_CONTEXT_MAX_CHARS) -> str:
+        """
+        Returns the document summary followed by the most detailed level that
+        still fits into `max_chars` (chunk summaries for short documents,
+        section or higher summaries for long ones).
+        """
+        parts = [f"--- Document Summary ---\n{self.document_summary}"]
+        remaining = max_chars - len(parts[0])
+
+        # levels[-1] is the document summary itself, so stop before it
+        for level_index, summaries in enumerate(self.levels[:-1]):
+            label = "Chunk" if level_index == 0 else "Section" if level_index == 1 else "Part"
+            block = "\n\n".join(
+                f"--- {label} Summary {i + 1} ---\n{text}" for i, text in enumerate(summaries)
+            )
+            if len(block) + 2 <= remaining:
+                parts.append(block)
+                break
+
+        return "\n\n".join(parts)[:max_chars]
+
+    # ------------------------------------------------------------------
+    # Cache (JSON)
+    # ------------------------------------------------------------------
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "content_hash": self.content_hash,
+            "model_name": self.model_name,
+            "levels": self.levels,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "SummaryTree":
+        return cls(
+            levels=data.get("levels", []),
+            content_hash=data.get("content_hash", ""),
+            model_name=data.get("model_name", ""),
+        )
+
+    @staticmethod
+    def cache_key(content_hash: str, model_name: str) -> str:
+        """Cache key covering the SRS content, the model and both prompt templates."""
+        digest = hashlib.sha256()
+        for part in (
+            content_hash,
+            model_name,
+            SECTION_PROMPT.read_text(encoding="utf-8"),
+            REDUCE_PROMPT.read_text(encoding="utf-8"),
+        ):
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\0")
+        return digest.hexdigest()[:24]
+
+    @classmethod
+    def load_cached(cls, cache_path: Path) -> Optional["SummaryTree"]:
+        if not cache_path.exists():
+            return None
+        try:
+            with open(cache_path, "r", encoding="utf-8") as f:
+                return cls.from_dict(json.load(f))
+        except (OSError, json.JSONDecodeError):
+            return None
+
+    def save(self, cache_path: Path) -> None:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(cache_path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, indent=4, ensure_ascii=False)
+
+    # ------------------------------------------------------------------
+    # Building
+    # ------------------------------------------------------------------
+    @classmethod
+    def build(
+        cls,
+        sections: List[List[str]],
+        llm_client,
+        content_hash: str = "",
+        model_name: str = LLM_MODEL_NAME,
+        fanout: int = SUMMARY_FANOUT,
+    ) -> "SummaryTree":
+        """
+        Builds the tree bottom-up.
+
+        Args:
+            sections: chunk lists, one list per SRS section (document order)
+            llm_client: LLMClient used for the summary calls (paced by its shared rate limiter)
+        """
+        section_template = SECTION_PROMPT.read_text(encoding="utf-8")
+        reduce_template = REDUCE_PROMPT.read_text(encoding="utf-8")
+
+        chunk_summaries: List[str] = []
+        section_summaries: List[str] = []
+        for idx, chunks in enumerate(sections, 1):
+            print(f"[SummaryTree] Summarizing section {idx}/{len(sections)} ({len(chunks)} chunk(s))...")
+            context = cls.section_context(chunks)
+            response = llm_client.generate_content(
+                section_template.replace("{{context}}", context), kind=SECTION_CALL_KIND
+            )
+            per_chunk, section_summary = cls._parse_section_response(response, len(chunks))
+            chunk_summaries.extend(per_chunk)
+            section_summaries.append(section_summary)
+
+        levels = [chunk_summaries, section_summaries]
+        while len(levels[-1]) > 1:
+            lower = levels[-1]
+            print(f"[SummaryTree] Reducing {len(lower)} summaries (level {len(levels)})...")
+            upper = []
+            for start in range(0, len(lower), fanout):
+                group = lower[start:start + fanout]
+                context = "\n\n".join(f"--- Summary {i+1} ---\n{text}" for i, text in enumerate(group))
+                upper.append(
+                    llm_client.generate_content(
+                        reduce_template.replace("{{context}}", context), kind=REDUCE_CALL_KIND
+                    ).strip()
+                )
+            levels.append(upper)
+
+        return cls(levels=levels, content_hash=content_hash, model_name=model_name)
+
+    @staticmethod
+    def section_context(chunks: List[str]) -> str:
+        """{{context}} of one section summary prompt."""
+        context = ""
+        for i, c in enumerate(chunks):
+            context += f"\n\n--- SRS Chunk {i+1} ---\n{c}\n"
+        return context
+
+    @staticmethod
+    def reduce_group_sizes(section_count: int, fanout: int = SUMMARY_FANOUT) -> List[int]:
+        """Summaries merged by each reduce call build() makes, level by level."""
+        sizes: List[int] = []
+        count = section_count
+        while count > 1:
+            groups = [min(fanout, count - start) for start in range(0, count, fanout)]
+            sizes.extend(groups)
+            count = len(groups)
+        return sizes
+
+    @staticmethod
+    def _parse_section_response(response: str, chunk_count: int):
+        """Parses the section JSON; falls back to using the raw text as section summary."""
+        try:
+            data, _ = loads_lenient(response)
+            per_chunk = [str(s) for s in data.get("chunk_summaries", [])]
+            section_summary = str(data.get("section_summary", "")).strip()
+        except (ValueError, AttributeError):
+            per_chunk = []
+            section_summary = response.strip()
+
+        if not section_summary:
+            section_summary = " ".join(per_chunk)
+        # Keep chunk summaries aligned with the chunks of this section
+        per_chunk = (per_chunk + [section_summary] * chunk_count)[:chunk_count]
+        return per_chunk, section_summary
@@ -0,0 +1,99 @@
+import math
+
+import pytest
+
+from src.core.architecture_merge import singularize
+from src.rag.dedup import ArchitectureDeduplicator
+
+
+def _unit(degrees: float):
+    return [math.cos(math.radians(degrees)), math.sin(math.radians(degrees))]
+
+
+def _embedding_function(angles):
+    """Fake embedder: the vector of an item text is looked up by the item name."""
+    def embed(texts):
+        return [_unit(angles[text.split(":")[0]]) for text in texts]
+    return embed
+
+
+def _deduplicate(architecture, angles, threshold=0.85):
+    deduplicator = ArchitectureDeduplicator(_embedding_function(angles), threshold=threshold)
+    return deduplicator.deduplicate(architecture)
+
+
+# ----------------------------------------------------------------------
+# singularize / name keys
+# ----------------------------------------------------------------------
+@pytest.mark.parametrize("plural, singular", [
+    ("products", "product"),
+    ("categories", "category"),
+    ("addresses", "address"),
+    ("statuses", "status"),
+    ("houses", "house"),
+    ("boxes", "box"),
+    ("matches", "match"),
+    ("movies", "movie"),
+    ("people", "person"),
+    ("responses", "response"),
+])
+def test_singularize_plurals(plural, singular):
+    assert singularize(plural) == singular
+
+
+@pytest.mark.parametrize("word", ["status", "address", "analysis", "class", "news", "user", "bus"])
+def test_singularize_keeps_singular_words(word):
+    assert singularize(word) == word
+
+
+def test_name_keys_match_across_plural_and_layer_suffix():
+    deduplicator = ArchitectureDeduplicator(_embedding_function({}))
+    assert deduplicator._name_key("model", "Status") == deduplicator._name_key("model", "Statuses")
+    assert deduplicator._name_key("model", "Address") == "address"
+    assert deduplicator._name_key("controller", "OrderController") == "order"
+
+
+# ----------------------------------------------------------------------
+# Clustering
+# ----------------------------------------------------------------------
+def test_name_match_merges_without_similarity():
+    architecture = {"model": [{"name": "Product", "description": "An item for sale"},
+                              {"name": "Products", "description": "Items for sale in the shop"}]}
+    result, report = _deduplicate(architecture, {"Product": 0, "Products": 90})
+    assert result["model"] == [{"name": "Product", "description": "Items for sale in the shop"}]
+    assert report["clusters"]["model"] == [{"kept": "Product", "merged": ["Products"]}]
+    assert report["counts"]["model"] == [2, 1]
+
+
+def test_similarity_chain_is_not_merged_transitively():
+    # Order~OrderItem (cos 20deg) and OrderItem~Item (cos 20deg), but Order/Item only cos 40deg
+    architecture = {"model": [{"name": "Order"}, {"name": "OrderItem"}, {"name": "Item"}]}
+    result, report = _deduplicate(architecture, {"Order": 0, "Order Item": 20, "Item": 40})
+    assert [item["name"] for item in result["model"]] == ["Order", "Item"]
+    assert report["clusters"]["model"] == [{"kept": "Order", "merged": ["OrderItem"]}]
+
+
+def test_item_joins_cluster_only_if_linked_to_every_member():
+    architecture = {"model": [{"name": "Cart"}, {"name": "Carts"}, {"name": "Basket"}]}
+    # Basket is similar to Cart but not to Carts
+    result, _ = _deduplicate(architecture, {"Cart": 0, "Carts": 60, "Basket": 10})
+    assert [item["name"] for item in result["model"]] == ["Cart", "Basket"]
+
+
+def test_controller_actions_are_unioned():
+    architecture = {"controller": [
+        {"name": "CartController", "actions": ["add", "remove"]},
+        {"name": "ShoppingCartController", "actions": ["Add", "checkout"]},
+    ]}
+    result, _ = _deduplicate(architecture, {"Cart": 0, "Shopping Cart": 10})
+    assert result["controller"] == [{"name": "CartController", "actions": ["add", "remove", "checkout"]}]
+
+
+def test_single_items_are_not_embedded():
+    def embed(texts):
+        raise AssertionError("nothing to compare, no embedding expected")
+
+    architecture = {"model": [{"name": "User"}], "view": [], "controller": []}
+    result, report = ArchitectureDeduplicator(embed).deduplicate(architecture)
+    assert result["model"] == [{"name": "User"}]
+    assert report["counts"] == {"model": [1, 1], "controller": [0, 0], "view": [0, 0]}
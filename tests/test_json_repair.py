@@ -0,0 +1,112 @@
+import json
+
+import pytest
+
+from src.core.json_repair import (
+    MODEL_SCHEMA,
+    REQUIREMENTS_SCHEMA,
+    build_follow_up_prompt,
+    loads_lenient,
+    repair_json_text,
+    validate,
+)
+
+
+# ----------------------------------------------------------------------
+# repair_json_text
+# ----------------------------------------------------------------------
+@pytest.mark.parametrize("text, expected", [
+    ('```json\n{"a": 1}\n```', {"a": 1}),
+    ('Here is the JSON:\n{"a": 1}\nHope this helps!', {"a": 1}),
+    ('{"a": [1, 2,], "b": 3,}', {"a": [1, 2], "b": 3}),
+    ('{"a": 1, // comment\n "b": /* inline */ 2}', {"a": 1, "b": 2}),
+    ('{"a": True, "b": False, "c": None}', {"a": True, "b": False, "c": None}),
+    ("{'a': 'it\\'s'}", {"a": "it's"}),
+    ("{'a': 'say \"hi\"'}", {"a": 'say "hi"'}),
+])
+def test_repair_json_text_fixes_common_defects(text, expected):
+    assert json.loads(repair_json_text(text)) == expected
+
+
+def test_repair_json_text_closes_truncated_output():
+    text = '{"model": [{"name": "Order", "description": "An ord'
+    assert json.loads(repair_json_text(text)) == {"model": [{"name": "Order", "description": "An ord"}]}
+
+
+def test_repair_json_text_drops_dangling_key():
+    text = '{"model": [{"name": "Order"}], "view":'
+    assert json.loads(repair_json_text(text)) == {"model": [{"name": "Order"}]}
+
+
+def test_repair_json_text_keeps_comment_markers_inside_strings():
+    text = '{"url": "http://example.com", "note": "a, b,"}'
+    assert json.loads(repair_json_text(text)) == {"url": "http://example.com", "note": "a, b,"}
+
+
+# ----------------------------------------------------------------------
+# loads_lenient
+# ----------------------------------------------------------------------
+def test_loads_lenient_valid_json_is_not_repaired():
+    assert loads_lenient('```json\n{"a": 1}\n```') == ({"a": 1}, False)
+
+
+def test_loads_lenient_reports_repair():
+    assert loads_lenient('{"a": 1,}') == ({"a": 1}, True)
+
+
+def test_loads_lenient_raises_value_error_when_unrepairable():
+    with pytest.raises(ValueError, match="invalid JSON"):
+        loads_lenient("no json here")
+
+
+# ----------------------------------------------------------------------
+# validate
+# ----------------------------------------------------------------------
+def test_validate_fills_defaults_and_reports_missing_keys():
+    normalized, missing = validate({"project_name": "Shop"}, REQUIREMENTS_SCHEMA)
+    assert missing == ["domain_entities", "system_functions"]
+    assert normalized == {"project_name": "Shop", "domain_entities": [], "system_functions": []}
+
+
+def test_validate_null_value_counts_as_missing():
+    _, missing = validate({"model": None}, MODEL_SCHEMA)
+    assert missing == ["model"]
+
+
+def test_validate_coerces_items():
+    data = {"model": ["Order", {"name": "Item"}, {"description": "unnamed"}, 42]}
+    normalized, missing = validate(data, MODEL_SCHEMA)
+    assert missing == []
+    assert normalized["model"] == [
+        {"name": "Order", "description": ""},
+        {"name": "Item", "description": ""},
+    ]
+
+
+def test_validate_accepts_bare_list_for_single_list_schema():
+    normalized, missing = validate([{"name": "Order", "description": "x"}], MODEL_SCHEMA)
+    assert missing == []
+    assert normalized == {"model": [{"name": "Order", "description": "x"}]}
+
+
+def test_validate_non_object_yields_defaults():
+    normalized, missing = validate("oops", MODEL_SCHEMA)
+    assert normalized == {"model": []}
+    assert missing == ["model"]
+
+
+def test_validate_stringifies_scalars():
+    normalized, _ = validate({"project_name": 7, "domain_entities": [], "system_functions": []},
+                             REQUIREMENTS_SCHEMA)
+    assert normalized["project_name"] == "7"
+
+
+# ----------------------------------------------------------------------
+# build_follow_up_prompt
+# ----------------------------------------------------------------------
+def test_follow_up_prompt_carries_only_answer_errors_and_schema():
+    prompt = build_follow_up_prompt({"project_name": "Shop"}, ["domain_entities"], REQUIREMENTS_SCHEMA)
+    assert '{"project_name": "Shop"}' in prompt
+    assert "- missing required key: domain_entities" in prompt
+    assert '"system_functions"' in prompt  # full schema
+    assert "exactly these keys: domain_entities." in prompt